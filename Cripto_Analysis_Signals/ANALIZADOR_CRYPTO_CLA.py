@@ -7,20 +7,35 @@
 # ===========================================================================
 
 
-import requests
 import pandas as pd
 import numpy as np
-import ta
-from tabulate import tabulate
 from colorama import Fore, Style, init
-import time
 import warnings
 from datetime import datetime, timedelta
 import json
 import os
-
-warnings.filterwarnings('ignore')
-init(autoreset=True)
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from operator import itemgetter
+from Motor_Concurrente import procesar_en_paralelo, MAX_WORKERS_DEFAULT
+from Almacen_OHLCV import AlmacenOHLCV
+from Cache_Series import CacheSeries, FRESCA, OBSOLETA
+from Limitador_Tasa import registrar_limitadores
+from Transporte_HTTP import transporte
+from Cotizaciones import ServicioCotizaciones
+from Indicadores_Vectorizados import (COLUMNAS_INDICADORES, COLUMNAS_RANGO, aplicar_indicadores,
+                                      aplicar_indicadores_rango)
+from Indicadores_Incrementales import EstadoIndicadores
+from Salud_APIs import MonitorSalud
+from Metricas import metricas, registro
+from Cruces_Vectorizados import ALCISTA, detectar_cruces, ultimo_cruce
+from Backtest_Vectorizado import PESOS_SCORE, UMBRALES_SEÑAL, NIVELES_RSI, backtest
+from Contexto_Analisis import RegistroContextos
+from Memoria_Compacta import MODO_COMPACTO, bytes_df, compactar, indicadores_compactos, comparar
+from Universo_Activos import ConstructorUniverso, ORDENES
+from Temporalidades import (SEGUNDOS, NATIVAS, FUENTE, ENDPOINT_CRYPTOCOMPARE, VELAS_POR_LLAMADA_CRYPTOCOMPARE,
+                            DIAS_MAX_COINGECKO, velas_por_dia, dias_para_velas, fuentes_posibles, remuestrear)
 
 # Configuración de APIs
 API_CONFIG = {
@@ -41,6 +56,29 @@ API_CONFIG = {
     }
 }
 
+# Campos de cada vela de CryptoCompare y su columna en el DataFrame (el resto conserva el nombre)
+CAMPOS_CRYPTOCOMPARE = ("time", "close", "volumeto", "open", "high", "low", "volumefrom")
+COLUMNAS_CRYPTOCOMPARE = {"close": "price", "volumeto": "volume"}
+
+# Proveedores de histórico real en orden de prioridad (CoinCap solo da una serie plana de respaldo)
+PROVEEDORES_HISTORICO = ('coingecko', 'cryptocompare')
+NOMBRES_PROVEEDOR = {'coingecko': 'CoinGecko', 'cryptocompare': 'CryptoCompare', 'coincap': 'CoinCap'}
+
+# Modo de cobertura (hedged requests) por defecto
+MODO_COBERTURA = os.environ.get('CRIPTO_COBERTURA', '') not in ('', '0')
+
+# Token bucket por proveedor: todas las llamadas HTTP pasan por él
+registrar_limitadores(API_CONFIG)
+
+# Columnas que añade el cálculo de indicadores (el resto son las de la serie descargada)
+COLUMNAS_DERIVADAS = frozenset(COLUMNAS_INDICADORES + COLUMNAS_RANGO)
+
+
+def columnas_crudas(df):
+    """DataFrame nuevo con las columnas descargadas (precio/OHLCV): añadirle columnas no toca `df`"""
+    return df[[col for col in df.columns if col not in COLUMNAS_DERIVADAS]]
+
+
 # Configuración de criptomonedas
 CRYPTO_CONFIG = {
     "Bitcoin": {"coingecko": "bitcoin", "cryptocompare": "BTC", "coincap": "bitcoin"},
@@ -56,184 +94,237 @@ CRYPTO_CONFIG = {
 }
 
 class CryptoAnalyzer:
-    def __init__(self):
-        self.cache = {}
-        self.cache_duration = 300  # 5 minutos
-        self.api_status = self._test_apis()
+    def __init__(self, store=None, compact=None, universe=None, hedge=None, cache=None):
+        # Series en memoria: TTL de 5 minutos, tope de memoria con LRU y stale-while-revalidate opcional
+        self.cache = cache if cache is not None else CacheSeries()
+        # Histórico persistente: solo se descarga la cola que falta
+        self.store = store if store is not None else AlmacenOHLCV()
+        # Precios spot en lote con TTL corto
+        self.quotes = ServicioCotizaciones(API_CONFIG)
+        # Estado incremental de indicadores por cripto (actualizaciones O(1))
+        self.indicator_states = {}
+        # Salud de APIs: sondas perezosas y concurrentes + circuit breaker por proveedor
+        self.health = MonitorSalud(API_CONFIG)
+        # Filas válidas y sub-análisis memoizados por versión de DataFrame
+        self.contexts = RegistroContextos()
+        # Modo compacto: float32 en un bloque, índice epoch y solo las columnas del análisis
+        self.compact = MODO_COMPACTO if compact is None else compact
+        # {nombre: ids por proveedor}; CRYPTO_CONFIG salvo que se pase otro universo
+        self.universe = CRYPTO_CONFIG if universe is None else universe
+        # Cobertura: si el proveedor principal tarda más que su p95 se lanza el siguiente en paralelo
+        self.hedge = MODO_COBERTURA if hedge is None else hedge
+        self._hedge_pool = None
+        self._hedge_pool_lock = threading.Lock()
+        # Último proveedor que sirvió cada cripto (las colas posteriores se piden al mismo)
+        self.sources = {}
+
+    @property
+    def api_status(self):
+        """Último estado conocido de las APIs {proveedor: bool}"""
+        return self.health.estado()
         
     def _test_apis(self):
-        """Prueba la disponibilidad de las APIs"""
-        status = {}
-        
-        # Test CoinGecko
-        try:
-            response = requests.get(
-                f"{API_CONFIG['coingecko']['base_url']}/ping",
-                timeout=5
-            )
-            status['coingecko'] = response.status_code == 200
-        except:
-            status['coingecko'] = False
-            
-        # Test CryptoCompare
-        try:
-            response = requests.get(
-                f"{API_CONFIG['cryptocompare']['base_url']}/price?fsym=BTC&tsym=USD",
-                timeout=5
-            )
-            status['cryptocompare'] = response.status_code == 200
-        except:
-            status['cryptocompare'] = False
-            
-        # Test CoinCap
-        try:
-            response = requests.get(
-                f"{API_CONFIG['coincap']['base_url']}/assets/bitcoin",
-                timeout=5
-            )
-            status['coincap'] = response.status_code == 200
-        except:
-            status['coincap'] = False
-            
-        print(f"{Fore.CYAN}📡 Estado de APIs:")
-        for api, working in status.items():
-            color = Fore.GREEN if working else Fore.RED
-            emoji = "✅" if working else "❌"
-            print(f"{color}{emoji} {api.upper()}: {'Disponible' if working else 'No disponible'}")
-        
-        return status
+        """Prueba la disponibilidad de las APIs (todas en paralelo)"""
+        return self.health.refrescar()
     
     def _get_cache_key(self, crypto, timeframe, days):
-        """Genera clave única para cache"""
-        return f"{crypto}_{timeframe}_{days}"
+        """Genera clave única para cache (por ventana efectiva: menos de 200 velas descarga lo mismo)"""
+        return f"{crypto}_{timeframe}_{max(days, dias_para_velas(timeframe, 200))}"
     
     def _is_cache_valid(self, cache_key):
-        """Verifica si el cache es válido"""
-        if cache_key not in self.cache:
-            return False
+        """Verifica si el cache es válido (entrada fresca)"""
+        return self.cache.vigente(cache_key)
+    
+    def _get_cached(self, crypto_name, cache_key, load, fresh=False):
+        """
+        Stale-while-revalidate: una entrada fresca se devuelve tal cual; una
+        obsoleta también, y se recarga con load() en segundo plano. Sin
+        entrada (o caducada), o si fresh pide no servir la obsoleta, se carga
+        ahora y se guarda.
+        """
+        entry, state = self.cache.consultar(cache_key, obsoleta=not fresh)
+        if state == FRESCA:
+            registro.info("{}📦 Usando cache para {}", Fore.YELLOW, crypto_name)
+            return entry.valor
+        if state == OBSOLETA:
+            registro.info("{}📦 Usando cache para {} (actualizando en segundo plano)", Fore.YELLOW, crypto_name)
+            self.cache.revalidar(cache_key, load)
+            return entry.valor
         
-        timestamp = self.cache[cache_key]['timestamp']
-        return (datetime.now() - timestamp).seconds < self.cache_duration
+        df = load()
+        if df is not None:
+            self.cache.guardar(cache_key, df)
+        return df
     
-    def _get_from_coingecko(self, crypto_id, days=90):
-        """Obtiene datos de CoinGecko - VERSIÓN MEJORADA"""
+    def _get_from_coingecko(self, crypto_id, days=90, min_days=200, timeframe='daily'):
+        """Obtiene datos de CoinGecko - VERSIÓN MEJORADA (daily, o hourly hasta 90 días)"""
+        if timeframe not in ('daily', 'hourly'):
+            return None
+        
         try:
             # Solicitar más días para asegurar suficientes datos
-            request_days = max(days, 200)  # Mínimo 200 días
+            # (min_days en velas: 200 días en diario, salvo descargas incrementales)
+            request_days = max(days, dias_para_velas(timeframe, min_days))
             
             url = f"{API_CONFIG['coingecko']['base_url']}/coins/{crypto_id}/market_chart"
-            params = {"vs_currency": "usd", "days": request_days, "interval": "daily"}
-            
-            print(f"{Fore.CYAN}   🌐 Solicitando {request_days} días de datos de CoinGecko...")
-            
-            response = requests.get(url, params=params, timeout=API_CONFIG['coingecko']['timeout'])
-            response.raise_for_status()
-            
-            data = response.json()
-            prices = data.get("prices", [])
-            volumes = data.get("total_volumes", [])
-            
-            if not prices:
-                print(f"{Fore.RED}   ❌ No se recibieron datos de precios")
-                return None
-            
-            print(f"{Fore.GREEN}   ✅ Recibidos {len(prices)} puntos de datos")
-            
-            df = pd.DataFrame(prices, columns=["timestamp", "price"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-            
-            if volumes:
-                vol_df = pd.DataFrame(volumes, columns=["timestamp", "volume"])
-                vol_df["timestamp"] = pd.to_datetime(vol_df["timestamp"], unit="ms")
-                df = df.merge(vol_df, on="timestamp", how="left")
+            if timeframe == 'daily':
+                params = {"vs_currency": "usd", "days": request_days, "interval": "daily"}
             else:
-                df["volume"] = 0
+                # Sin interval CoinGecko devuelve velas horarias entre 2 y 90 días
+                request_days = min(max(request_days, 2), DIAS_MAX_COINGECKO[timeframe])
+                params = {"vs_currency": "usd", "days": request_days}
             
-            # Limpiar datos
-            df = df.dropna(subset=['price'])
-            df = df[df['price'] > 0]  # Eliminar precios = 0
+            registro.debug("{}   🌐 Solicitando {} días de datos de CoinGecko...", Fore.CYAN, request_days)
             
-            df.set_index("timestamp", inplace=True)
-            df = df.sort_index()
+            with self.health.vigilar('coingecko'):
+                response = transporte.get(url, proveedor='coingecko', params=params,
+                                          timeout=API_CONFIG['coingecko']['timeout'])
+                response.raise_for_status()
             
-            print(f"{Fore.GREEN}   ✅ DataFrame procesado: {len(df)} filas válidas")
-            return df
+            with metricas.temporizador('parse_segundos', proveedor='coingecko'):
+                return self._parse_coingecko(response.json())
             
         except Exception as e:
-            print(f"{Fore.RED}   ❌ Error CoinGecko para {crypto_id}: {e}")
+            registro.error("   ❌ Error CoinGecko para {}: {}", crypto_id, e)
             return None
     
-    def _get_from_cryptocompare(self, crypto_symbol, days=90):
-        """Obtiene datos de CryptoCompare - VERSIÓN MEJORADA"""
+    def _parse_coingecko(self, data):
+        """Convierte la respuesta de market_chart en DataFrame (price, volume)"""
+        prices = data.get("prices", [])
+        volumes = data.get("total_volumes", [])
+        
+        if not prices:
+            registro.error("   ❌ No se recibieron datos de precios")
+            return None
+        
+        registro.debug("{}   ✅ Recibidos {} puntos de datos", Fore.GREEN, len(prices))
+        
+        df = pd.DataFrame(prices, columns=["timestamp", "price"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        
+        if volumes:
+            vol_df = pd.DataFrame(volumes, columns=["timestamp", "volume"])
+            vol_df["timestamp"] = pd.to_datetime(vol_df["timestamp"], unit="ms")
+            df = df.merge(vol_df, on="timestamp", how="left")
+        else:
+            df["volume"] = 0
+        
+        # Limpiar datos
+        df = df.dropna(subset=['price'])
+        df = df[df['price'] > 0]  # Eliminar precios = 0
+        
+        df.set_index("timestamp", inplace=True)
+        df = df.sort_index()
+        
+        registro.debug("{}   ✅ DataFrame procesado: {} filas válidas", Fore.GREEN, len(df))
+        metricas.incrementar('filas_parseadas_total', len(df), proveedor='coingecko')
+        return df
+    
+    def _get_from_cryptocompare(self, crypto_symbol, days=90, min_days=200, timeframe='daily'):
+        """Obtiene datos de CryptoCompare - VERSIÓN MEJORADA (histoday/histohour/histominute)"""
+        if timeframe not in ENDPOINT_CRYPTOCOMPARE:
+            return None
+        
         try:
             # Solicitar más días para asegurar suficientes datos
-            request_days = max(days, 200)  # Mínimo 200 días
-            
-            url = f"{API_CONFIG['cryptocompare']['base_url']}/histoday"
-            params = {
-                "fsym": crypto_symbol,
-                "tsym": "USD",
-                "limit": request_days,
-                "aggregate": 1
-            }
-            
-            print(f"{Fore.CYAN}   🌐 Solicitando {request_days} días de datos de CryptoCompare...")
-            
-            response = requests.get(url, params=params, timeout=API_CONFIG['cryptocompare']['timeout'])
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get("Response") == "Error":
-                print(f"{Fore.RED}   ❌ Error de API: {data.get('Message', 'Desconocido')}")
-                return None
-            
-            hist_data = data.get("Data", {}).get("Data", [])
-            if not hist_data:
-                print(f"{Fore.RED}   ❌ No se recibieron datos históricos")
-                return None
-            
-            print(f"{Fore.GREEN}   ✅ Recibidos {len(hist_data)} puntos de datos")
-            
-            df_data = []
-            for item in hist_data:
-                if item.get("close", 0) > 0:  # Solo precios válidos
-                    df_data.append({
-                        "timestamp": pd.to_datetime(item["time"], unit="s"),
-                        "price": float(item["close"]),
-                        "volume": float(item.get("volumeto", 0))
-                    })
-            
-            if not df_data:
-                print(f"{Fore.RED}   ❌ No hay datos válidos después del procesamiento")
-                return None
+            # (min_days en velas: 200 días en diario, salvo descargas incrementales)
+            request_days = max(days, dias_para_velas(timeframe, min_days))
+            bars = int(request_days * velas_por_dia(timeframe))
+            
+            url = f"{API_CONFIG['cryptocompare']['base_url']}/{ENDPOINT_CRYPTOCOMPARE[timeframe]}"
+            registro.debug("{}   🌐 Solicitando {} días ({} velas {}) de CryptoCompare...",
+                           Fore.CYAN, request_days, bars, timeframe)
+            
+            # Máximo de velas por llamada: se pagina hacia atrás con toTs
+            pages = []
+            to_ts = None
+            while True:
+                params = {
+                    "fsym": crypto_symbol,
+                    "tsym": "USD",
+                    "limit": min(bars, VELAS_POR_LLAMADA_CRYPTOCOMPARE),
+                    "aggregate": 1
+                }
+                if to_ts is not None:
+                    params["toTs"] = to_ts
+                
+                with self.health.vigilar('cryptocompare'):
+                    response = transporte.get(url, proveedor='cryptocompare', params=params,
+                                              timeout=API_CONFIG['cryptocompare']['timeout'])
+                    response.raise_for_status()
+                
+                data = response.json()
+                page = data.get("Data", {}).get("Data", []) if data.get("Response") != "Error" else []
+                if not pages or page:
+                    pages.append(data)
+                
+                bars -= params["limit"]
+                # limit=n devuelve n+1 velas; menos significa que no hay más historia
+                if bars <= 0 or len(page) <= params["limit"]:
+                    break
+                to_ts = page[0]["time"] - 1
             
-            df = pd.DataFrame(df_data)
-            df.set_index("timestamp", inplace=True)
-            df = df.sort_index()
+            if len(pages) > 1:
+                # Páginas de la más reciente a la más antigua -> una sola respuesta cronológica
+                pages = [{"Data": {"Data": [item for data in reversed(pages) for item in data["Data"]["Data"]]}}]
             
-            print(f"{Fore.GREEN}   ✅ DataFrame procesado: {len(df)} filas válidas")
-            return df
+            with metricas.temporizador('parse_segundos', proveedor='cryptocompare'):
+                return self._parse_cryptocompare(pages[0])
             
         except Exception as e:
-            print(f"{Fore.RED}   ❌ Error CryptoCompare para {crypto_symbol}: {e}")
+            registro.error("   ❌ Error CryptoCompare para {}: {}", crypto_symbol, e)
+            return None
+    
+    def _parse_cryptocompare(self, data):
+        """Convierte la respuesta de histoday/histohour en DataFrame OHLCV (price = close, volume = volumeto)"""
+        if data.get("Response") == "Error":
+            registro.error("   ❌ Error de API: {}", data.get('Message', 'Desconocido'))
+            return None
+        
+        hist_data = data.get("Data", {}).get("Data", [])
+        if not hist_data:
+            registro.error("   ❌ No se recibieron datos históricos")
+            return None
+        
+        registro.debug("{}   ✅ Recibidos {} puntos de datos", Fore.GREEN, len(hist_data))
+        
+        # Un array por campo directamente desde la lista de la respuesta
+        columns = {field: self._cryptocompare_field(hist_data, field) for field in CAMPOS_CRYPTOCOMPARE}
+        valid = columns["close"] > 0  # Solo precios válidos
+        
+        if not valid.any():
+            registro.error("   ❌ No hay datos válidos después del procesamiento")
             return None
+        
+        index = pd.DatetimeIndex(columns.pop("time")[valid].astype(np.int64).astype('datetime64[s]'), name="timestamp")
+        df = pd.DataFrame({
+            COLUMNAS_CRYPTOCOMPARE.get(field, field): values[valid] for field, values in columns.items()
+        }, index=index)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        
+        registro.debug("{}   ✅ DataFrame procesado: {} filas válidas", Fore.GREEN, len(df))
+        metricas.incrementar('filas_parseadas_total', len(df), proveedor='cryptocompare')
+        return df
     
-    def _get_from_coincap(self, crypto_id, days=90):
+    @staticmethod
+    def _cryptocompare_field(hist_data, field):
+        """Columna float64 de la lista de velas (0 si la vela no trae el campo)"""
+        try:
+            return np.fromiter(map(itemgetter(field), hist_data), dtype=np.float64, count=len(hist_data))
+        except (KeyError, TypeError):
+            return np.fromiter((item.get(field) or 0 for item in hist_data), dtype=np.float64, count=len(hist_data))
+    
+    def _get_from_coincap(self, crypto_id, days=90, timeframe='daily'):
         """Obtiene datos de CoinCap"""
+        if timeframe != 'daily':
+            return None
+        
         try:
             # CoinCap no tiene datos históricos tan detallados, solo precio actual
-            url = f"{API_CONFIG['coincap']['base_url']}/assets/{crypto_id}"
-            
-            response = requests.get(url, timeout=API_CONFIG['coincap']['timeout'])
-            response.raise_for_status()
-            
-            data = response.json().get("data", {})
-            if not data:
-                return None
-            
-            # Crear DataFrame básico con precio actual
-            current_price = float(data.get("priceUsd", 0))
-            if current_price == 0:
+            # (se resuelve en lote junto con el resto de la watchlist)
+            current_price = self.quotes.precio(crypto_id, 'coincap')
+            if not current_price:
                 return None
                 
             # Generar datos simulados para análisis (solo como respaldo)
@@ -246,307 +337,508 @@ class CryptoAnalyzer:
             return df
             
         except Exception as e:
-            print(f"{Fore.RED}❌ Error CoinCap para {crypto_id}: {e}")
+            registro.error("❌ Error CoinCap para {}: {}", crypto_id, e)
             return None
     
-    def get_crypto_data(self, crypto_name, days=90):
-        """Obtiene datos con sistema de failover - VERSIÓN MEJORADA"""
-        cache_key = self._get_cache_key(crypto_name, 'daily', days)
-        
-        # Verificar cache
-        if self._is_cache_valid(cache_key):
-            print(f"{Fore.YELLOW}📦 Usando cache para {crypto_name}")
-            return self.cache[cache_key]['data']
+    def _get_incremental(self, provider, crypto_id, days, fetcher, timeframe='daily'):
+        """Carga el histórico local y descarga solo los días que faltan"""
+        if crypto_id is None:
+            return None
+
+        request_days = max(days, dias_para_velas(timeframe, 200))
+        now = pd.Timestamp(datetime.now())
+        window_start = now.normalize() - pd.Timedelta(days=request_days)
+        last_stored = self.store.ultimo_timestamp(provider, crypto_id, timeframe)
+
+        if last_stored is not None and self.store.cubre_desde(provider, crypto_id, timeframe, window_start):
+            # +2 días de solapamiento para reemplazar la última barra parcial
+            missing_days = max((now - last_stored).days + 2, 2)
+            registro.debug("{}   💾 Histórico local hasta {}, descargando {} días",
+                           Fore.YELLOW, last_stored, missing_days)
+            metricas.incrementar('almacen_consultas_total', resultado='incremental', proveedor=provider)
+            tail = fetcher(crypto_id, missing_days, min_days=1, timeframe=timeframe)
+            if tail is None:
+                return None
+            df = self.store.anexar(provider, crypto_id, timeframe, tail)
+        else:
+            metricas.incrementar('almacen_consultas_total', resultado='completa', proveedor=provider)
+            df = fetcher(crypto_id, days, timeframe=timeframe)
+            if df is None:
+                return None
+            self.store.guardar(provider, crypto_id, timeframe, df, inicio_solicitado=window_start)
+
+        return df[df.index >= window_start]
+
+    def get_crypto_data(self, crypto_name, days=90, timeframe='daily', fresh=False):
+        """
+        Obtiene datos con sistema de failover - VERSIÓN MEJORADA
+
+        Con fresh=True no se sirve una copia obsoleta del cache (pasado el TTL
+        se descarga aunque esté activa la ventana obsoleta).
+        """
+        if timeframe not in NATIVAS:
+            return self._get_resampled(crypto_name, days, timeframe, fresh)
         
-        crypto_config = CRYPTO_CONFIG.get(crypto_name, {})
+        return self._get_cached(crypto_name, self._get_cache_key(crypto_name, timeframe, days),
+                                lambda: self._load_crypto_data(crypto_name, days, timeframe), fresh)
+
+    def _load_crypto_data(self, crypto_name, days, timeframe):
+        """Failover entre proveedores (almacén + cola descargada) sin pasar por el cache"""
+        crypto_config = self.universe.get(crypto_name, {})
         df = None
         
         # Intentar APIs en orden de prioridad
-        print(f"{Fore.BLUE}🔄 Intentando obtener datos para {crypto_name}...")
+        registro.debug("{}🔄 Intentando obtener datos para {}...", Fore.BLUE, crypto_name)
         
-        if self.api_status.get('coingecko', False):
-            print(f"{Fore.CYAN}   Probando CoinGecko...")
-            df = self._get_from_coingecko(crypto_config.get('coingecko'), days)
-            if df is not None:
-                print(f"{Fore.GREEN}✅ Datos obtenidos de CoinGecko para {crypto_name}")
-                self.debug_data_quality(df, crypto_name)
-        
-        if df is None and self.api_status.get('cryptocompare', False):
-            print(f"{Fore.CYAN}   Probando CryptoCompare...")
-            df = self._get_from_cryptocompare(crypto_config.get('cryptocompare'), days)
-            if df is not None:
-                print(f"{Fore.GREEN}✅ Datos obtenidos de CryptoCompare para {crypto_name}")
-                self.debug_data_quality(df, crypto_name)
+        if self.hedge:
+            df = self._get_hedged(crypto_name, days, timeframe)
+        else:
+            for provider in PROVEEDORES_HISTORICO:
+                if df is None and self.health.disponible(provider):
+                    registro.debug("{}   Probando {}...", Fore.CYAN, NOMBRES_PROVEEDOR[provider])
+                    df = self._fetch_from(provider, crypto_name, days, timeframe)
+                    if df is not None:
+                        self._report_source(provider, crypto_name, df)
         
-        if df is None and self.api_status.get('coincap', False):
-            print(f"{Fore.CYAN}   Probando CoinCap...")
+        if df is None and timeframe == 'daily' and self.health.disponible('coincap'):
+            registro.debug("{}   Probando CoinCap...", Fore.CYAN)
             df = self._get_from_coincap(crypto_config.get('coincap'), days)
             if df is not None:
-                print(f"{Fore.YELLOW}⚠️  Datos básicos obtenidos de CoinCap para {crypto_name}")
-                self.debug_data_quality(df, crypto_name)
+                self._report_source('coincap', crypto_name, df)
         
         if df is not None:
             # Verificar que tenemos suficientes datos
             if len(df) < 200:
-                print(f"{Fore.YELLOW}⚠️  Solo {len(df)} días de datos para {crypto_name} (se necesitan 200 para MA200)")
+                registro.warning("⚠️  Solo {} velas {} para {} (se necesitan 200 para MA200)",
+                                 len(df), timeframe, crypto_name)
             
-            # Guardar en cache
-            self.cache[cache_key] = {
-                'data': df,
-                'timestamp': datetime.now()
-            }
+            if self.compact:
+                df = compactar(df)
         else:
-            print(f"{Fore.RED}❌ No se pudieron obtener datos para {crypto_name}")
+            registro.error("❌ No se pudieron obtener datos para {}", crypto_name)
+
+        return df
+
+    def _fetch_from(self, provider, crypto_name, days, timeframe='daily'):
+        """Un intento del failover: histórico de un proveedor (local + cola descargada) o None"""
+        fetcher = self._get_from_coingecko if provider == 'coingecko' else self._get_from_cryptocompare
+        crypto_id = self.universe.get(crypto_name, {}).get(provider)
+        return self._get_incremental(provider, crypto_id, days, fetcher, timeframe)
+
+    def fetch_tail(self, crypto_name, provider, since, timeframe='daily'):
+        """
+        Solo las velas desde `since` (incluida) de un proveedor, sin tocar el
+        almacén ni el cache. None si el proveedor falla o no tiene la cripto.
+        """
+        if provider not in PROVEEDORES_HISTORICO or not self.health.disponible(provider):
+            return None
+        crypto_id = self.universe.get(crypto_name, {}).get(provider)
+        if crypto_id is None:
+            return None
+        
+        fetcher = self._get_from_coingecko if provider == 'coingecko' else self._get_from_cryptocompare
+        since = pd.Timestamp(since)
+        # +1 día de solapamiento: la vela de `since` puede haber cambiado
+        days = max((pd.Timestamp(datetime.now()) - since).days + 1, 1)
+        metricas.incrementar('colas_descargadas_total', proveedor=provider, timeframe=timeframe)
+        tail = fetcher(crypto_id, days, min_days=1, timeframe=timeframe)
+        if tail is None:
+            return None
+        return tail[tail.index >= since]
+
+    def _report_source(self, provider, crypto_name, df):
+        metricas.incrementar('fuente_datos_total', proveedor=provider)
+        self.sources[crypto_name] = provider
+        if provider == 'coincap':
+            registro.warning("⚠️  Datos básicos obtenidos de CoinCap para {}", crypto_name)
+        else:
+            registro.info("{}✅ Datos obtenidos de {} para {}", Fore.GREEN, NOMBRES_PROVEEDOR[provider], crypto_name)
+        self.debug_data_quality(df, crypto_name)
+
+    def _hedge_executor(self):
+        with self._hedge_pool_lock:
+            if self._hedge_pool is None:
+                # Un intento principal y uno de cobertura por cada hilo de descarga
+                self._hedge_pool = ThreadPoolExecutor(max_workers=2 * MAX_WORKERS_DEFAULT,
+                                                      thread_name_prefix='cobertura')
+            return self._hedge_pool
+
+    def _get_hedged(self, crypto_name, days, timeframe='daily'):
+        """
+        Failover con cobertura: si el proveedor en curso no responde dentro de
+        su p95 reciente se lanza el siguiente en paralelo y gana la primera
+        respuesta válida. Un fallo lanza el siguiente sin esperar.
+        
+        Los intentos aún en cola se cancelan; una solicitud HTTP ya enviada
+        no se puede interrumpir, pero su resultado se descarta.
+        """
+        # La disponibilidad se consulta al lanzar cada intento, no de antemano
+        candidates = PROVEEDORES_HISTORICO
+        cancelled = threading.Event()
+        pool = self._hedge_executor()
+        pending = {}
+        launched = 0
+        hedged = False
         
+        def attempt(provider):
+            if cancelled.is_set():
+                return None
+            return self._fetch_from(provider, crypto_name, days, timeframe)
+        
+        def launch():
+            """Lanza el siguiente proveedor disponible; None si no queda ninguno"""
+            nonlocal launched
+            while launched < len(candidates):
+                provider = candidates[launched]
+                launched += 1
+                if self.health.disponible(provider):
+                    registro.debug("{}   Probando {}...", Fore.CYAN, NOMBRES_PROVEEDOR[provider])
+                    pending[pool.submit(attempt, provider)] = provider
+                    return provider
+            return None
+        
+        last = None
+        while pending or launched < len(candidates):
+            if not pending:
+                last = launch()
+                if last is None:
+                    break
+            
+            delay = self.health.retardo_cobertura(last) if launched < len(candidates) else None
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # El proveedor en curso supera su p95: cubrir con el siguiente disponible
+                slow = last
+                last = launch()
+                if last is not None:
+                    hedged = True
+                    metricas.incrementar('cobertura_disparos_total', proveedor=last)
+                    registro.debug("{}   ⏱️ {} tarda más de {:.2f}s, lanzando {} en paralelo",
+                                   Fore.YELLOW, NOMBRES_PROVEEDOR[slow], delay, NOMBRES_PROVEEDOR[last])
+                else:
+                    last = slow
+                continue
+            
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    df = future.result()
+                except Exception as e:
+                    registro.error("   ❌ Error {} para {}: {}", NOMBRES_PROVEEDOR[provider], crypto_name, e)
+                    df = None
+                if df is not None:
+                    cancelled.set()
+                    for other in pending:
+                        other.cancel()
+                    metricas.incrementar('cobertura_resultado_total', proveedor=provider,
+                                         cubierto=str(hedged).lower())
+                    self._report_source(provider, crypto_name, df)
+                    return df
+        return None
+
+    def _stored_source(self, crypto_name, days, timeframe):
+        """Temporalidad más fina ya guardada que cubre la ventana (remuestreo sin red) o None"""
+        crypto_config = self.universe.get(crypto_name, {})
+        window_start = pd.Timestamp(datetime.now()).normalize() - pd.Timedelta(days=days)
+        for source in fuentes_posibles(timeframe):
+            for provider in ('coingecko', 'cryptocompare'):
+                crypto_id = crypto_config.get(provider)
+                if crypto_id and self.store.cubre_desde(provider, crypto_id, source, window_start):
+                    return source
+        return None
+
+    def _get_resampled(self, crypto_name, days, timeframe, fresh=False):
+        """Velas derivadas (4h, weekly) remuestreando la serie nativa más fina disponible"""
+        return self._get_cached(crypto_name, self._get_cache_key(crypto_name, timeframe, days),
+                                lambda: self._load_resampled(crypto_name, days, timeframe), fresh)
+
+    def _load_resampled(self, crypto_name, days, timeframe):
+        # Ventana suficiente para 200 velas de la temporalidad pedida
+        days = max(days, dias_para_velas(timeframe, 200))
+        source = self._stored_source(crypto_name, days, timeframe) or FUENTE[timeframe]
+        # Lo remuestreado se guarda como fresco: la serie fuente tampoco puede ser obsoleta
+        base = self.get_crypto_data(crypto_name, days=days, timeframe=source, fresh=True)
+        if base is None:
+            return None
+        
+        with metricas.temporizador('remuestreo_segundos', timeframe=timeframe):
+            df = remuestrear(base, timeframe)
+        metricas.incrementar('remuestreo_total', timeframe=timeframe, fuente=source)
+        registro.debug("   🕒 {}: {} velas {} -> {} velas {}", crypto_name, len(base), source, len(df), timeframe)
+        if self.compact:
+            df = compactar(df)
         return df
-    
+
+    def _register_quotes(self, crypto_names):
+        """Registra los ids de CoinCap del universo para resolver sus precios en una sola llamada"""
+        self.quotes.registrar(
+            [self.universe.get(name, {}).get('coincap') for name in crypto_names], 'coincap'
+        )
+
+    def get_multiple_crypto_data(self, crypto_names, days=90, max_workers=MAX_WORKERS_DEFAULT, timeframe='daily',
+                                 fresh=False):
+        """Obtiene datos de varias criptomonedas en paralelo (mismo failover y fresh que get_crypto_data)"""
+        crypto_names = list(crypto_names)
+        self._register_quotes(crypto_names)
+        return procesar_en_paralelo(
+            lambda crypto_name: self.get_crypto_data(crypto_name, days, timeframe, fresh),
+            crypto_names,
+            max_workers=max_workers
+        )
+
     def debug_data_quality(self, df, crypto_name):
-        """Función de diagnóstico para verificar calidad de datos"""
-        print(f"\n{Fore.YELLOW}🔍 DIAGNÓSTICO PARA {crypto_name}:")
-        
+        """Función de diagnóstico para verificar calidad de datos (nivel DEBUG)"""
         if df is None:
-            print(f"{Fore.RED}❌ DataFrame es None")
+            registro.error("❌ DataFrame es None para {}", crypto_name)
             return False
         
-        print(f"{Fore.BLUE}📊 Información básica:")
-        print(f"   - Filas totales: {len(df)}")
-        print(f"   - Columnas: {list(df.columns)}")
-        print(f"   - Rango de fechas: {df.index.min()} a {df.index.max()}")
-        
         if 'price' not in df.columns:
-            print(f"{Fore.RED}❌ No existe columna 'price'")
+            registro.error("❌ No existe columna 'price' para {}", crypto_name)
             return False
         
-        print(f"   - Precios válidos: {df['price'].notna().sum()}/{len(df)}")
-        print(f"   - Precio mín: ${df['price'].min():.2f}")
-        print(f"   - Precio máx: ${df['price'].max():.2f}")
-        print(f"   - Precio actual: ${df['price'].iloc[-1]:.2f}")
+        if not registro.habilitado('DEBUG'):
+            return True
+        
+        registro.debug("\n{}🔍 DIAGNÓSTICO PARA {}:", Fore.YELLOW, crypto_name)
+        registro.debug("{}📊 Información básica:", Fore.BLUE)
+        registro.debug("   - Filas totales: {}", len(df))
+        registro.debug("   - Columnas: {}", list(df.columns))
+        registro.debug("   - Rango de fechas: {} a {}", df.index.min(), df.index.max())
+        registro.debug("   - Precios válidos: {}/{}", df['price'].notna().sum(), len(df))
+        registro.debug("   - Precio mín: ${:.2f}", df['price'].min())
+        registro.debug("   - Precio máx: ${:.2f}", df['price'].max())
+        registro.debug("   - Precio actual: ${:.2f}", df['price'].iloc[-1])
         
         # Verificar MAs si existen
         for ma in ['MA9', 'MA21', 'MA50', 'MA200']:
             if ma in df.columns:
                 valid_count = df[ma].notna().sum()
-                print(f"   - {ma}: {valid_count}/{len(df)} valores válidos")
+                registro.debug("   - {}: {}/{} valores válidos", ma, valid_count, len(df))
                 if valid_count > 0:
-                    print(f"     Último valor: ${df[ma].iloc[-1]:.2f}" if not pd.isna(df[ma].iloc[-1]) else "     Último valor: N/A")
+                    ultimo = df[ma].iloc[-1]
+                    if pd.isna(ultimo):
+                        registro.debug("     Último valor: N/A")
+                    else:
+                        registro.debug("     Último valor: ${:.2f}", ultimo)
         
         return True
     
+    def analysis_context(self, df):
+        """Contexto memoizado del DataFrame (se renueva si cambian filas, columnas o último precio)"""
+        return self.contexts.obtener(df)
+
     def detect_golden_death_cross(self, df):
         """Detecta Golden Cross y Death Cross - VERSIÓN FINAL"""
         if df is None:
             return {"status": "Error", "days_since": 0, "description": "Sin datos"}
         
+        ctx = self.analysis_context(df)
+        return ctx.memo('cross', lambda: self._detect_golden_death_cross(ctx))
+
+    def _detect_golden_death_cross(self, ctx):
+        df = ctx.df
         try:
-            print(f"{Fore.BLUE}🔍 Analizando cruces Golden/Death...")
+            registro.debug("{}🔍 Analizando cruces Golden/Death...", Fore.BLUE)
             
             # Verificar que tenemos las columnas necesarias
             if 'MA50' not in df.columns or 'MA200' not in df.columns:
-                print(f"{Fore.RED}❌ Faltan columnas MA50 o MA200")
+                registro.error("❌ Faltan columnas MA50 o MA200")
                 return {"status": "Error", "days_since": 0, "description": "Faltan columnas MA50 o MA200"}
             
-            # Filtrar datos válidos
-            valid_data = df.dropna(subset=['MA50', 'MA200'])
+            # Filtrar datos válidos (posiciones, sin copiar el DataFrame)
+            valid_rows = ctx.posiciones_validas(['MA50', 'MA200'])
             
-            if len(valid_data) < 2:
-                print(f"{Fore.RED}❌ Insuficientes datos válidos para análisis de cruces")
+            if len(valid_rows) < 2:
+                registro.warning("❌ Insuficientes datos válidos para análisis de cruces")
                 return {"status": "Sin datos", "days_since": 0, "description": "Datos insuficientes para cruces"}
             
-            print(f"   📊 Datos válidos para cruces: {len(valid_data)}")
+            registro.debug("   📊 Datos válidos para cruces: {}", len(valid_rows))
             
-            # Usar hasta 60 días para detectar cruces (más amplio)
-            recent_data = valid_data.tail(min(60, len(valid_data)))
+            ma50 = ctx.columna('MA50')[valid_rows]
+            ma200 = ctx.columna('MA200')[valid_rows]
             
-            if len(recent_data) < 2:
-                return {"status": "Sin datos", "days_since": 0, "description": "Datos insuficientes"}
+            if registro.habilitado('DEBUG'):
+                registro.debug("   📈 Analizando {} puntos de datos recientes", min(60, len(ma50)))
+                registro.debug("   📊 MA50 actual: ${:.2f}", ma50[-1])
+                registro.debug("   📊 MA200 actual: ${:.2f}", ma200[-1])
             
-            ma50 = recent_data['MA50'].values
-            ma200 = recent_data['MA200'].values
+            # Cruce más reciente dentro de los últimos 60 días (detección vectorizada)
+            cross = ultimo_cruce(ma50, ma200, ventana=60)
             
-            print(f"   📈 Analizando {len(ma50)} puntos de datos recientes")
-            print(f"   📊 MA50 actual: ${ma50[-1]:.2f}")
-            print(f"   📊 MA200 actual: ${ma200[-1]:.2f}")
+            if cross is not None:
+                direction, cross_day, _ = cross
+                status = "Golden Cross" if direction == ALCISTA else "Death Cross"
+                registro.debug("   {} {} detectado hace {} días",
+                               '🟢' if direction == ALCISTA else '🔴', status, cross_day)
+                return {"status": status, "days_since": cross_day, "description": f"{status} hace {cross_day} días"}
             
-            # Detectar cruces recientes
-            cross_up = False
-            cross_down = False
-            cross_day = 0
+            # Verificar estado actual
+            current_ma50 = ma50[-1]
+            current_ma200 = ma200[-1]
             
-            # Revisar desde el más reciente hacia atrás
-            for i in range(len(ma50)-1, 0, -1):
-                # Golden Cross: MA50 cruza por encima de MA200
-                if ma50[i-1] <= ma200[i-1] and ma50[i] > ma200[i]:
-                    cross_up = True
-                    cross_day = len(ma50) - i
-                    print(f"   🟢 Golden Cross detectado hace {cross_day} días")
-                    break
-                # Death Cross: MA50 cruza por debajo de MA200
-                elif ma50[i-1] >= ma200[i-1] and ma50[i] < ma200[i]:
-                    cross_down = True
-                    cross_day = len(ma50) - i
-                    print(f"   🔴 Death Cross detectado hace {cross_day} días")
-                    break
+            # Calcular la diferencia porcentual
+            diff_pct = ((current_ma50 - current_ma200) / current_ma200) * 100
             
-            if cross_up:
-                return {"status": "Golden Cross", "days_since": cross_day, "description": f"Golden Cross hace {cross_day} días"}
-            elif cross_down:
-                return {"status": "Death Cross", "days_since": cross_day, "description": f"Death Cross hace {cross_day} días"}
+            if current_ma50 > current_ma200:
+                registro.debug("   📊 MA50 está {:.1f}% por encima de MA200", diff_pct)
+                return {"status": "MA50 > MA200", "days_since": 0, "description": f"MA50 {diff_pct:.1f}% por encima"}
             else:
-                # Verificar estado actual
-                current_ma50 = ma50[-1]
-                current_ma200 = ma200[-1]
-                
-                # Calcular la diferencia porcentual
-                diff_pct = ((current_ma50 - current_ma200) / current_ma200) * 100
-                
-                if current_ma50 > current_ma200:
-                    print(f"   📊 MA50 está {diff_pct:.1f}% por encima de MA200")
-                    return {"status": "MA50 > MA200", "days_since": 0, "description": f"MA50 {diff_pct:.1f}% por encima"}
-                else:
-                    print(f"   📊 MA50 está {abs(diff_pct):.1f}% por debajo de MA200")
-                    return {"status": "MA50 < MA200", "days_since": 0, "description": f"MA50 {abs(diff_pct):.1f}% por debajo"}
+                registro.debug("   📊 MA50 está {:.1f}% por debajo de MA200", abs(diff_pct))
+                return {"status": "MA50 < MA200", "days_since": 0, "description": f"MA50 {abs(diff_pct):.1f}% por debajo"}
                     
         except Exception as e:
-            print(f"{Fore.RED}❌ Error analizando cruces: {e}")
-            import traceback
-            traceback.print_exc()
+            registro.error("❌ Error analizando cruces: {}", e)
+            if registro.habilitado('DEBUG'):
+                import traceback
+                traceback.print_exc()
             return {"status": "Error", "days_since": 0, "description": f"Error: {str(e)}"}
 
-    def calculate_technical_indicators(self, df):
-        """Calcula todos los indicadores técnicos - VERSIÓN ULTRA MEJORADA"""
+    def detect_cross_history(self, dataframes, fast='MA50', slow='MA200', labels=None):
+        """
+        Todos los cruces fast/slow del histórico completo para varias criptos
+        en una sola pasada (p.ej. MA9/MA21 o MACD/MACD_signal).
+        
+        Returns:
+            pd.DataFrame: Un evento por fila (activo, timestamp, evento, magnitud...).
+        """
+        if labels is None:
+            labels = ("Golden Cross", "Death Cross") if (fast, slow) == ('MA50', 'MA200') else ("Cruce alcista", "Cruce bajista")
+        with metricas.temporizador('cruces_segundos', modo='historico'):
+            return detectar_cruces(dataframes, fast, slow, etiquetas=labels)
+
+    def _validate_for_indicators(self, df):
+        """Verifica que el DataFrame tiene precios suficientes para los indicadores"""
         if df is None:
-            print(f"{Fore.RED}❌ DataFrame es None")
-            return None
+            registro.error("❌ DataFrame es None")
+            return False
         
         if len(df) < 200:
-            print(f"{Fore.YELLOW}⚠️  Solo {len(df)} días de datos (se recomiendan 200+ para MA200)")
-            # Continuar con menos datos pero ajustar ventanas
+            registro.warning("⚠️  Solo {} días de datos (se recomiendan 200+ para MA200)", len(df))
+            # Continuar con menos datos: las ventanas usan min_periods = len(df)
+        
+        # Asegurar que tenemos la columna price
+        if 'price' not in df.columns:
+            registro.error("❌ Error: No se encontró columna 'price'")
+            return False
+        
+        # Verificar datos válidos
+        valid_prices = df['price'].notna().sum()
+        registro.debug("   📊 Precios válidos: {}/{}", valid_prices, len(df))
+        
+        if valid_prices < 50:
+            registro.error("❌ Insuficientes precios válidos para análisis")
+            return False
+        
+        return True
+
+    def _report_indicators(self, df):
+        """Verifica los indicadores calculados (detalle a nivel DEBUG); False si faltan MA50/MA200"""
+        # Solo continuar si tenemos al menos MA50 y MA200
+        if not df['MA50'].notna().any() or not df['MA200'].notna().any():
+            registro.error("❌ No se pudieron calcular MA50 o MA200")
+            return False
+        
+        if not registro.habilitado('DEBUG'):
+            return True
+        
+        for ma_name in ['MA9', 'MA21', 'MA50', 'MA200']:
+            registro.debug("   📈 {}: {}/{} valores calculados", ma_name, df[ma_name].notna().sum(), len(df))
+        registro.debug("   📊 RSI: {}/{} valores calculados", df['RSI'].notna().sum(), len(df))
+        registro.debug("   📈 MACD: {}/{} valores calculados", df['MACD'].notna().sum(), len(df))
+        
+        # Mostrar últimos valores para debug
+        if len(df) > 0:
+            last_row = df.iloc[-1]
+            registro.debug("{}   📋 Últimos valores:", Fore.CYAN)
+            registro.debug("      Precio: ${:.2f}", last_row['price'])
+            for column, fmt in (('MA50', '${:.2f}'), ('MA200', '${:.2f}'), ('RSI', '{:.1f}')):
+                value = fmt.format(last_row[column]) if not pd.isna(last_row[column]) else "N/A"
+                registro.debug("      {}: {}", column, value)
+        
+        registro.debug("{}✅ Indicadores calculados correctamente", Fore.GREEN)
+        return True
+
+    def calculate_technical_indicators(self, df):
+        """Calcula todos los indicadores técnicos - VERSIÓN ULTRA MEJORADA"""
+        if not self._validate_for_indicators(df):
+            return None
         
         try:
-            print(f"{Fore.BLUE}🔄 Calculando indicadores técnicos...")
-            
-            # Asegurar que tenemos la columna price
-            if 'price' not in df.columns:
-                print(f"{Fore.RED}❌ Error: No se encontró columna 'price'")
-                return None
-            
-            # Verificar datos válidos
-            valid_prices = df['price'].notna().sum()
-            print(f"   📊 Precios válidos: {valid_prices}/{len(df)}")
-            
-            if valid_prices < 50:
-                print(f"{Fore.RED}❌ Insuficientes precios válidos para análisis")
-                return None
-            
-            # Calcular medias móviles con manejo de datos limitados
-            min_periods_9 = min(9, len(df))
-            min_periods_21 = min(21, len(df))
-            min_periods_50 = min(50, len(df))
-            min_periods_200 = min(200, len(df))
-            
-            df['MA9'] = df['price'].rolling(window=9, min_periods=min_periods_9).mean()
-            df['MA21'] = df['price'].rolling(window=21, min_periods=min_periods_21).mean()
-            df['MA50'] = df['price'].rolling(window=50, min_periods=min_periods_50).mean()
-            df['MA200'] = df['price'].rolling(window=200, min_periods=min_periods_200).mean()
-            
-            # Verificar que se calcularon correctamente
-            ma_stats = {}
-            for ma_name in ['MA9', 'MA21', 'MA50', 'MA200']:
-                valid_count = df[ma_name].notna().sum()
-                ma_stats[ma_name] = valid_count
-                print(f"   📈 {ma_name}: {valid_count}/{len(df)} valores calculados")
-            
-            # Solo continuar si tenemos al menos MA50 y MA200
-            if ma_stats['MA50'] == 0 or ma_stats['MA200'] == 0:
-                print(f"{Fore.RED}❌ No se pudieron calcular MA50 o MA200")
-                return None
+            registro.debug("{}🔄 Calculando indicadores técnicos...", Fore.BLUE)
             
-            # Pendientes de las medias móviles
-            df['MA9_slope'] = df['MA9'].diff()
-            df['MA21_slope'] = df['MA21'].diff()
-            df['MA50_slope'] = df['MA50'].diff()
-            df['MA200_slope'] = df['MA200'].diff()
-            
-            # RSI
-            try:
-                df['RSI'] = ta.momentum.RSIIndicator(df['price'], window=14).rsi()
-                rsi_count = df['RSI'].notna().sum()
-                print(f"   📊 RSI: {rsi_count}/{len(df)} valores calculados")
-            except Exception as e:
-                print(f"{Fore.YELLOW}⚠️  Error calculando RSI: {e}")
-                df['RSI'] = np.nan
-            
-            # MACD
-            try:
-                macd_indicator = ta.trend.MACD(df['price'])
-                df['MACD'] = macd_indicator.macd()
-                df['MACD_signal'] = macd_indicator.macd_signal()
-                df['MACD_histogram'] = macd_indicator.macd_diff()
-                
-                macd_count = df['MACD'].notna().sum()
-                print(f"   📈 MACD: {macd_count}/{len(df)} valores calculados")
-            except Exception as e:
-                print(f"{Fore.YELLOW}⚠️  Error calculando MACD: {e}")
-                df['MACD'] = np.nan
-                df['MACD_signal'] = np.nan
-                df['MACD_histogram'] = np.nan
-            
-            # Pendientes del MACD
-            df['MACD_slope'] = df['MACD'].diff()
-            df['MACD_signal_slope'] = df['MACD_signal'].diff()
-            
-            # Bollinger Bands
-            try:
-                bollinger = ta.volatility.BollingerBands(df['price'])
-                df['BB_upper'] = bollinger.bollinger_hband()
-                df['BB_middle'] = bollinger.bollinger_mavg()
-                df['BB_lower'] = bollinger.bollinger_lband()
-            except Exception as e:
-                print(f"{Fore.YELLOW}⚠️  Error calculando Bollinger Bands: {e}")
-            
-            # Mostrar últimos valores para debug
-            if len(df) > 0:
-                last_row = df.iloc[-1]
-                print(f"{Fore.CYAN}   📋 Últimos valores:")
-                print(f"      Precio: ${last_row['price']:.2f}")
-                
-                if not pd.isna(last_row['MA50']):
-                    print(f"      MA50: ${last_row['MA50']:.2f}")
-                else:
-                    print(f"      MA50: N/A")
-                    
-                if not pd.isna(last_row['MA200']):
-                    print(f"      MA200: ${last_row['MA200']:.2f}")
-                else:
-                    print(f"      MA200: N/A")
-                    
-                if not pd.isna(last_row['RSI']):
-                    print(f"      RSI: {last_row['RSI']:.1f}")
+            # MAs, pendientes, RSI, MACD y Bollinger con el motor vectorizado
+            # (+ ATR, Estocástico, Keltner y VWAP si la serie trae OHLC)
+            with metricas.temporizador('indicadores_segundos', modo='activo'):
+                if self.compact:
+                    df = indicadores_compactos({'activo': df})['activo']
                 else:
-                    print(f"      RSI: N/A")
+                    aplicar_indicadores({'activo': df})
+                    aplicar_indicadores_rango({'activo': df})
+            metricas.incrementar('indicadores_filas_total', len(df), modo='activo')
             
-            print(f"{Fore.GREEN}✅ Indicadores calculados correctamente")
-            return df
+            return df if self._report_indicators(df) else None
             
         except Exception as e:
-            print(f"{Fore.RED}❌ Error calculando indicadores: {e}")
-            import traceback
-            traceback.print_exc()
+            registro.error("❌ Error calculando indicadores: {}", e)
+            if registro.habilitado('DEBUG'):
+                import traceback
+                traceback.print_exc()
             return None
 
+    def calculate_indicators_batch(self, dataframes):
+        """Calcula los indicadores de varias criptos en una sola pasada vectorizada"""
+        valid = {}
+        results = {}
+        for crypto_name, df in dataframes.items():
+            if self._validate_for_indicators(df):
+                valid[crypto_name] = df
+            else:
+                results[crypto_name] = None
+        
+        try:
+            registro.debug("{}🔄 Calculando indicadores técnicos para {} criptos...", Fore.BLUE, len(valid))
+            with metricas.temporizador('indicadores_segundos', modo='lote'):
+                if self.compact:
+                    valid = indicadores_compactos(valid)
+                else:
+                    aplicar_indicadores(valid)
+                    aplicar_indicadores_rango(valid)
+            metricas.incrementar('indicadores_filas_total', sum(len(df) for df in valid.values()), modo='lote')
+        except Exception as e:
+            registro.error("❌ Error calculando indicadores: {}", e)
+            return {crypto_name: None for crypto_name in dataframes}
+        
+        for crypto_name, df in valid.items():
+            results[crypto_name] = df if self._report_indicators(df) else None
+        
+        # Conservar el orden de entrada
+        return {crypto_name: results[crypto_name] for crypto_name in dataframes}
+
     def analyze_ma_alignment(self, df):
         """Analiza el orden de las medias móviles - VERSIÓN MEJORADA"""
         if df is None:
             return {"status": "Error", "score": 0, "description": "Sin datos"}
         
+        ctx = self.analysis_context(df)
+        return ctx.memo('ma_alignment', lambda: self._analyze_ma_alignment(ctx))
+
+    def _analyze_ma_alignment(self, ctx):
         try:
-            # Filtrar datos válidos
-            valid_data = df.dropna(subset=['MA9', 'MA21', 'MA50', 'MA200'])
+            # Última fila con las cuatro MAs
+            mas = ['MA9', 'MA21', 'MA50', 'MA200']
+            valid_rows = ctx.posiciones_validas(mas)
             
-            if len(valid_data) == 0:
+            if len(valid_rows) == 0:
                 return {"status": "Sin datos", "score": 0, "description": "MAs no calculadas"}
             
-            last_row = valid_data.iloc[-1]
+            return self._ma_alignment_from_values(ctx.valores(mas, valid_rows[-1]))
+                    
+        except Exception as e:
+            return {"status": "Error", "score": 0, "description": f"Error: {str(e)}"}
+
+    def _ma_alignment_from_values(self, last_row):
+        """Clasifica el orden de MA9/MA21/MA50/MA200 de una fila (Series o dict)"""
+        try:
             mas = [last_row['MA9'], last_row['MA21'], last_row['MA50'], last_row['MA200']]
             
             # Verificar que todas las MAs están disponibles
@@ -589,16 +881,23 @@ class CryptoAnalyzer:
         if df is None:
             return {"rsi_divergence": "Sin datos", "macd_divergence": "Sin datos"}
         
+        ctx = self.analysis_context(df)
+        return ctx.memo('divergences', lambda: self._detect_divergences(ctx))
+
+    def _detect_divergences(self, ctx):
         try:
-            # Últimos 20 días para análisis
-            recent_data = df.dropna().tail(20)
+            # Últimos 20 días con las columnas que se comparan (las de rango, como
+            # STOCH_K en una ventana plana, pueden faltar sin que importe aquí)
+            columns = ['price', 'RSI', 'MACD']
+            recent_rows = ctx.posiciones_validas(columns)[-20:]
             
-            if len(recent_data) < 10:
+            if len(recent_rows) < 10:
                 return {"rsi_divergence": "Datos insuficientes", "macd_divergence": "Datos insuficientes"}
             
-            prices = recent_data['price'].values
-            rsi = recent_data['RSI'].values
-            macd = recent_data['MACD'].values
+            recent = ctx.valores(columns, recent_rows)
+            prices = recent['price']
+            rsi = recent['RSI']
+            macd = recent['MACD']
             
             # Análisis simplificado de divergencias
             price_trend = prices[-1] - prices[0]
@@ -629,51 +928,71 @@ class CryptoAnalyzer:
         if df is None:
             return {"signal": "Error", "score": 0, "confidence": 0, "description": "Sin datos"}
         
+        ctx = self.analysis_context(df)
+        return ctx.memo('signals', lambda: self._get_trading_signals(df, ctx))
+
+    def _get_trading_signals(self, df, ctx):
         try:
-            last_row = df.dropna().iloc[-1]
-            
-            # Análisis de componentes
-            ma_analysis = self.analyze_ma_alignment(df)
-            cross_analysis = self.detect_golden_death_cross(df)
-            divergences = self.detect_divergences(df)
+            with metricas.temporizador('senales_segundos'):
+                # Última fila con las columnas que lee el score (no todas las del DataFrame)
+                columns = ['RSI', 'MACD', 'MACD_signal', 'MACD_slope', 'MA9_slope']
+                valid_rows = ctx.posiciones_validas(columns)
+                if len(valid_rows) == 0:
+                    return {"signal": "Error", "score": 0, "confidence": 0, "description": "Error: sin filas completas"}
+                
+                last_row = ctx.valores(columns, valid_rows[-1])
+                
+                # Análisis de componentes
+                ma_analysis = self.analyze_ma_alignment(df)
+                cross_analysis = self.detect_golden_death_cross(df)
+                divergences = self.detect_divergences(df)
+                
+                return self._combine_signals(
+                    ma_analysis, cross_analysis, divergences,
+                    last_row['RSI'], last_row['MACD'], last_row['MACD_signal'],
+                    last_row['MACD_slope'], last_row['MA9_slope']
+                )
             
+        except Exception as e:
+            return {"signal": "Error", "score": 0, "confidence": 0, "description": f"Error: {e}"}
+
+    def _combine_signals(self, ma_analysis, cross_analysis, divergences,
+                         rsi, macd, macd_signal, macd_slope, ma9_slope):
+        """Score de confluencia y señal a partir de los componentes ya calculados"""
+        try:
             # RSI
-            rsi = last_row['RSI']
-            rsi_signal = 1 if rsi < 30 else -1 if rsi > 70 else 0
+            rsi_signal = 1 if rsi < NIVELES_RSI[0] else -1 if rsi > NIVELES_RSI[1] else 0
             
             # MACD
-            macd = last_row['MACD']
-            macd_signal = last_row['MACD_signal']
             macd_cross = 1 if macd > macd_signal else -1 if macd < macd_signal else 0
             
             # Pendientes
-            macd_slope = last_row['MACD_slope']
-            ma9_slope = last_row['MA9_slope']
-            
             slope_signal = 0
             if not pd.isna(macd_slope) and not pd.isna(ma9_slope):
                 slope_signal = 1 if (macd_slope > 0 and ma9_slope > 0) else -1 if (macd_slope < 0 and ma9_slope < 0) else 0
             
             # Calcular score total
+            # (mismos pesos y umbrales que el backtest histórico)
             total_score = (
-                ma_analysis['score'] * 0.3 +
-                rsi_signal * 0.2 +
-                macd_cross * 0.2 +
-                slope_signal * 0.15 +
-                (1 if cross_analysis['status'] == 'Golden Cross' else -1 if cross_analysis['status'] == 'Death Cross' else 0) * 0.15
+                ma_analysis['score'] * PESOS_SCORE['ma'] +
+                rsi_signal * PESOS_SCORE['rsi'] +
+                macd_cross * PESOS_SCORE['macd'] +
+                slope_signal * PESOS_SCORE['pendientes'] +
+                (1 if cross_analysis['status'] == 'Golden Cross' else -1 if cross_analysis['status'] == 'Death Cross' else 0) * PESOS_SCORE['cruce']
             )
             
             # Determinar señal
-            if total_score > 1.5:
+            weak, strong = UMBRALES_SEÑAL
+            if total_score > strong:
                 signal = "COMPRA FUERTE"
                 confidence = min(int(abs(total_score) * 20), 100)
-            elif total_score > 0.5:
+            elif total_score > weak:
                 signal = "COMPRA"
                 confidence = min(int(abs(total_score) * 25), 100)
-            elif total_score < -1.5:
+            elif total_score < -strong:
                 signal = "VENTA FUERTE"
                 confidence = min(int(abs(total_score) * 20), 100)
-            elif total_score < -0.5:
+            elif total_score < -weak:
                 signal = "VENTA"
                 confidence = min(int(abs(total_score) * 25), 100)
             else:
@@ -697,6 +1016,54 @@ class CryptoAnalyzer:
         except Exception as e:
             return {"signal": "Error", "score": 0, "confidence": 0, "description": f"Error: {e}"}
     
+    def seed_indicator_state(self, crypto_name, df):
+        """Siembra el estado incremental de indicadores con el histórico de una cripto"""
+        state = EstadoIndicadores().sembrar(df['price'].dropna().to_numpy())
+        self.indicator_states[crypto_name] = state
+        return state
+
+    def update_with_new_bar(self, crypto_name, price):
+        """Añade una barra cerrada en O(1) y devuelve las señales recalculadas"""
+        state = self.indicator_states.get(crypto_name)
+        if state is None:
+            return {"signal": "Error", "score": 0, "confidence": 0,
+                    "description": f"Sin estado incremental para {crypto_name}"}
+        
+        state.actualizar(float(price))
+        return self.get_trading_signals_from_state(state)
+
+    def get_trading_signals_from_state(self, state):
+        """Equivalente a get_trading_signals usando solo el estado incremental"""
+        values = state.ultimo
+        if not values:
+            return {"signal": "Error", "score": 0, "confidence": 0, "description": "Sin datos"}
+        
+        return self._combine_signals(
+            self._ma_alignment_from_values(values),
+            state.estado_cruce(),
+            state.divergencias(),
+            values['RSI'], values['MACD'], values['MACD_signal'],
+            values['MACD_slope'], values['MA9_slope']
+        )
+    
+    def memory_report(self, crypto_names, days=200, max_workers=MAX_WORKERS_DEFAULT):
+        """Bytes por cripto con indicadores estándar (float64) frente al modo compacto"""
+        data = self.get_multiple_crypto_data(crypto_names, days=days, max_workers=max_workers)
+        return comparar({name: df for name, df in data.items() if self._validate_for_indicators(df)})
+
+    def backtest_signals(self, crypto_names, days=730, max_workers=MAX_WORKERS_DEFAULT, **params):
+        """
+        Backtest histórico del score de get_trading_signals para varias criptos.
+        
+        Returns:
+            ResultadoBacktest: .resumen con retorno, buy & hold, drawdown y tasa de
+            acierto por cripto; .serie(nombre) con score/señal/posición por barra.
+        """
+        data = self.get_multiple_crypto_data(crypto_names, days=days, max_workers=max_workers)
+        prices = {name: df[['price']] for name, df in data.items() if df is not None}
+        with metricas.temporizador('backtest_segundos'):
+            return backtest(prices, **params)
+
     def format_signal_display(self, signal_data):
         """Formatea la señal para mostrar con colores"""
         signal = signal_data["signal"]
@@ -715,47 +1082,135 @@ class CryptoAnalyzer:
         else:
             return f"{Fore.YELLOW}⚪ {signal}{Style.RESET_ALL}"
 
-def main():
-    print(f"{Fore.CYAN}{'='*80}")
-    print(f"{Fore.CYAN}🚀 ANALIZADOR CRYPTO - FASE 1 COMPLETA")
-    print(f"{Fore.CYAN}📊 Análisis Técnico Avanzado Multi-API")
-    print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
-    
-    analyzer = CryptoAnalyzer()
-    
-    print(f"\n{Fore.BLUE}🔄 Iniciando análisis completo...{Style.RESET_ALL}")
-    
-    tabla_principal = []
-    tabla_detallada = []
-    
-    for crypto_name in CRYPTO_CONFIG.keys():
-        print(f"\n{Fore.MAGENTA}📊 Analizando {crypto_name}...{Style.RESET_ALL}")
+    def _build_analysis(self, df):
+        """Señales y análisis de un DataFrame con indicadores ya calculados"""
+        return {
+            "df": df,
+            "signals": self.get_trading_signals(df),
+            "ma_analysis": self.analyze_ma_alignment(df),
+            "cross_analysis": self.detect_golden_death_cross(df)
+        }
+
+    def get_indicators_multiple(self, crypto_names, days=200, max_workers=MAX_WORKERS_DEFAULT, timeframe='daily',
+                                fresh=False):
+        """
+        Datos e indicadores de varias criptos. Los indicadores se calculan una
+        vez por serie descargada y se guardan junto a ella en el cache: otro
+        análisis (o Precios_Criptos / Cripto_Signals_Cla en el mismo proceso)
+        que pida la misma serie los reutiliza. Se calculan sobre un DataFrame
+        propio (columnas_crudas), así que la serie del cache sigue sin
+        indicadores. Ambos DataFrames son compartidos: quien añada columnas
+        debe trabajar sobre una copia.
         
-        try:
-            # Obtener datos
-            df = analyzer.get_crypto_data(crypto_name, days=200)
-            
+        Returns:
+            tuple: (datos, indicadores), ambos {nombre: DataFrame o None}
+        """
+        data = self.get_multiple_crypto_data(crypto_names, days=days, max_workers=max_workers, timeframe=timeframe,
+                                             fresh=fresh)
+        
+        indicators = {}
+        pending = {}
+        for crypto_name, df in data.items():
             if df is None:
-                tabla_principal.append([crypto_name, "❌ Sin datos", "❌ Error", "❌ Error"])
                 continue
-            
-            # Calcular indicadores
-            df = analyzer.calculate_technical_indicators(df)
-            
+            entry = self.cache.entrada(self._get_cache_key(crypto_name, timeframe, days))
+            if entry is not None and entry.valor is df and 'indicators' in entry.derivados:
+                metricas.incrementar('indicadores_reutilizados_total')
+                indicators[crypto_name] = entry.derivados['indicators']
+            else:
+                pending[crypto_name] = df
+        
+        if pending:
+            calculated = self.calculate_indicators_batch(
+                {crypto_name: columnas_crudas(df) for crypto_name, df in pending.items()}
+            )
+            for crypto_name, df in calculated.items():
+                self.cache.anotar(self._get_cache_key(crypto_name, timeframe, days), pending[crypto_name],
+                                  indicators=df)
+                indicators[crypto_name] = df
+        
+        return data, {crypto_name: indicators.get(crypto_name) for crypto_name in data}
+
+    def analyze_crypto(self, crypto_name, days=200, timeframe='daily'):
+        """Pipeline completo para una cripto: datos, indicadores y señales"""
+        return self.analyze_multiple([crypto_name], days=days, max_workers=1, timeframe=timeframe)[crypto_name]
+
+    def analyze_multiple(self, crypto_names, days=200, max_workers=MAX_WORKERS_DEFAULT, timeframe='daily',
+                         fresh=False):
+        """Descarga en paralelo y calcula los indicadores de todo el universo en una pasada"""
+        data, indicators = self.get_indicators_multiple(crypto_names, days=days, max_workers=max_workers,
+                                                        timeframe=timeframe, fresh=fresh)
+
+        results = {}
+        for crypto_name, df in data.items():
             if df is None:
-                tabla_principal.append([crypto_name, "❌ Error cálculo", "❌ Error", "❌ Error"])
+                results[crypto_name] = {"error": "❌ Sin datos"}
+            elif indicators.get(crypto_name) is None:
+                results[crypto_name] = {"error": "❌ Error cálculo"}
+            else:
+                results[crypto_name] = self._build_analysis(indicators[crypto_name])
+        return results
+
+    def analyze_timeframes(self, crypto_name, timeframes=('hourly', '4h', 'daily', 'weekly'), bars=200):
+        """
+        Señales de una cripto en varias temporalidades con una sola descarga por serie fuente.
+        
+        Cada fuente nativa (hourly, daily) se pide una vez con la ventana de la
+        temporalidad más larga que deriva de ella; el resto se remuestrea.
+        
+        Returns:
+            dict: {timeframe: análisis como analyze_crypto}
+        """
+        windows = {}
+        for timeframe in timeframes:
+            source = FUENTE[timeframe]
+            windows[source] = max(windows.get(source, 0), dias_para_velas(timeframe, bars))
+        sources = {source: self.get_crypto_data(crypto_name, days=days, timeframe=source)
+                   for source, days in windows.items()}
+        
+        results = {}
+        for timeframe in timeframes:
+            base = sources[FUENTE[timeframe]]
+            if base is None:
+                results[timeframe] = {"error": "❌ Sin datos"}
                 continue
             
-            # Obtener señales
-            signals = analyzer.get_trading_signals(df)
-            
+            # Los indicadores se calculan sobre las columnas descargadas de la serie del cache,
+            # en un DataFrame propio: la serie cacheada no cambia
+            base = columnas_crudas(base)
+            if timeframe == FUENTE[timeframe]:
+                df = base
+            else:
+                df = remuestrear(base, timeframe)
+                if self.compact:
+                    df = compactar(df)
+            df = self.calculate_technical_indicators(df)
+            results[timeframe] = {"error": "❌ Error cálculo"} if df is None else self._build_analysis(df)
+        return results
+
+def build_tables(analyzer, resultados):
+    """Construye las filas de las tablas principal y detallada"""
+    tabla_principal = []
+    tabla_detallada = []
+    
+    for crypto_name, resultado in resultados.items():
+        try:
+            if resultado is None:
+                tabla_principal.append([crypto_name, "❌ Error", "❌ Error", "❌ Error"])
+                continue
+
+            if "error" in resultado:
+                tabla_principal.append([crypto_name, resultado["error"], "❌ Error", "❌ Error"])
+                continue
+
+            df = resultado["df"]
+            signals = resultado["signals"]
+            ma_analysis = resultado["ma_analysis"]
+            cross_analysis = resultado["cross_analysis"]
+
             # Precio actual
             current_price = df['price'].iloc[-1]
-            
-            # Análisis detallado
-            ma_analysis = analyzer.analyze_ma_alignment(df)
-            cross_analysis = analyzer.detect_golden_death_cross(df)
-            
+
             # Tabla principal
             signal_display = analyzer.format_signal_display(signals)
             tabla_principal.append([
@@ -776,12 +1231,51 @@ def main():
             ])
             
         except Exception as e:
-            print(f"{Fore.RED}❌ Error procesando {crypto_name}: {e}")
+            registro.error("❌ Error procesando {}: {}", crypto_name, e)
             tabla_principal.append([crypto_name, "❌ Error", "❌ Error", "❌ Error"])
-        
-        # Pausa para evitar rate limiting
-        time.sleep(1.5)
+
+    return tabla_principal, tabla_detallada
+
+def load_universe(top, order='market_cap', refresh=False):
+    """Top-N del mercado con IDs de los tres proveedores (índice persistente); CRYPTO_CONFIG si falla"""
+    universe = ConstructorUniverso(API_CONFIG).universo(top, order, refrescar=refresh)
+    if not universe:
+        registro.warning("⚠️  No se pudo construir el universo; se usa la lista fija")
+        return CRYPTO_CONFIG
+    registro.info("{}✅ Universo: top {} por {}", Fore.GREEN, len(universe), order)
+    return universe
+
+def main(argv=None):
+    # Solo al ejecutarse como script: importar el módulo no toca la consola ni los warnings
+    from tabulate import tabulate
+    warnings.filterwarnings('ignore')
+    init(autoreset=True)
+    
+    parser = argparse.ArgumentParser(description="Análisis técnico multi-API")
+    parser.add_argument('--top', type=int, help="Analizar el top-N del mercado en lugar de la lista fija")
+    parser.add_argument('--orden', choices=list(ORDENES), default='market_cap')
+    parser.add_argument('--refrescar-universo', action='store_true', help="Ignorar el índice de IDs guardado")
+    parser.add_argument('--timeframe', choices=list(SEGUNDOS), default='daily',
+                        help="Temporalidad de las velas (4h y weekly se derivan por remuestreo)")
+    args = parser.parse_args(argv)
     
+    print(f"{Fore.CYAN}{'='*80}")
+    print(f"{Fore.CYAN}🚀 ANALIZADOR CRYPTO - FASE 1 COMPLETA")
+    print(f"{Fore.CYAN}📊 Análisis Técnico Avanzado Multi-API")
+    print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+    
+    universe = load_universe(args.top, args.orden, args.refrescar_universo) if args.top else CRYPTO_CONFIG
+    # El motor compartido del proceso: mismo cache e indicadores que Precios_Criptos y Cripto_Signals_Cla
+    from Nucleo_Cripto import motor
+    analyzer = motor(universe)
+    
+    print(f"\n{Fore.BLUE}🔄 Iniciando análisis completo...{Style.RESET_ALL}")
+    
+    # Descarga y análisis concurrente de todo el universo
+    resultados = analyzer.analyze_multiple(universe.keys(), days=dias_para_velas(args.timeframe, 200),
+                                           timeframe=args.timeframe)
+    tabla_principal, tabla_detallada = build_tables(analyzer, resultados)
+
     # Mostrar resultados
     print(f"\n{Fore.CYAN}{'='*80}")
     print(f"{Fore.CYAN}📈 RESUMEN EJECUTIVO")
@@ -815,6 +1309,29 @@ def main():
     print(f"{Fore.MAGENTA}• MACD: Convergencia/Divergencia de Medias")
     print(f"{Fore.MAGENTA}• Score: Puntuación de confluencia (-4 a +4)")
     print(f"{Style.RESET_ALL}")
+    
+    # Reutilización de conexiones HTTP
+    http_stats = transporte.estadisticas()
+    print(f"{Fore.CYAN}🔌 HTTP: {http_stats['solicitudes']} solicitudes, "
+          f"{http_stats['conexiones']} conexiones nuevas, {http_stats['reutilizadas']} reutilizadas{Style.RESET_ALL}")
+    
+    # Memoria de los DataFrames analizados (CRIPTO_COMPACTO=1 para el modo compacto)
+    frames = [r["df"] for r in resultados.values() if r and "df" in r]
+    if frames:
+        print(f"{Fore.CYAN}🧮 Memoria: {sum(map(bytes_df, frames)) / len(frames) / 1024:,.1f} KB por activo "
+              f"({'compacto' if analyzer.compact else 'estándar'}){Style.RESET_ALL}")
+    
+    # Métricas (CRIPTO_METRICAS=1, volcado en CRIPTO_METRICAS_ARCHIVO)
+    if metricas.activo:
+        cache_ratio = metricas.proporcion('cache_consultas_total', 'resultado', 'acierto')
+        cache_stats = analyzer.cache.estadisticas()
+        print(f"{Fore.CYAN}📏 Cache: {0 if cache_ratio is None else cache_ratio:.0%} aciertos, "
+              f"{cache_stats['entradas']} series en {cache_stats['bytes'] / 1024 / 1024:,.1f} MB, "
+              f"{cache_stats['expulsiones']} expulsiones, "
+              f"{sum(metricas.contador('filas_parseadas_total', proveedor=p) for p in API_CONFIG)} filas parseadas{Style.RESET_ALL}")
+        ruta = metricas.volcar()
+        if ruta:
+            print(f"{Fore.GREEN}✅ Métricas guardadas en {ruta}")
 
 if __name__ == "__main__":
     main()
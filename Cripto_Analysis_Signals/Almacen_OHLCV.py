@@ -0,0 +1,153 @@
+# ===========================================================================
+#   ALMACEN OHLCV
+#   Histórico persistente en disco, columnar y memory-mapped
+#
+#   Estructura:  <directorio>/<proveedor>/<moneda>/<timeframe>/
+#                   timestamp.npy   (int64, nanosegundos UTC)
+#                   <columna>.npy   (float64, una por columna)
+#                   meta.json       (columnas, filas, rango y cobertura)
+# ===========================================================================
+
+import os
+import json
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Metricas import registro
+
+DIRECTORIO_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos_ohlcv')
+
+
+class AlmacenOHLCV:
+    def __init__(self, directorio=DIRECTORIO_DEFAULT):
+        self.directorio = directorio
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, clave):
+        """Lock por clave proveedor/moneda/timeframe"""
+        with self._locks_guard:
+            if clave not in self._locks:
+                self._locks[clave] = threading.RLock()
+            return self._locks[clave]
+
+    def _ruta(self, proveedor, moneda, timeframe):
+        """Directorio de una serie (se sanea la moneda para usarla como nombre)"""
+        moneda_segura = str(moneda).replace('/', '_').replace('\\', '_')
+        return os.path.join(self.directorio, proveedor, moneda_segura, timeframe)
+
+    def _leer_meta(self, ruta):
+        try:
+            with open(os.path.join(ruta, 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def meta(self, proveedor, moneda, timeframe):
+        """Metadatos de la serie o None si no existe"""
+        return self._leer_meta(self._ruta(proveedor, moneda, timeframe))
+
+    def ultimo_timestamp(self, proveedor, moneda, timeframe):
+        """Último timestamp almacenado (pd.Timestamp) o None"""
+        meta = self.meta(proveedor, moneda, timeframe)
+        if not meta or meta.get('filas', 0) == 0:
+            return None
+        return pd.Timestamp(meta['ultimo_timestamp'])
+
+    def cargar(self, proveedor, moneda, timeframe):
+        """Carga la serie desde disco (memory-mapped). Devuelve DataFrame o None"""
+        ruta = self._ruta(proveedor, moneda, timeframe)
+        with self._lock((proveedor, moneda, timeframe)):
+            meta = self._leer_meta(ruta)
+            if not meta or meta.get('filas', 0) == 0:
+                return None
+
+            try:
+                filas = meta['filas']
+                timestamps = np.load(os.path.join(ruta, 'timestamp.npy'), mmap_mode='r')[:filas]
+                columnas = {
+                    col: np.load(os.path.join(ruta, f'{col}.npy'), mmap_mode='r')[:filas]
+                    for col in meta['columnas']
+                }
+            except (OSError, ValueError) as e:
+                registro.warning("⚠️  Almacén corrupto en {}: {}", ruta, e)
+                return None
+
+        index = pd.DatetimeIndex(np.asarray(timestamps).astype('datetime64[ns]'), name='timestamp')
+        return pd.DataFrame({col: np.array(valores) for col, valores in columnas.items()}, index=index)
+
+    def guardar(self, proveedor, moneda, timeframe, df, inicio_solicitado=None):
+        """Reemplaza la serie completa en disco"""
+        if df is None or len(df) == 0:
+            return
+
+        ruta = self._ruta(proveedor, moneda, timeframe)
+        with self._lock((proveedor, moneda, timeframe)):
+            os.makedirs(ruta, exist_ok=True)
+            anterior = self._leer_meta(ruta) or {}
+
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            columnas = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+
+            self._escribir_npy(ruta, 'timestamp', df.index.values.astype('datetime64[ns]').astype(np.int64))
+            for col in columnas:
+                self._escribir_npy(ruta, col, df[col].to_numpy(dtype=np.float64))
+
+            if inicio_solicitado is None:
+                inicio_solicitado = anterior.get('inicio_solicitado')
+            elif anterior.get('inicio_solicitado'):
+                inicio_solicitado = min(pd.Timestamp(inicio_solicitado),
+                                        pd.Timestamp(anterior['inicio_solicitado']))
+
+            meta = {
+                'columnas': columnas,
+                'filas': len(df),
+                'primer_timestamp': str(df.index[0]),
+                'ultimo_timestamp': str(df.index[-1]),
+                'inicio_solicitado': str(inicio_solicitado) if inicio_solicitado is not None else None,
+                'actualizado': datetime.now().isoformat()
+            }
+            # meta.json se escribe al final: los lectores nunca ven más filas de las escritas
+            tmp = os.path.join(ruta, 'meta.json.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(ruta, 'meta.json'))
+
+    def anexar(self, proveedor, moneda, timeframe, df_nuevo):
+        """
+        Fusiona una cola de datos nuevos con la serie almacenada.
+        Las filas guardadas desde el primer timestamp nuevo se reemplazan
+        (la última barra de la API suele ser parcial). Devuelve la serie completa.
+        """
+        with self._lock((proveedor, moneda, timeframe)):
+            actual = self.cargar(proveedor, moneda, timeframe)
+            if df_nuevo is None or len(df_nuevo) == 0:
+                return actual
+
+            if actual is None:
+                fusion = df_nuevo.sort_index()
+            else:
+                df_nuevo = df_nuevo.sort_index()
+                conservado = actual[actual.index < df_nuevo.index[0]]
+                fusion = pd.concat([conservado, df_nuevo])
+
+            self.guardar(proveedor, moneda, timeframe, fusion)
+            return fusion
+
+    def cubre_desde(self, proveedor, moneda, timeframe, inicio):
+        """True si la serie guardada fue descargada al menos desde 'inicio'"""
+        meta = self.meta(proveedor, moneda, timeframe)
+        if not meta or not meta.get('inicio_solicitado'):
+            return False
+        return pd.Timestamp(meta['inicio_solicitado']) <= pd.Timestamp(inicio)
+
+    @staticmethod
+    def _escribir_npy(ruta, nombre, valores):
+        """Escritura atómica de una columna"""
+        tmp = os.path.join(ruta, f'{nombre}.npy.tmp')
+        with open(tmp, 'wb') as f:
+            np.save(f, valores)
+        os.replace(tmp, os.path.join(ruta, f'{nombre}.npy'))
@@ -0,0 +1,289 @@
+# ===========================================================================
+#   BACKTEST VECTORIZADO
+#   Score de confluencia de get_trading_signals para TODAS las barras del
+#   histórico y de todo el universo, simulación de posiciones y métricas
+#
+#   En cada barra el score es el que habría dado get_trading_signals con los
+#   datos disponibles hasta ese momento:
+#       0.3 * orden de MAs (-4..+4) + 0.2 * RSI (30/70) + 0.2 * MACD vs señal
+#       + 0.15 * pendientes (MACD y MA9) + 0.15 * Golden/Death Cross (60 barras)
+#   Solo cuentan las barras con todos los indicadores definidos (como el
+#   dropna() del análisis en vivo). La posición se decide al cierre de la
+#   barra y se aplica al rendimiento de la siguiente.
+#
+#   Solo NumPy al importar: pandas se carga al pedir .resumen o .serie(),
+#   así los procesos del optimizador no lo importan.
+# ===========================================================================
+
+import numpy as np
+
+from Indicadores_Vectorizados import MatrizPrecios, calcular_indicadores, VENTANAS_MA
+from Cruces_Vectorizados import cruces
+
+# Pesos del score de confluencia (mismos que CryptoAnalyzer._combine_signals)
+PESOS_SCORE = {'ma': 0.3, 'rsi': 0.2, 'macd': 0.2, 'pendientes': 0.15, 'cruce': 0.15}
+
+# |score| > 0.5 -> COMPRA / VENTA, |score| > 1.5 -> FUERTE
+UMBRALES_SEÑAL = (0.5, 1.5)
+
+# RSI < 30 suma, RSI > 70 resta
+NIVELES_RSI = (30, 70)
+
+VENTANA_CRUCES = 60
+
+SEÑALES = {2: "COMPRA FUERTE", 1: "COMPRA", 0: "NEUTRO", -1: "VENTA", -2: "VENTA FUERTE"}
+
+# Barras por año para anualizar (cripto cotiza todos los días)
+BARRAS_POR_AÑO = 365
+
+COLUMNAS_RESUMEN = ['retorno_total', 'retorno_buy_hold', 'max_drawdown', 'operaciones',
+                    'tasa_acierto', 'exposicion', 'sharpe', 'barras']
+
+
+def score_ma(ma9, ma21, ma50, ma200):
+    """Orden de medias como analyze_ma_alignment: -4, -3..3, +4"""
+    pares = [(ma9, ma21), (ma21, ma50), (ma50, ma200)]
+    with np.errstate(invalid='ignore'):
+        alcistas = sum((a > b).astype(np.int8) for a, b in pares)
+        bajista_total = np.logical_and.reduce([a < b for a, b in pares])
+    score = 2 * alcistas - 3
+    score = np.where(alcistas == 3, 4, np.where(bajista_total, -4, score))
+    return score.astype(np.float64)
+
+
+def score_cruces(ma50, ma200, ventana=VENTANA_CRUCES):
+    """+1 / -1 si el último Golden / Death Cross ocurrió hace menos de `ventana` barras"""
+    T, N = ma50.shape
+    eventos = np.zeros((T, N), dtype=np.int8)
+    filas, columnas, direccion, _ = cruces(ma50, ma200)
+    eventos[filas, columnas] = direccion
+
+    # Fila del último cruce hasta cada barra (forward fill de índices)
+    tiempo = np.arange(T)[:, None]
+    ultimo = np.maximum.accumulate(np.where(eventos != 0, tiempo, -1), axis=0)
+    direccion_ultimo = np.take_along_axis(eventos, np.maximum(ultimo, 0), axis=0)
+    vigente = (ultimo >= 0) & (tiempo - ultimo + 1 < ventana)
+    return np.where(vigente, direccion_ultimo, 0).astype(np.float64)
+
+
+def clasificar(score, umbrales=UMBRALES_SEÑAL):
+    """Código de señal por barra: 2 COMPRA FUERTE ... -2 VENTA FUERTE (0 si score es NaN)"""
+    debil, fuerte = umbrales
+    with np.errstate(invalid='ignore'):
+        return np.select(
+            [score > fuerte, score > debil, score < -fuerte, score < -debil],
+            [2, 1, -2, -1], default=0
+        ).astype(np.int8)
+
+
+def score_historico(indicadores, precios, pesos=PESOS_SCORE, niveles_rsi=NIVELES_RSI,
+                    ventana_cruces=VENTANA_CRUCES, ventanas_ma=VENTANAS_MA):
+    """
+    Score de confluencia para cada barra.
+
+    Args:
+        indicadores (dict): Salida de calcular_indicadores ({columna: T x N}).
+        precios (np.ndarray): Matriz de precios T x N.
+        ventanas_ma (list): Las cuatro medias del orden (MA9/21/50/200 por
+            defecto); la pendiente usa la primera y el cruce las dos últimas.
+
+    Returns:
+        np.ndarray: Score T x N (NaN donde la fila no está completa).
+    """
+    sobreventa, sobrecompra = niveles_rsi
+    with np.errstate(invalid='ignore'):
+        rsi = indicadores['RSI']
+        componente_rsi = np.where(rsi < sobreventa, 1.0, np.where(rsi > sobrecompra, -1.0, 0.0))
+        componente_macd = np.sign(indicadores['MACD'] - indicadores['MACD_signal'])
+
+        rapida, media, lenta, larga = (indicadores[f'MA{w}'] for w in ventanas_ma)
+        macd_slope, ma9_slope = indicadores['MACD_slope'], indicadores[f'MA{ventanas_ma[0]}_slope']
+        componente_pendientes = np.where((macd_slope > 0) & (ma9_slope > 0), 1.0,
+                                         np.where((macd_slope < 0) & (ma9_slope < 0), -1.0, 0.0))
+
+    score = (
+        pesos['ma'] * score_ma(rapida, media, lenta, larga) +
+        pesos['rsi'] * componente_rsi +
+        pesos['macd'] * componente_macd +
+        pesos['pendientes'] * componente_pendientes +
+        pesos['cruce'] * score_cruces(lenta, larga, ventana_cruces)
+    )
+
+    completo = ~np.isnan(precios)
+    for valores in indicadores.values():
+        completo &= ~np.isnan(valores)
+    return np.where(completo, score, np.nan)
+
+
+def simular_posiciones(precios, clases, validos, permitir_cortos=False, mantener_en_neutro=True,
+                       comision=0.001):
+    """
+    Posición por barra (+1 largo, -1 corto, 0 fuera) y rendimiento de la estrategia.
+
+    Args:
+        precios (np.ndarray): T x N.
+        clases (np.ndarray): Códigos de clasificar().
+        validos (np.ndarray): Barras con score definido.
+        permitir_cortos (bool): VENTA abre corto en lugar de cerrar el largo.
+        mantener_en_neutro (bool): NEUTRO conserva la posición anterior.
+        comision (float): Coste por unidad de cambio de posición.
+
+    Returns:
+        tuple: (posiciones, rendimientos) ambos T x N; rendimientos[t] es lo
+               ganado entre t-1 y t con la posición de t-1.
+    """
+    T, N = precios.shape
+    venta = -1.0 if permitir_cortos else 0.0
+    objetivo = np.where(clases > 0, 1.0, np.where(clases < 0, venta, np.nan if mantener_en_neutro else 0.0))
+    objetivo = np.where(validos, objetivo, 0.0)
+
+    if mantener_en_neutro:
+        tiempo = np.arange(T)[:, None]
+        ultimo = np.maximum.accumulate(np.where(np.isnan(objetivo), 0, tiempo), axis=0)
+        objetivo = np.take_along_axis(objetivo, ultimo, axis=0)
+    posiciones = np.nan_to_num(objetivo, nan=0.0)
+
+    rendimiento_activo = np.zeros((T, N))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rendimiento_activo[1:] = precios[1:] / precios[:-1] - 1.0
+    rendimiento_activo = np.nan_to_num(rendimiento_activo, nan=0.0, posinf=0.0, neginf=0.0)
+
+    rendimientos = np.zeros((T, N))
+    rendimientos[1:] = posiciones[:-1] * rendimiento_activo[1:]
+    cambios = np.abs(np.diff(posiciones, axis=0, prepend=0.0))
+    rendimientos -= comision * cambios
+    return posiciones, rendimientos
+
+
+def _operaciones(posiciones, rendimientos):
+    """(operaciones, ganadoras) por columna; una operación es un tramo con la misma posición != 0"""
+    T, N = posiciones.shape
+    pos = posiciones.T.ravel()
+    # Lo ganado al mantener la posición de la barra t es el rendimiento de t+1
+    ganado = np.zeros((N, T))
+    ganado[:, :-1] = rendimientos.T[:, 1:]
+    ganado = np.log1p(np.maximum(ganado.ravel(), -0.999999))
+
+    inicio_columna = np.zeros(N * T, dtype=bool)
+    inicio_columna[::T] = True
+    previa = np.concatenate([[0.0], pos[:-1]])
+    empieza = (pos != 0) & ((pos != previa) | inicio_columna)
+
+    ids = np.cumsum(empieza) - 1
+    en_operacion = pos != 0
+    n_operaciones = int(empieza.sum())
+    if n_operaciones == 0:
+        return np.zeros(N, dtype=np.int64), np.zeros(N, dtype=np.int64)
+
+    resultado = np.bincount(ids[en_operacion], weights=ganado[en_operacion], minlength=n_operaciones)
+    columna_operacion = np.flatnonzero(empieza) // T
+    operaciones = np.bincount(columna_operacion, minlength=N)
+    ganadoras = np.bincount(columna_operacion, weights=resultado > 0, minlength=N).astype(np.int64)
+    return operaciones, ganadoras
+
+
+def resumir(precios, longitudes, posiciones, rendimientos):
+    """Métricas por columna: rendimiento, buy & hold, drawdown, aciertos, exposición y Sharpe"""
+    T, N = precios.shape
+    equity = np.cumprod(1.0 + rendimientos, axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1.0
+
+    primeras = T - longitudes
+    columnas = np.arange(N)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        buy_hold = precios[-1] / precios[primeras, columnas] - 1.0
+
+    en_rango = np.arange(T)[:, None] >= primeras
+    barras = en_rango.sum(axis=0)
+    media = np.where(en_rango, rendimientos, 0.0).sum(axis=0) / np.maximum(barras, 1)
+    varianza = np.where(en_rango, (rendimientos - media) ** 2, 0.0).sum(axis=0) / np.maximum(barras - 1, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = np.where(varianza > 0, media / np.sqrt(varianza) * np.sqrt(BARRAS_POR_AÑO), np.nan)
+
+    operaciones, ganadoras = _operaciones(posiciones, rendimientos)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tasa_acierto = np.where(operaciones > 0, ganadoras / operaciones, np.nan)
+
+    return {
+        'retorno_total': equity[-1] - 1.0,
+        'retorno_buy_hold': buy_hold,
+        'max_drawdown': drawdown.min(axis=0),
+        'operaciones': operaciones,
+        'tasa_acierto': tasa_acierto,
+        'exposicion': (posiciones != 0).sum(axis=0) / np.maximum(barras, 1),
+        'sharpe': sharpe,
+        'barras': barras
+    }, equity
+
+
+class ResultadoBacktest:
+    """Matrices por barra (score, señal, posición, rendimiento, equity) y resumen por activo"""
+
+    def __init__(self, matriz, score, clases, posiciones, rendimientos, equity, metricas):
+        self.matriz = matriz
+        self.score = score
+        self.clases = clases
+        self.posiciones = posiciones
+        self.rendimientos = rendimientos
+        self.equity = equity
+        self.metricas = metricas
+        self._resumen = None
+
+    @property
+    def resumen(self):
+        """DataFrame por activo con COLUMNAS_RESUMEN (se construye al pedirlo)"""
+        if self._resumen is None:
+            import pandas as pd
+            self._resumen = pd.DataFrame(self.metricas, index=pd.Index(self.matriz.nombres, name='activo'),
+                                         columns=COLUMNAS_RESUMEN)
+        return self._resumen
+
+    def serie(self, nombre):
+        """DataFrame de un activo con price, score, señal, posición y equity"""
+        import pandas as pd
+        columna = lambda m: self.matriz.columna(m, nombre)
+        return pd.DataFrame({
+            'price': columna(self.matriz.valores),
+            'score': columna(self.score),
+            'signal': [SEÑALES[int(c)] for c in columna(self.clases)],
+            'position': columna(self.posiciones),
+            'equity': columna(self.equity)
+        }, index=self.matriz.indices.get(nombre))
+
+
+def backtest_matriz(matriz, pesos=PESOS_SCORE, umbrales=UMBRALES_SEÑAL, niveles_rsi=NIVELES_RSI,
+                    ventana_cruces=VENTANA_CRUCES, permitir_cortos=False, mantener_en_neutro=True,
+                    comision=0.001, indicadores=None, **parametros_indicadores):
+    """
+    Backtest de toda una MatrizPrecios en una pasada.
+
+    parametros_indicadores se pasan a calcular_indicadores (ventanas_ma debe
+    tener cuatro medias crecientes, en el papel de MA9/MA21/MA50/MA200).
+    indicadores permite reutilizar un cálculo previo con los mismos parámetros.
+    """
+    X = matriz.valores
+    if indicadores is None:
+        indicadores = calcular_indicadores(matriz, **parametros_indicadores)
+    ventanas_ma = parametros_indicadores.get('ventanas_ma', VENTANAS_MA)
+
+    score = score_historico(indicadores, X, pesos, niveles_rsi, ventana_cruces, ventanas_ma)
+    validos = ~np.isnan(score)
+    clases = clasificar(score, umbrales)
+    posiciones, rendimientos = simular_posiciones(X, clases, validos, permitir_cortos,
+                                                  mantener_en_neutro, comision)
+    metricas, equity = resumir(X, matriz.longitudes, posiciones, rendimientos)
+    return ResultadoBacktest(matriz, score, clases, posiciones, rendimientos, equity, metricas)
+
+
+def backtest(dataframes, **parametros):
+    """
+    Backtest del score de get_trading_signals para varios activos.
+
+    Args:
+        dataframes (dict): {nombre: DataFrame con columna 'price'}.
+        **parametros: Ver backtest_matriz.
+
+    Returns:
+        ResultadoBacktest: resumen (DataFrame por activo) y matrices por barra.
+    """
+    return backtest_matriz(MatrizPrecios(dataframes), **parametros)
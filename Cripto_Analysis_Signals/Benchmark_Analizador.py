@@ -0,0 +1,446 @@
+# ===========================================================================
+#   BENCHMARK DEL ANALIZADOR
+#   Mide de punta a punta ANALIZADOR_CRYPTO_CLA contra un servidor HTTP local
+#   que imita CoinGecko / CryptoCompare / CoinCap (sin red ni límites reales)
+#
+#   Etapas: fetch, parse, get_multiple_crypto_data (en frío y con almacén),
+#   calculate_technical_indicators (por activo y en lote), get_trading_signals,
+#   análisis completo y renderizado de tablas. Para cada universo (10/100/1000
+#   activos) y longitud de histórico (200 días a varios años) informa tiempo,
+#   throughput y pico de memoria.
+#
+#   Uso:
+#       python Benchmark_Analizador.py
+#       python Benchmark_Analizador.py --activos 10 100 --dias 200 730
+#       python Benchmark_Analizador.py --grabaciones ./grabaciones --json resultados.json
+#
+#   --grabaciones acepta respuestas reales guardadas como
+#   coingecko_market_chart.json, cryptocompare_histoday.json y
+#   coincap_assets.json; se sirven para todos los activos en lugar de las
+#   series sintéticas.
+# ===========================================================================
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+from tabulate import tabulate
+from colorama import Fore, Style, init
+
+from ANALIZADOR_CRYPTO_CLA import API_CONFIG, CRYPTO_CONFIG, CryptoAnalyzer, build_tables
+from Almacen_OHLCV import AlmacenOHLCV
+from Contexto_Analisis import RegistroContextos
+from Limitador_Tasa import registrar_limitadores
+from Motor_Concurrente import procesar_en_paralelo, configurar_concurrencia, CONCURRENCIA_POR_PROVEEDOR
+from Transporte_HTTP import transporte
+
+# Escenarios por defecto
+ACTIVOS_DEFAULT = [10, 100, 1000]
+DIAS_DEFAULT = [200, 730, 1825]
+WORKERS_DEFAULT = 16
+
+# Rutas de cada proveedor en el servidor local (se sustituyen en API_CONFIG['base_url'])
+RUTAS_PROVEEDOR = {
+    'coingecko': '/coingecko/api/v3',
+    'cryptocompare': '/cryptocompare/data/v2',
+    'coincap': '/coincap/v2'
+}
+
+ARCHIVOS_GRABACION = {
+    'market_chart': 'coingecko_market_chart.json',
+    'histoday': 'cryptocompare_histoday.json',
+    'assets': 'coincap_assets.json'
+}
+
+DIA_MS = 86_400_000
+
+
+# ---------------------------------------------------------------------------
+#   Datos sintéticos (deterministas por activo)
+# ---------------------------------------------------------------------------
+
+def serie_sintetica(coin_id, dias):
+    """Paseo aleatorio log-normal reproducible: (timestamps_ms, precios, volúmenes)"""
+    rng = np.random.default_rng(zlib.crc32(coin_id.encode()))
+    puntos = dias + 1
+    inicio = 10 ** rng.uniform(-2, 4)
+    rendimientos = rng.normal(0.0005, 0.035, puntos)
+    precios = inicio * np.exp(np.cumsum(rendimientos))
+    volumenes = precios * rng.uniform(1e5, 1e7, puntos)
+
+    hoy = int(time.time() * 1000) // DIA_MS * DIA_MS
+    timestamps = hoy - DIA_MS * np.arange(puntos - 1, -1, -1, dtype=np.int64)
+    return timestamps, precios, volumenes
+
+
+def precio_sintetico(coin_id):
+    return float(serie_sintetica(coin_id, 1)[1][-1])
+
+
+def payload_market_chart(coin_id, dias, grabaciones):
+    if 'market_chart' in grabaciones:
+        datos = grabaciones['market_chart']
+        return {clave: valores[-(dias + 1):] for clave, valores in datos.items()}
+
+    timestamps, precios, volumenes = serie_sintetica(coin_id, dias)
+    ts = timestamps.tolist()
+    return {
+        'prices': [list(par) for par in zip(ts, precios.tolist())],
+        'market_caps': [list(par) for par in zip(ts, (precios * 1e7).tolist())],
+        'total_volumes': [list(par) for par in zip(ts, volumenes.tolist())]
+    }
+
+
+def payload_histoday(simbolo, dias, grabaciones):
+    if 'histoday' in grabaciones:
+        datos = json.loads(json.dumps(grabaciones['histoday']))
+        datos['Data']['Data'] = datos['Data']['Data'][-(dias + 1):]
+        return datos
+
+    timestamps, precios, volumenes = serie_sintetica(simbolo, dias)
+    filas = []
+    for ts, cierre, volumen in zip((timestamps // 1000).tolist(), precios.tolist(), volumenes.tolist()):
+        filas.append({
+            'time': ts, 'open': cierre, 'high': cierre * 1.02, 'low': cierre * 0.98,
+            'close': cierre, 'volumefrom': volumen / cierre, 'volumeto': volumen,
+            'conversionType': 'direct', 'conversionSymbol': ''
+        })
+    return {
+        'Response': 'Success', 'Message': '', 'HasWarning': False, 'Type': 100,
+        'Data': {'Aggregated': False, 'TimeFrom': filas[0]['time'], 'TimeTo': filas[-1]['time'], 'Data': filas}
+    }
+
+
+def activo_coincap(coin_id, grabaciones):
+    if 'assets' in grabaciones:
+        plantilla = dict(grabaciones['assets']['data'][0])
+        plantilla['id'] = coin_id
+        return plantilla
+    return {'id': coin_id, 'symbol': coin_id.upper(), 'priceUsd': f"{precio_sintetico(coin_id):.8f}"}
+
+
+def resolver(ruta, params, grabaciones):
+    """Devuelve (código, payload) para una ruta del servidor local"""
+    primero = lambda clave, defecto=None: params.get(clave, [defecto])[0]
+
+    if ruta.startswith(RUTAS_PROVEEDOR['coingecko']):
+        ruta = ruta[len(RUTAS_PROVEEDOR['coingecko']):]
+        if ruta == '/ping':
+            return 200, {'gecko_says': '(V3) To the Moon!'}
+        if ruta.startswith('/coins/') and ruta.endswith('/market_chart'):
+            coin_id = ruta.split('/')[2]
+            return 200, payload_market_chart(coin_id, int(float(primero('days', 90))), grabaciones)
+        if ruta == '/simple/price':
+            ids = [i for i in primero('ids', '').split(',') if i]
+            return 200, {i: {'usd': precio_sintetico(i)} for i in ids}
+
+    elif ruta.startswith(RUTAS_PROVEEDOR['cryptocompare']):
+        ruta = ruta[len(RUTAS_PROVEEDOR['cryptocompare']):]
+        if ruta == '/histoday':
+            return 200, payload_histoday(primero('fsym', 'BTC'), int(primero('limit', 90)), grabaciones)
+        if ruta == '/price':
+            return 200, {primero('tsym', 'USD'): precio_sintetico(primero('fsym', 'BTC'))}
+
+    elif ruta.startswith(RUTAS_PROVEEDOR['coincap']):
+        ruta = ruta[len(RUTAS_PROVEEDOR['coincap']):]
+        if ruta == '/assets':
+            ids = [i for i in primero('ids', '').split(',') if i]
+            return 200, {'data': [activo_coincap(i, grabaciones) for i in ids], 'timestamp': int(time.time() * 1000)}
+        if ruta.startswith('/assets/'):
+            return 200, {'data': activo_coincap(ruta.split('/')[2], grabaciones), 'timestamp': int(time.time() * 1000)}
+
+    return 404, {'error': f'Ruta desconocida: {ruta}'}
+
+
+# ---------------------------------------------------------------------------
+#   Servidor HTTP local (en otro proceso: no compite por el GIL ni ensucia
+#   las mediciones de memoria)
+# ---------------------------------------------------------------------------
+
+def cargar_grabaciones(directorio):
+    grabaciones = {}
+    if not directorio:
+        return grabaciones
+    for clave, archivo in ARCHIVOS_GRABACION.items():
+        ruta = os.path.join(directorio, archivo)
+        if os.path.exists(ruta):
+            with open(ruta, encoding='utf-8') as f:
+                grabaciones[clave] = json.load(f)
+    return grabaciones
+
+
+def _crear_manejador(grabaciones, comprimir):
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, como las APIs reales
+        disable_nagle_algorithm = True  # cabeceras y cuerpo van en escrituras separadas
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            codigo, payload = resolver(url.path, parse_qs(url.query), grabaciones)
+            cuerpo = json.dumps(payload, separators=(',', ':')).encode()
+
+            self.send_response(codigo)
+            self.send_header('Content-Type', 'application/json')
+            if comprimir and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                cuerpo = gzip.compress(cuerpo, compresslevel=1)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    return Manejador
+
+
+def _servir(cola, grabaciones_dir, comprimir):
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), _crear_manejador(cargar_grabaciones(grabaciones_dir), comprimir))
+    servidor.daemon_threads = True
+    cola.put(servidor.server_address[1])
+    servidor.serve_forever()
+
+
+class ServidorAPIs:
+    """Servidor local que responde como los tres proveedores"""
+
+    def __init__(self, grabaciones=None, comprimir=True):
+        self.grabaciones = grabaciones
+        self.comprimir = comprimir
+        self.proceso = None
+        self.puerto = None
+
+    def iniciar(self):
+        cola = multiprocessing.Queue()
+        self.proceso = multiprocessing.Process(
+            target=_servir, args=(cola, self.grabaciones, self.comprimir), daemon=True
+        )
+        self.proceso.start()
+        self.puerto = cola.get(timeout=30)
+        return {proveedor: f"http://127.0.0.1:{self.puerto}{ruta}" for proveedor, ruta in RUTAS_PROVEEDOR.items()}
+
+    def detener(self):
+        if self.proceso is not None:
+            self.proceso.terminate()
+            self.proceso.join()
+            self.proceso = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+@contextlib.contextmanager
+def entorno_local(base_urls, universo, workers):
+    """
+    Apunta API_CONFIG al servidor local, quita los límites de tasa y sustituye
+    CRYPTO_CONFIG por el universo sintético. Todo se restaura al salir.
+    """
+    config_original = {p: dict(opciones) for p, opciones in API_CONFIG.items()}
+    universo_original = dict(CRYPTO_CONFIG)
+    concurrencia_original = dict(CONCURRENCIA_POR_PROVEEDOR)
+
+    for proveedor, url in base_urls.items():
+        API_CONFIG[proveedor]['base_url'] = url
+        API_CONFIG[proveedor]['rate_limit'] = 10 ** 9
+    registrar_limitadores(API_CONFIG, reemplazar=True)
+    configurar_concurrencia({proveedor: workers for proveedor in base_urls})
+    CRYPTO_CONFIG.clear()
+    CRYPTO_CONFIG.update(universo)
+    try:
+        yield
+    finally:
+        for proveedor, opciones in config_original.items():
+            API_CONFIG[proveedor].clear()
+            API_CONFIG[proveedor].update(opciones)
+        registrar_limitadores(API_CONFIG, reemplazar=True)
+        configurar_concurrencia(concurrencia_original)
+        CRYPTO_CONFIG.clear()
+        CRYPTO_CONFIG.update(universo_original)
+
+
+def universo_sintetico(n):
+    return {
+        f"SINT{i:04d}": {"coingecko": f"sint-{i}", "cryptocompare": f"S{i}", "coincap": f"sint-{i}"}
+        for i in range(n)
+    }
+
+
+# ---------------------------------------------------------------------------
+#   Medición
+# ---------------------------------------------------------------------------
+
+class Cronometro:
+    """Tiempo y pico de memoria (tracemalloc) de una etapa, con stdout silenciado"""
+
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.segundos = 0.0
+        self.pico_mb = None
+
+    def __enter__(self):
+        self._salida = contextlib.redirect_stdout(io.StringIO())
+        self._salida.__enter__()
+        if self.memoria:
+            tracemalloc.start()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.segundos = time.perf_counter() - self._inicio
+        if self.memoria:
+            self.pico_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        self._salida.__exit__(*exc)
+        return False
+
+
+def ejecutar_escenario(n_activos, dias, base_urls, workers=WORKERS_DEFAULT, memoria=True):
+    """Corre todas las etapas para un universo y devuelve una fila por etapa"""
+    universo = universo_sintetico(n_activos)
+    nombres = list(universo)
+    etapas = []
+
+    def medir(etapa, funcion):
+        with Cronometro(memoria) as crono:
+            resultado = funcion()
+        filas = medir.filas
+        etapas.append({
+            'activos': n_activos, 'dias': dias, 'etapa': etapa,
+            'segundos': crono.segundos,
+            'activos_s': n_activos / crono.segundos if crono.segundos else float('inf'),
+            'filas_s': filas / crono.segundos if crono.segundos else float('inf'),
+            'pico_mb': crono.pico_mb
+        })
+        return resultado
+    medir.filas = n_activos * (dias + 1)
+
+    with entorno_local(base_urls, universo, workers), tempfile.TemporaryDirectory() as directorio:
+        url_chart = API_CONFIG['coingecko']['base_url'] + '/coins/{}/market_chart'
+        params = {"vs_currency": "usd", "days": dias, "interval": "daily"}
+
+        # 1. fetch: solo HTTP (pool keep-alive + descarga del cuerpo)
+        cuerpos = medir('fetch (HTTP)', lambda: procesar_en_paralelo(
+            lambda nombre: transporte.get(url_chart.format(universo[nombre]['coingecko']),
+                                          proveedor='coingecko', params=params, timeout=30).content,
+            nombres, max_workers=workers))
+
+        # 2. parse: JSON -> DataFrame
+        parser = CryptoAnalyzer(store=AlmacenOHLCV(directorio))
+        medir('parse', lambda: {nombre: parser._parse_coingecko(json.loads(cuerpo))
+                                for nombre, cuerpo in cuerpos.items()})
+        del cuerpos
+
+        # 3-4. get_multiple_crypto_data: failover + almacén en frío y con histórico local
+        almacen = AlmacenOHLCV(directorio)
+        frio = CryptoAnalyzer(store=almacen)
+        with contextlib.redirect_stdout(io.StringIO()):
+            frio.health.refrescar()
+        datos = medir('get_multiple_crypto_data (frío)',
+                      lambda: frio.get_multiple_crypto_data(nombres, days=dias, max_workers=workers))
+
+        caliente = CryptoAnalyzer(store=almacen)
+        with contextlib.redirect_stdout(io.StringIO()):
+            caliente.health.refrescar()
+        datos = medir('get_multiple_crypto_data (almacén)',
+                      lambda: caliente.get_multiple_crypto_data(nombres, days=dias, max_workers=workers))
+        datos = {nombre: df for nombre, df in datos.items() if df is not None}
+        medir.filas = sum(len(df) for df in datos.values())
+
+        # 5-6. indicadores
+        medir('calculate_technical_indicators', lambda: {
+            nombre: caliente.calculate_technical_indicators(df) for nombre, df in datos.items()
+        })
+        indicadores = medir('calculate_indicators_batch', lambda: caliente.calculate_indicators_batch(datos))
+        indicadores = {nombre: df for nombre, df in indicadores.items() if df is not None}
+
+        # 7-8. señales y análisis completo
+        medir('get_trading_signals', lambda: {
+            nombre: caliente.get_trading_signals(df) for nombre, df in indicadores.items()
+        })
+        # Contextos nuevos: si no, _build_analysis solo leería lo memoizado por get_trading_signals
+        caliente.contexts = RegistroContextos()
+        resultados = medir('análisis completo', lambda: {
+            nombre: caliente._build_analysis(df) for nombre, df in indicadores.items()
+        })
+
+        # 9. renderizado
+        def renderizar():
+            tabla_principal, tabla_detallada = build_tables(caliente, resultados)
+            return (tabulate(tabla_principal, headers=["Crypto", "Precio USD", "Señal", "Score"],
+                             tablefmt="fancy_grid"),
+                    tabulate(tabla_detallada, headers=["Crypto", "MAs", "Cross", "RSI", "MACD", "Detalles"],
+                             tablefmt="fancy_grid"))
+        medir('render (tablas)', renderizar)
+
+        memoria_datos = sum(df.memory_usage(deep=True).sum() for df in indicadores.values())
+        for etapa in etapas:
+            etapa['bytes_por_activo'] = memoria_datos / max(len(indicadores), 1)
+
+    return etapas
+
+
+def mostrar(etapas):
+    filas = [[
+        e['activos'], e['dias'], e['etapa'], f"{e['segundos']:.3f}",
+        f"{e['activos_s']:,.0f}", f"{e['filas_s']:,.0f}",
+        '-' if e['pico_mb'] is None else f"{e['pico_mb']:.1f}"
+    ] for e in etapas]
+    print(tabulate(filas, headers=["Activos", "Días", "Etapa", "Segundos", "Activos/s", "Filas/s", "Pico MB"],
+                   tablefmt="fancy_grid"))
+
+
+def main():
+    init(autoreset=True)
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta del analizador")
+    parser.add_argument('--activos', type=int, nargs='+', default=ACTIVOS_DEFAULT)
+    parser.add_argument('--dias', type=int, nargs='+', default=DIAS_DEFAULT)
+    parser.add_argument('--workers', type=int, default=WORKERS_DEFAULT)
+    parser.add_argument('--grabaciones', help="Directorio con respuestas reales grabadas")
+    parser.add_argument('--sin-gzip', action='store_true', help="Servir respuestas sin comprimir")
+    parser.add_argument('--sin-memoria', action='store_true',
+                        help="No medir memoria (tracemalloc añade sobrecoste a los tiempos)")
+    parser.add_argument('--json', help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    print(f"{Fore.CYAN}{'='*80}")
+    print(f"{Fore.CYAN}⏱️  BENCHMARK ANALIZADOR CRYPTO")
+    print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+
+    todas = []
+    with ServidorAPIs(args.grabaciones, comprimir=not args.sin_gzip) as base_urls:
+        for n_activos in args.activos:
+            for dias in args.dias:
+                print(f"{Fore.BLUE}🔄 {n_activos} activos x {dias} días...{Style.RESET_ALL}")
+                etapas = ejecutar_escenario(n_activos, dias, base_urls, args.workers,
+                                            memoria=not args.sin_memoria)
+                mostrar(etapas)
+                print(f"{Fore.MAGENTA}💾 {etapas[0]['bytes_por_activo'] / 1024:.1f} KB por activo "
+                      f"con indicadores{Style.RESET_ALL}\n")
+                todas.extend(etapas)
+
+    http_stats = transporte.estadisticas()
+    print(f"{Fore.CYAN}🔌 HTTP: {http_stats['solicitudes']} solicitudes, "
+          f"{http_stats['conexiones']} conexiones nuevas, {http_stats['reutilizadas']} reutilizadas{Style.RESET_ALL}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(todas, f, indent=2, ensure_ascii=False)
+        print(f"{Fore.GREEN}✅ Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# ===========================================================================
+#   CACHE DE SERIES
+#   Cache en memoria acotado (TTL + LRU) con stale-while-revalidate
+#
+#   Cada entrada guarda un DataFrame de get_crypto_data y lo que se derive
+#   de él (los indicadores). El cache tiene un tope de memoria (bytes de los
+#   DataFrames) y opcionalmente de entradas; al superarlo expulsa las menos
+#   usadas. Según su edad una entrada está:
+#       - fresca    (< ttl)                    -> se sirve
+#       - obsoleta  (< ttl + ventana_obsoleta) -> se sirve al instante y se
+#                                                 recarga en segundo plano
+#       - caducada                             -> fallo: carga síncrona
+#   Así la latencia de una consulta no depende de lo que tarde el proveedor
+#   mientras la serie se siga pidiendo. La ventana obsoleta es opcional (por
+#   defecto 0: nunca se sirven datos pasado el TTL) y quien necesite datos al
+#   día (un publicador, la siembra de un servicio) puede rechazar la copia
+#   obsoleta en la consulta aunque la ventana esté activa.
+#
+#   Las edades se miden con time.monotonic(): ni el paso de los días ni un
+#   cambio de hora del sistema hacen pasar por fresca una entrada vieja.
+#
+#   Configuración por entorno:
+#       CRIPTO_CACHE_MB=256          tope de memoria
+#       CRIPTO_CACHE_OBSOLETO=0      segundos tras el TTL en que se sirve la
+#                                    copia obsoleta (0 = sin revalidación)
+# ===========================================================================
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from Memoria_Compacta import bytes_df
+from Metricas import metricas, registro
+
+TTL_DEFAULT = 300  # 5 minutos
+MAX_BYTES_DEFAULT = int(float(os.environ.get('CRIPTO_CACHE_MB', 256)) * 1024 * 1024)
+VENTANA_OBSOLETA_DEFAULT = float(os.environ.get('CRIPTO_CACHE_OBSOLETO', 0))
+
+# Estados de una entrada servida por consultar()
+FRESCA = 'fresca'
+OBSOLETA = 'obsoleta'
+
+
+class EntradaCache:
+    __slots__ = ('valor', 'creada', 'bytes', 'derivados')
+
+    def __init__(self, valor, creada, bytes_):
+        self.valor = valor
+        self.creada = creada          # time.monotonic() al guardarla
+        self.bytes = bytes_
+        self.derivados = {}           # resultados calculados sobre valor (p.ej. indicadores)
+
+    def edad(self):
+        return time.monotonic() - self.creada
+
+
+class CacheSeries:
+    def __init__(self, ttl=TTL_DEFAULT, max_bytes=MAX_BYTES_DEFAULT, max_entradas=None,
+                 ventana_obsoleta=VENTANA_OBSOLETA_DEFAULT, tamano=bytes_df, max_workers=2):
+        """
+        Args:
+            ttl (float): Segundos que una entrada está fresca.
+            max_bytes (int): Tope de memoria de los valores y sus derivados.
+            max_entradas (int): Tope de entradas (None = solo el de memoria).
+            ventana_obsoleta (float): Segundos tras el TTL en que se sirve obsoleta.
+            tamano (callable): Bytes de un valor.
+            max_workers (int): Recargas en segundo plano simultáneas.
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self.ventana_obsoleta = ventana_obsoleta
+        self.tamano = tamano
+        self.max_workers = max_workers
+
+        self._entradas = OrderedDict()  # de la menos a la más recientemente usada
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._revalidando = set()
+        self._pool = None
+
+        self.aciertos = 0
+        self.obsoletos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.revalidaciones = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def consultar(self, clave, obsoleta=True):
+        """
+        Entrada servible y su estado (FRESCA u OBSOLETA), o (None, None) si
+        falta o caducó. Cuenta la consulta y marca la entrada como usada.
+
+        Args:
+            obsoleta (bool): Si es False una entrada obsoleta cuenta como fallo
+                             (se conserva hasta que la carga la reemplace).
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada.edad() >= self.ttl + self.ventana_obsoleta:
+                self._quitar(clave)
+                entrada = None
+            elif entrada is not None and not obsoleta and entrada.edad() >= self.ttl:
+                entrada = None
+
+            if entrada is None:
+                self.fallos += 1
+                estado, resultado = None, 'fallo'
+            else:
+                self._entradas.move_to_end(clave)
+                if entrada.edad() < self.ttl:
+                    self.aciertos += 1
+                    estado, resultado = FRESCA, 'acierto'
+                else:
+                    self.obsoletos += 1
+                    estado, resultado = OBSOLETA, 'obsoleto'
+
+        metricas.incrementar('cache_consultas_total', resultado=resultado)
+        return entrada, estado
+
+    def entrada(self, clave):
+        """Entrada guardada (aunque esté obsoleta) sin contarla como consulta, o None"""
+        with self._lock:
+            return self._entradas.get(clave)
+
+    def vigente(self, clave):
+        """¿Hay una entrada fresca? (no cuenta como consulta)"""
+        entrada = self.entrada(clave)
+        return entrada is not None and entrada.edad() < self.ttl
+
+    def guardar(self, clave, valor):
+        """Guarda (o reemplaza) una entrada fresca y expulsa las menos usadas si hace falta"""
+        entrada = EntradaCache(valor, time.monotonic(), self.tamano(valor))
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = entrada
+            self._bytes += entrada.bytes
+            self._expulsar()
+        return entrada
+
+    def anotar(self, clave, valor, **derivados):
+        """
+        Añade derivados a la entrada de `clave` si sigue guardando `valor`.
+
+        Returns:
+            bool: False si la entrada ya no existe o se reemplazó (recarga o expulsión).
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada.valor is not valor:
+                return False
+
+            entrada.derivados.update(derivados)
+            # Los derivados pueden ser el mismo DataFrame con más columnas: se mide todo otra vez
+            bytes_ = self.tamano(valor) + sum(self.tamano(d) for d in entrada.derivados.values()
+                                              if d is not None and d is not valor)
+            self._bytes += bytes_ - entrada.bytes
+            entrada.bytes = bytes_
+            self._expulsar()
+            return True
+
+    def revalidar(self, clave, cargar):
+        """
+        Recarga `clave` en segundo plano con cargar() (una recarga a la vez por
+        clave). Si cargar() devuelve None se conserva la entrada obsoleta.
+
+        Returns:
+            bool: False si ya había una recarga en curso.
+        """
+        with self._lock:
+            if clave in self._revalidando:
+                return False
+            self._revalidando.add(clave)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='revalidacion')
+            pool = self._pool
+
+        pool.submit(self._recargar, clave, cargar)
+        return True
+
+    def _recargar(self, clave, cargar):
+        try:
+            with metricas.temporizador('cache_revalidacion_segundos'):
+                valor = cargar()
+            if valor is None:
+                metricas.incrementar('cache_revalidaciones_total', resultado='error')
+                return
+            self.guardar(clave, valor)
+            with self._lock:
+                self.revalidaciones += 1
+            metricas.incrementar('cache_revalidaciones_total', resultado='ok')
+        except Exception as e:
+            registro.error("   ❌ Error revalidando {}: {}", clave, e)
+            metricas.incrementar('cache_revalidaciones_total', resultado='error')
+        finally:
+            with self._lock:
+                self._revalidando.discard(clave)
+
+    @property
+    def revalidando(self):
+        """Claves con una recarga en curso"""
+        with self._lock:
+            return set(self._revalidando)
+
+    def _quitar(self, clave):
+        self._bytes -= self._entradas.pop(clave).bytes
+
+    def _expulsar(self):
+        # La más reciente nunca se expulsa: un valor mayor que el tope se sirve igual
+        while len(self._entradas) > 1 and (
+                self._bytes > self.max_bytes or
+                (self.max_entradas is not None and len(self._entradas) > self.max_entradas)):
+            self._quitar(next(iter(self._entradas)))
+            self.expulsiones += 1
+            metricas.incrementar('cache_expulsiones_total')
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        """Entradas, memoria y contadores de consultas, expulsiones y recargas"""
+        with self._lock:
+            consultas = self.aciertos + self.obsoletos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'aciertos': self.aciertos,
+                'obsoletos': self.obsoletos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'revalidaciones': self.revalidaciones,
+                'tasa_aciertos': (self.aciertos + self.obsoletos) / consultas if consultas else None
+            }
@@ -0,0 +1,127 @@
+# ===========================================================================
+#   CONTEXTO DE ANÁLISIS
+#   Vistas limpias y sub-análisis memoizados por versión de DataFrame
+#
+#   get_trading_signals, analyze_ma_alignment, detect_golden_death_cross y
+#   detect_divergences necesitan las mismas filas válidas. En lugar de un
+#   dropna() (copia completa del DataFrame) en cada una, el contexto calcula
+#   una vez las máscaras sobre los arrays NumPy de cada columna y guarda
+#   cada resultado hasta que el DataFrame cambia (filas, columnas o último
+#   precio). Las copias completas que aún se pidan quedan contadas.
+# ===========================================================================
+
+import threading
+import weakref
+
+import numpy as np
+
+from Metricas import metricas
+
+
+def version(df):
+    """Huella barata del contenido: forma, columnas, última fecha y último precio"""
+    if len(df) == 0:
+        return (df.shape, tuple(df.columns))
+    ultimo = df['price'].iat[-1] if 'price' in df.columns else None
+    return (df.shape, tuple(df.columns), df.index[-1], ultimo)
+
+
+class ContextoAnalisis:
+    def __init__(self, df):
+        self._df = weakref.ref(df)
+        self.version = version(df)
+        self.copias = 0
+        self.aciertos = 0
+        self._columnas = {}
+        self._resultados = {}
+        self._lock = threading.RLock()
+
+    @property
+    def df(self):
+        return self._df()
+
+    def vigente(self, df):
+        """¿Sigue describiendo a este DataFrame tal como está ahora?"""
+        return self._df() is df and version(df) == self.version
+
+    def columna(self, nombre):
+        """Valores de una columna como array NumPy (vista; no copia el DataFrame)"""
+        valores = self._columnas.get(nombre)
+        if valores is None:
+            valores = self.df[nombre].to_numpy(dtype=np.float64)
+            self._columnas[nombre] = valores
+        return valores
+
+    def posiciones_validas(self, columnas=None):
+        """Posiciones de las filas sin NaN en `columnas` (None = todas, como dropna())"""
+        clave = ('validas', None if columnas is None else tuple(columnas))
+
+        def calcular():
+            nombres = list(self.df.columns) if columnas is None else columnas
+            mascara = np.ones(len(self.df), dtype=bool)
+            for nombre in nombres:
+                mascara &= ~np.isnan(self.columna(nombre))
+            return np.flatnonzero(mascara)
+
+        return self.memo(clave, calcular)
+
+    def valores(self, columnas, posiciones):
+        """{columna: valores en posiciones} sin materializar filas del DataFrame"""
+        return {nombre: self.columna(nombre)[posiciones] for nombre in columnas}
+
+    def vista(self, columnas=None):
+        """DataFrame sin filas incompletas (copia completa: se cuenta)"""
+        self.copias += 1
+        metricas.incrementar('copias_dataframe_total')
+        return self.df.iloc[self.posiciones_validas(columnas)]
+
+    def memo(self, clave, calcular):
+        """Resultado de calcular() la primera vez; después el valor guardado"""
+        with self._lock:
+            if clave in self._resultados:
+                self.aciertos += 1
+                metricas.incrementar('contexto_consultas_total', resultado='acierto')
+                return self._resultados[clave]
+
+            metricas.incrementar('contexto_consultas_total', resultado='fallo')
+            resultado = calcular()
+            self._resultados[clave] = resultado
+            return resultado
+
+
+class RegistroContextos:
+    """Un contexto vigente por DataFrame; se descarta cuando el DataFrame muere"""
+
+    def __init__(self):
+        self._contextos = {}
+        # RLock: el finalizador puede ejecutarse (GC) dentro de obtener()
+        self._lock = threading.RLock()
+
+    def obtener(self, df):
+        clave = id(df)
+        with self._lock:
+            contexto = self._contextos.get(clave)
+            if contexto is not None and contexto.vigente(df):
+                return contexto
+
+            if contexto is None or contexto.df is not df:
+                weakref.finalize(df, self._olvidar, clave)
+            contexto = ContextoAnalisis(df)
+            self._contextos[clave] = contexto
+            return contexto
+
+    def _olvidar(self, clave):
+        with self._lock:
+            contexto = self._contextos.get(clave)
+            # El id puede haberse reutilizado: solo se borra el contexto del DataFrame muerto
+            if contexto is not None and contexto._df() is None:
+                del self._contextos[clave]
+
+    def __len__(self):
+        return len(self._contextos)
+
+    @property
+    def copias(self):
+        """Copias completas pedidas por los contextos vivos"""
+        with self._lock:
+            return sum(contexto.copias for contexto in self._contextos.values())
@@ -0,0 +1,126 @@
+# ===========================================================================
+#   SERVICIO DE COTIZACIONES
+#   Precios spot en lote (CoinGecko /simple/price, CoinCap /assets?ids=)
+#   con cache de TTL corto
+#
+#   Las monedas de la watchlist se registran una vez; el primer precio que
+#   falte dispara una sola solicitud (troceada) para todas las registradas.
+# ===========================================================================
+
+import threading
+import time
+
+import requests
+
+from Metricas import registro
+from Transporte_HTTP import transporte
+
+# IDs por solicitud (límite práctico de longitud de URL de cada API)
+TAMANO_LOTE = {
+    'coingecko': 250,
+    'coincap': 100
+}
+
+
+class ServicioCotizaciones:
+    def __init__(self, api_config, ttl=30):
+        """
+        Args:
+            api_config (dict): API_CONFIG con base_url y timeout por proveedor.
+            ttl (int): Segundos que un precio se considera vigente.
+        """
+        self.api_config = api_config
+        self.ttl = ttl
+        self._precios = {}       # (proveedor, id) -> (precio, instante)
+        self._watchlist = {}     # proveedor -> set de ids
+        self._lock = threading.Lock()
+        self._descarga_lock = threading.Lock()
+        self.solicitudes = 0
+
+    def registrar(self, ids, proveedor='coingecko'):
+        """Añade ids a la watchlist: se resolverán juntos en el próximo fallo de cache"""
+        with self._lock:
+            self._watchlist.setdefault(proveedor, set()).update(i for i in ids if i)
+
+    def _vigente(self, proveedor, coin_id, ahora):
+        entrada = self._precios.get((proveedor, coin_id))
+        return entrada is not None and ahora - entrada[1] < self.ttl
+
+    def _faltantes(self, ids, proveedor):
+        """Ids sin precio vigente; si hay alguno se suma la watchlist caducada"""
+        ahora = time.monotonic()
+        with self._lock:
+            faltantes = {i for i in ids if not self._vigente(proveedor, i, ahora)}
+            if faltantes:
+                faltantes |= {i for i in self._watchlist.get(proveedor, ())
+                              if not self._vigente(proveedor, i, ahora)}
+        return faltantes
+
+    def precios(self, ids, proveedor='coingecko'):
+        """
+        Devuelve {id: precio_usd} para los ids pedidos. Solo se consultan los
+        que no están en cache, junto con el resto de la watchlist caducada.
+        """
+        ids = [i for i in ids if i]
+
+        if self._faltantes(ids, proveedor):
+            # Un solo hilo descarga; los demás esperan y encuentran el cache lleno
+            with self._descarga_lock:
+                faltantes = self._faltantes(ids, proveedor)
+                if faltantes:
+                    self._descargar(sorted(faltantes), proveedor)
+
+        with self._lock:
+            return {i: self._precios[(proveedor, i)][0] for i in ids
+                    if self._precios.get((proveedor, i), (None,))[0] is not None}
+
+    def precio(self, coin_id, proveedor='coingecko'):
+        """Precio spot de una moneda o None"""
+        return self.precios([coin_id], proveedor).get(coin_id)
+
+    def _descargar(self, ids, proveedor):
+        """Resuelve los ids en lotes de TAMANO_LOTE[proveedor]"""
+        tamano = TAMANO_LOTE.get(proveedor, 100)
+        for inicio in range(0, len(ids), tamano):
+            lote = ids[inicio:inicio + tamano]
+            try:
+                if proveedor == 'coingecko':
+                    nuevos = self._lote_coingecko(lote)
+                elif proveedor == 'coincap':
+                    nuevos = self._lote_coincap(lote)
+                else:
+                    raise ValueError(f"Proveedor de cotizaciones no soportado: {proveedor}")
+            except requests.exceptions.RequestException as e:
+                registro.error("❌ Error obteniendo cotizaciones de {}: {}", proveedor, e)
+                continue
+
+            # Los ids que la API no devuelve también se cachean (como None) durante el TTL
+            instante = time.monotonic()
+            with self._lock:
+                for coin_id in lote:
+                    self._precios[(proveedor, coin_id)] = (nuevos.get(coin_id), instante)
+
+    def _get(self, proveedor, url, params):
+        response = transporte.get(url, proveedor=proveedor, params=params,
+                                  timeout=self.api_config[proveedor]['timeout'])
+        response.raise_for_status()
+        self.solicitudes += 1
+        return response.json()
+
+    def _lote_coingecko(self, ids):
+        data = self._get(
+            'coingecko',
+            f"{self.api_config['coingecko']['base_url']}/simple/price",
+            {"ids": ",".join(ids), "vs_currencies": "usd"}
+        )
+        return {coin_id: float(valores['usd']) for coin_id, valores in data.items()
+                if valores.get('usd') is not None}
+
+    def _lote_coincap(self, ids):
+        data = self._get(
+            'coincap',
+            f"{self.api_config['coincap']['base_url']}/assets",
+            {"ids": ",".join(ids), "limit": len(ids)}
+        )
+        return {activo['id']: float(activo['priceUsd']) for activo in data.get('data', [])
+                if activo.get('priceUsd')}
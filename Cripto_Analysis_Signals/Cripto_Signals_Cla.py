@@ -6,15 +6,15 @@
 #   Cluade
 # ===========================================================================
 
-import requests
 import pandas as pd
-import ta
-from tabulate import tabulate
 from colorama import Fore, Style, init
 import time
 import numpy as np
-
-init(autoreset=True)
+import argparse
+import Nucleo_Cripto as nucleo
+from ANALIZADOR_CRYPTO_CLA import API_CONFIG
+from Indicadores_Vectorizados import aplicar_indicadores
+from Universo_Activos import ConstructorUniverso, ORDENES
 
 criptos = {
     "Bitcoin": "bitcoin",
@@ -27,72 +27,79 @@ criptos = {
 
 def obtener_datos(coin_id, dias=30, reintentos=3):
     """
-    Obtiene datos de precios con manejo de errores y reintentos
+    Obtiene datos de precios del núcleo compartido (failover entre proveedores,
+    cache y almacén en disco, los mismos que usan los otros scripts) con reintentos
     """
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-    params = {"vs_currency": "usd", "days": dias, "interval": "daily"}
-    
+    df = None
     for intento in range(reintentos):
-        try:
-            print(f"Obteniendo datos para {coin_id}... (intento {intento + 1})")
-            r = requests.get(url, params=params, timeout=10)
-            r.raise_for_status()  # Lanza excepción si hay error HTTP
-            
-            data = r.json()
-            if "prices" not in data:
-                print(f"Error: No se encontraron datos de precios para {coin_id}")
-                return None
-                
-            precios = data["prices"]
-            if len(precios) < 20:  # Necesitamos suficientes datos para MACD
-                print(f"Error: Datos insuficientes para {coin_id}")
-                return None
-                
-            df = pd.DataFrame(precios, columns=["timestamp", "price"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-            df.set_index("timestamp", inplace=True)
-            df = df.sort_index()  # Asegurar orden cronológico
-            
-            return df
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error de conexión para {coin_id} (intento {intento + 1}): {e}")
-            if intento < reintentos - 1:
-                time.sleep(2)  # Esperar antes del siguiente intento
-            continue
-        except Exception as e:
-            print(f"Error inesperado para {coin_id}: {e}")
-            return None
+        print(f"Obteniendo datos para {coin_id}... (intento {intento + 1})")
+        df = nucleo.series([coin_id], dias)[coin_id]
+        if df is not None:
+            break
+        if intento < reintentos - 1:
+            time.sleep(2)  # Esperar antes del siguiente intento
     
-    return None
+    if df is None:
+        print(f"Error: No se encontraron datos de precios para {coin_id}")
+        return None
+    
+    if len(df) < 20:  # Necesitamos suficientes datos para MACD
+        print(f"Error: Datos insuficientes para {coin_id}")
+        return None
+    
+    # Copia propia con solo el precio: las series del núcleo son compartidas
+    return nucleo.vista(df, ['price'])
 
-def analizar(df):
+# Columnas del motor vectorizado -> nombres usados en este script
+COLUMNAS_SEÑALES = {
+    'RSI': 'rsi',
+    'MACD': 'macd',
+    'MACD_signal': 'macd_signal',
+    'MACD_histogram': 'macd_histogram'
+}
+
+def analizar_lote(dataframes):
     """
-    Calcula RSI y MACD con validación de datos
+    Calcula RSI y MACD de varias criptos en una sola pasada vectorizada
     """
-    if df is None or len(df) < 20:
-        return None
+    validos = {nombre: df for nombre, df in dataframes.items() if df is not None and len(df) >= 20}
     
     try:
-        # Calcular RSI
-        df['rsi'] = ta.momentum.RSIIndicator(df['price'], window=14).rsi()
-        
-        # Calcular MACD con parámetros estándar
-        macd_indicator = ta.trend.MACD(df['price'], window_fast=12, window_slow=26, window_sign=9)
-        df['macd'] = macd_indicator.macd()
-        df['macd_signal'] = macd_indicator.macd_signal()
-        df['macd_histogram'] = macd_indicator.macd_diff()
-        
-        # Verificar que tenemos datos válidos
-        if df['macd_signal'].isna().all():
-            print("Advertencia: No se pudo calcular MACD signal")
-            return None
-            
-        return df
-        
+        aplicar_indicadores(validos, columnas=list(COLUMNAS_SEÑALES), renombrar=COLUMNAS_SEÑALES)
     except Exception as e:
         print(f"Error al calcular indicadores: {e}")
+        return {nombre: None for nombre in dataframes}
+    
+    resultado = {}
+    for nombre in dataframes:
+        df = validos.get(nombre)
+        # Verificar que tenemos datos válidos
+        if df is not None and df['macd_signal'].isna().all():
+            print("Advertencia: No se pudo calcular MACD signal")
+            df = None
+        resultado[nombre] = df
+    
+    return resultado
+
+def señales_nucleo(df):
+    """
+    Precio, RSI y MACD de una serie con los indicadores del núcleo, con los
+    nombres de este script (copia propia: no se recalcula nada)
+    """
+    if df is None or len(df) < 20:
         return None
+    
+    vista = nucleo.vista(df, ['price', *COLUMNAS_SEÑALES], renombrar=COLUMNAS_SEÑALES)
+    if vista['macd_signal'].isna().all():
+        print("Advertencia: No se pudo calcular MACD signal")
+        return None
+    return vista
+
+def analizar(df):
+    """
+    Calcula RSI y MACD con validación de datos
+    """
+    return analizar_lote({'cripto': df})['cripto']
 
 def interpretar_señales(df):
     """
@@ -149,53 +156,61 @@ def obtener_precio_actual(coin_id):
     Obtiene el precio actual como respaldo
     """
     try:
-        url = f"https://api.coingecko.com/api/v3/simple/price"
-        params = {"ids": coin_id, "vs_currencies": "usd"}
-        r = requests.get(url, params=params, timeout=5)
-        r.raise_for_status()
-        data = r.json()
-        return data[coin_id]["usd"]
+        # Se resuelve junto con el resto de criptos registradas (una sola llamada)
+        return nucleo.motor().quotes.precio(coin_id)
     except:
         return None
 
-def main():
+def construir_fila(nombre, cid, datos, df):
+    """
+    Interpreta una cripto ya analizada. Devuelve la fila de la tabla.
+    """
+    try:
+        if df is not None:
+            rsi, macd, precio = interpretar_señales(df)
+            return [nombre, f"${precio:,.2f}", rsi, macd]
+        
+        if datos is not None:
+            # Intentar obtener solo el precio actual
+            precio_actual = obtener_precio_actual(cid)
+            if precio_actual:
+                return [nombre, f"${precio_actual:,.2f}", 
+                        Fore.YELLOW + "🟡 Sin datos RSI", 
+                        Fore.YELLOW + "🟡 Sin datos MACD"]
+        
+        return [nombre, "❌ Sin datos", "❌ Error", "❌ Error"]
+            
+    except Exception as e:
+        print(f"Error procesando {nombre}: {e}")
+        return [nombre, "❌ Error", "❌ Error", "❌ Error"]
+
+def main(argv=None):
+    from tabulate import tabulate
+    init(autoreset=True)
+
+    parser = argparse.ArgumentParser(description="RSI y MACD de una lista de criptomonedas")
+    parser.add_argument('--top', type=int, help="Usar el top-N del mercado en lugar de la lista fija")
+    parser.add_argument('--orden', choices=list(ORDENES), default='market_cap')
+    args = parser.parse_args(argv)
+    
+    monedas = criptos
+    if args.top:
+        universo = ConstructorUniverso(API_CONFIG).universo(args.top, args.orden)
+        # Ids de todos los proveedores en el núcleo: el failover también sirve a este script
+        nucleo.motor(universo)
+        monedas = {nombre: ids['coingecko'] for nombre, ids in universo.items() if ids.get('coingecko')} or criptos
+    
     print(f"{Fore.CYAN}{'='*70}")
     print(f"{Fore.CYAN}🚀 ANALIZADOR DE CRIPTOMONEDAS - RSI & MACD")
     print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
     
-    tabla = []
+    nucleo.motor().quotes.registrar(monedas.values())
     
-    for nombre, cid in criptos.items():
-        print(f"\n{Fore.BLUE}Procesando {nombre}...{Style.RESET_ALL}")
-        
-        try:
-            # Obtener y analizar datos
-            df = obtener_datos(cid, dias=50)  # Más días para mejor cálculo de MACD
-            
-            if df is not None:
-                df = analizar(df)
-                
-                if df is not None:
-                    rsi, macd, precio = interpretar_señales(df)
-                    tabla.append([nombre, f"${precio:,.2f}", rsi, macd])
-                else:
-                    # Intentar obtener solo el precio actual
-                    precio_actual = obtener_precio_actual(cid)
-                    if precio_actual:
-                        tabla.append([nombre, f"${precio_actual:,.2f}", 
-                                    Fore.YELLOW + "🟡 Sin datos RSI", 
-                                    Fore.YELLOW + "🟡 Sin datos MACD"])
-                    else:
-                        tabla.append([nombre, "❌ Sin datos", "❌ Error", "❌ Error"])
-            else:
-                tabla.append([nombre, "❌ Sin datos", "❌ Error", "❌ Error"])
-                
-        except Exception as e:
-            print(f"Error procesando {nombre}: {e}")
-            tabla.append([nombre, "❌ Error", "❌ Error", "❌ Error"])
-        
-        # Pausa entre requests para evitar rate limiting
-        time.sleep(1)
+    # Descarga concurrente e indicadores del núcleo (compartidos con los otros scripts)
+    print(f"Obteniendo datos para {len(monedas)} criptos...")
+    datos, indicadores = nucleo.indicadores(monedas.values(), dias=50)
+    tabla = [construir_fila(nombre, cid, datos[cid], señales_nucleo(indicadores[cid]))
+             for nombre, cid in monedas.items()]
     
     print(f"\n{Fore.CYAN}{'='*70}")
     print(f"{Fore.CYAN}📊 RESULTADOS DEL ANÁLISIS TÉCNICO")
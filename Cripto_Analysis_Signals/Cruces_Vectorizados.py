@@ -0,0 +1,134 @@
+# ===========================================================================
+#   CRUCES VECTORIZADOS
+#   Todos los cruces entre dos series (MA50/MA200, MA9/MA21, MACD/señal...)
+#   sobre el histórico completo y para todo el universo a la vez
+#
+#   Un cruce es un cambio de signo de (rápida - lenta) entre dos barras
+#   consecutivas con ambos valores definidos; mismas reglas que el bucle
+#   original de detect_golden_death_cross:
+#       alcista: anterior <= 0 y actual > 0   (Golden Cross)
+#       bajista: anterior >= 0 y actual < 0   (Death Cross)
+# ===========================================================================
+
+import numpy as np
+
+from Indicadores_Vectorizados import MatrizPrecios
+
+ALCISTA = 1
+BAJISTA = -1
+
+ETIQUETAS_DEFAULT = ('Golden Cross', 'Death Cross')
+
+COLUMNAS_EVENTOS = ['activo', 'timestamp', 'evento', 'direccion', 'rapida', 'lenta',
+                    'magnitud', 'magnitud_pct', 'barras_desde']
+
+
+def cruces(rapida, lenta):
+    """
+    Cruces entre dos series alineadas.
+
+    Args:
+        rapida, lenta (np.ndarray): Vectores (T,) o matrices (T x N). Los NaN
+            (relleno inicial, ventanas incompletas) nunca generan cruce.
+
+    Returns:
+        tuple: (filas, columnas, direccion, magnitud) con un elemento por
+               cruce, ordenados por columna y fila. direccion es ALCISTA o
+               BAJISTA y magnitud el salto de (rápida - lenta) en la barra
+               del cruce, en unidades de la serie.
+    """
+    rapida = np.asarray(rapida, dtype=np.float64)
+    lenta = np.asarray(lenta, dtype=np.float64)
+    if rapida.ndim == 1:
+        rapida, lenta = rapida[:, None], lenta[:, None]
+
+    spread = rapida - lenta
+    anterior, actual = spread[:-1], spread[1:]
+    with np.errstate(invalid='ignore'):
+        alcista = (anterior <= 0) & (actual > 0)
+        bajista = (anterior >= 0) & (actual < 0)
+
+    # Orden por columna (activo) y después por tiempo
+    columnas, filas = np.nonzero((alcista | bajista).T)
+    direccion = np.where(alcista[filas, columnas], ALCISTA, BAJISTA)
+    magnitud = actual[filas, columnas] - anterior[filas, columnas]
+    return filas + 1, columnas, direccion, magnitud
+
+
+def detectar_cruces(dataframes, rapida='MA50', lenta='MA200', etiquetas=ETIQUETAS_DEFAULT):
+    """
+    Eventos de cruce de todo el universo en una sola pasada.
+
+    Args:
+        dataframes (dict): {nombre: DataFrame con las columnas rapida y lenta}.
+        rapida, lenta (str): Columnas a cruzar.
+        etiquetas (tuple): Nombre del evento (alcista, bajista).
+
+    Returns:
+        pd.DataFrame: Un evento por fila con COLUMNAS_EVENTOS. barras_desde
+                      cuenta como days_since (1 = la última barra).
+    """
+    import pandas as pd
+
+    validos = {n: df for n, df in dataframes.items()
+               if df is not None and rapida in df.columns and lenta in df.columns}
+    matriz_rapida = MatrizPrecios(validos, columna=rapida)
+    matriz_lenta = MatrizPrecios(validos, columna=lenta)
+    if not matriz_rapida.nombres:
+        return pd.DataFrame(columns=COLUMNAS_EVENTOS)
+
+    R, L = matriz_rapida.valores, matriz_lenta.valores
+    filas, columnas, direccion, magnitud = cruces(R, L)
+
+    # Posición dentro de cada serie (la matriz está alineada a la derecha)
+    T = R.shape[0]
+    longitudes = matriz_rapida.longitudes[columnas]
+    posiciones = filas - (T - longitudes)
+
+    nombres = np.array(matriz_rapida.nombres, dtype=object)[columnas]
+
+    # Un take por activo (los eventos ya vienen agrupados por columna)
+    cortes = np.flatnonzero(np.diff(columnas)) + 1
+    timestamps = [
+        matriz_rapida.indices[matriz_rapida.nombres[columnas[tramo[0]]]].take(posiciones[tramo]).to_numpy()
+        for tramo in np.split(np.arange(len(columnas)), cortes) if len(tramo)
+    ]
+    timestamps = np.concatenate(timestamps) if timestamps else []
+
+    valor_lenta = L[filas, columnas]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        magnitud_pct = np.where(valor_lenta != 0, magnitud / np.abs(valor_lenta) * 100, np.nan)
+
+    return pd.DataFrame({
+        'activo': nombres,
+        'timestamp': timestamps,
+        'evento': np.where(direccion == ALCISTA, etiquetas[0], etiquetas[1]),
+        'direccion': direccion,
+        'rapida': R[filas, columnas],
+        'lenta': valor_lenta,
+        'magnitud': magnitud,
+        'magnitud_pct': magnitud_pct,
+        'barras_desde': longitudes - posiciones
+    }, columns=COLUMNAS_EVENTOS)
+
+
+def ultimo_cruce(rapida, lenta, ventana=None):
+    """
+    Cruce más reciente de un solo activo.
+
+    Args:
+        rapida, lenta (np.ndarray): Series (T,) sin huecos intermedios.
+        ventana (int): Solo cruces dentro de las últimas `ventana` barras
+                       (barras_desde < ventana), como el análisis original.
+
+    Returns:
+        tuple | None: (direccion, barras_desde, magnitud) o None.
+    """
+    filas, _, direccion, magnitud = cruces(rapida, lenta)
+    if len(filas) == 0:
+        return None
+
+    barras_desde = len(rapida) - filas[-1]
+    if ventana is not None and barras_desde >= ventana:
+        return None
+    return int(direccion[-1]), int(barras_desde), float(magnitud[-1])
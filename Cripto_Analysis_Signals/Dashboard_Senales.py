@@ -0,0 +1,104 @@
+# ===========================================================================
+#   DASHBOARD DE SEÑALES
+#   Vista Streamlit de la instantánea publicada por Instantanea_Senales.py
+#
+#   El dashboard nunca descarga ni calcula indicadores: lee el puntero
+#   actual.json y carga la versión que indica. La carga se cachea por
+#   versión y se comparte entre todas las sesiones, así que cargar la
+#   página o cambiar un filtro solo filtra DataFrames en memoria.
+#
+#   Uso:
+#       python Instantanea_Senales.py --cada 300      # productor (uno solo)
+#       streamlit run Dashboard_Senales.py            # visores
+# ===========================================================================
+
+import streamlit as st
+
+from Instantanea_Senales import DIRECTORIO_DEFAULT, actual, cargar
+
+# Segundos entre lecturas del puntero (la versión vigente)
+INTERVALO_PUNTERO = 15
+
+SEÑALES = ['COMPRA FUERTE', 'COMPRA', 'NEUTRO', 'VENTA', 'VENTA FUERTE']
+
+
+@st.cache_data(ttl=INTERVALO_PUNTERO, show_spinner=False)
+def _puntero(directorio):
+    return actual(directorio)
+
+
+@st.cache_resource(max_entries=2, show_spinner="Cargando instantánea...")
+def _instantanea(version, directorio):
+    # cache_resource: un solo objeto por versión para todas las sesiones (solo lectura)
+    return cargar(version, directorio)
+
+
+def _filtrar(resumen, señales, score, texto):
+    filtrado = resumen[resumen['Señal'].isin(señales) & resumen['Score'].between(*score)]
+    if texto:
+        filtrado = filtrado[filtrado['Crypto'].str.contains(texto, case=False, regex=False)]
+    return filtrado
+
+
+def main():
+    st.set_page_config(page_title="Señales Cripto", page_icon="📊", layout="wide")
+    st.title("📊 Señales Cripto")
+
+    puntero = _puntero(DIRECTORIO_DEFAULT)
+    if not puntero:
+        st.warning("No hay instantánea publicada. Ejecutá `python Instantanea_Senales.py`.")
+        st.stop()
+
+    resumen, series = _instantanea(puntero['version'], DIRECTORIO_DEFAULT)
+    st.caption(f"Instantánea {puntero['version']} · {puntero['generado']} · "
+               f"{puntero['activos']} activos · velas {puntero['timeframe']}")
+    if resumen.empty:
+        st.info("La instantánea no tiene activos con señales.")
+        st.stop()
+
+    with st.sidebar:
+        st.header("Filtros")
+        señales = st.multiselect("Señal", SEÑALES, default=SEÑALES)
+        score = st.slider("Score", -4.0, 4.0, (-4.0, 4.0), step=0.05)
+        texto = st.text_input("Buscar cripto")
+
+    filtrado = _filtrar(resumen, señales, score, texto)
+    st.dataframe(
+        filtrado, hide_index=True, use_container_width=True,
+        column_config={
+            'Precio': st.column_config.NumberColumn(format="$%.4f"),
+            'Score': st.column_config.NumberColumn(format="%.2f"),
+            'RSI': st.column_config.NumberColumn(format="%.1f"),
+            'MACD': st.column_config.NumberColumn(format="%.4f"),
+            'Confianza': st.column_config.ProgressColumn(min_value=0, max_value=100, format="%d%%")
+        }
+    )
+
+    if filtrado.empty:
+        return
+
+    nombre = st.selectbox("Detalle", filtrado['Crypto'])
+    fila = filtrado[filtrado['Crypto'] == nombre].iloc[0]
+    serie = series[series['Crypto'] == nombre].set_index('timestamp')
+
+    columnas = st.columns(4)
+    columnas[0].metric("Precio", f"${fila['Precio']:,.4f}")
+    columnas[1].metric("Señal", fila['Señal'], f"{fila['Score']:+.2f}")
+    columnas[2].metric("RSI", f"{fila['RSI']:.1f}")
+    columnas[3].metric("Cruce", fila['Cruce'])
+    st.caption(fila['Descripción'])
+
+    st.subheader("Precio y medias móviles")
+    st.line_chart(serie[['price', 'MA9', 'MA21', 'MA50', 'MA200']])
+    izquierda, derecha = st.columns(2)
+    with izquierda:
+        st.subheader("RSI")
+        st.line_chart(serie[['RSI']])
+    with derecha:
+        st.subheader("MACD")
+        st.line_chart(serie[['MACD', 'MACD_signal']])
+
+
+# streamlit run ejecuta el script como __main__
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+# ===========================================================================
+#   FLUJO DE TICKS
+#   Ingesta en streaming de operaciones y agregación a velas en memoria
+#
+#   Protocolo de línea: un JSON por línea (NDJSON) con
+#       {"s": "BTC", "p": 65000.5, "q": 0.012, "t": 1700000000123}
+#   (símbolo de CryptoCompare, precio, cantidad, milisegundos epoch).
+#   Se consume por TCP (tcp://host:puerto, solo biblioteca estándar) o por
+#   websocket (ws://, wss://) si está instalado el paquete `websockets`.
+#
+#   Cada tick actualiza la vela abierta de su símbolo; la vela se cierra al
+#   llegar el primer tick de la cubeta siguiente o cuando el reloj de
+#   eventos (el tick más reciente de cualquier símbolo) la deja atrás. Las
+#   velas cerradas se entregan en orden a un callback; ReceptorAnalizador
+#   las pasa a CryptoAnalyzer.update_with_new_bar (O(1) por vela).
+#
+#   El servidor de reproducción sirve ticks grabados (o sintéticos) a la
+#   velocidad pedida para pruebas de carga sin tocar un exchange real.
+#
+#   Uso:
+#       python Flujo_Ticks.py sinteticos ticks.ndjson --ticks 500000 --simbolos 50
+#       python Flujo_Ticks.py servidor --archivo ticks.ndjson --velocidad 60
+#       python Flujo_Ticks.py cliente --url tcp://127.0.0.1:8765 --analizar
+#       python Flujo_Ticks.py prueba --ticks 200000 --simbolos 50
+# ===========================================================================
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import numpy as np
+
+from Memoria_Compacta import indice_epoch
+from Metricas import metricas, registro
+from Temporalidades import SEGUNDOS, dias_para_velas
+
+PUERTO_DEFAULT = 8765
+
+# Velas cerradas que se guardan en memoria por símbolo
+VELAS_EN_MEMORIA = 500
+
+# Reintentos de conexión del cliente (espera exponencial desde 0.5 s)
+REINTENTOS_DEFAULT = 5
+
+# El servidor envía los ticks en tandas de como máximo este intervalo de reloj
+INTERVALO_ENVIO = 0.01
+
+Vela = namedtuple('Vela', 'simbolo inicio open high low close volume ticks')
+
+
+def parsear_tick(linea):
+    """Línea NDJSON -> (símbolo, precio, cantidad, segundos epoch) o None si no es válida"""
+    try:
+        dato = json.loads(linea)
+        return dato['s'], float(dato['p']), float(dato.get('q', 0.0)), dato['t'] / 1000.0
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class AgregadorVelas:
+    def __init__(self, timeframe='minute', al_cerrar=None, velas_en_memoria=VELAS_EN_MEMORIA):
+        """
+        Args:
+            timeframe (str): Clave de SEGUNDOS (duración de cada vela).
+            al_cerrar (callable): al_cerrar(vela) por cada vela cerrada, en orden.
+            velas_en_memoria (int): Velas cerradas que se conservan por símbolo.
+        """
+        self.timeframe = timeframe
+        self.paso = SEGUNDOS[timeframe]
+        self.al_cerrar = al_cerrar
+        self.velas_en_memoria = velas_en_memoria
+
+        self.abiertas = {}        # símbolo -> [cubeta, open, high, low, close, volumen, ticks]
+        self.velas = {}           # símbolo -> deque de Vela cerradas
+        self.ultima_cerrada = {}  # símbolo -> cubeta de su última vela cerrada
+        self.reloj = None         # cubeta del tick más reciente (tiempo de eventos)
+        self.ticks = 0
+        self.tardios = 0
+        self.cerradas = 0
+
+    def procesar(self, simbolo, precio, cantidad, segundos):
+        """Añade un tick a la vela abierta de su símbolo (cierra la anterior si cambió la cubeta)"""
+        cubeta = int(segundos // self.paso)
+        self.ticks += 1
+
+        if cubeta <= self.ultima_cerrada.get(simbolo, -1):
+            # Tick de una vela ya cerrada (también por el reloj de eventos): se descarta
+            self.tardios += 1
+            return
+
+        vela = self.abiertas.get(simbolo)
+        if vela is None:
+            self.abiertas[simbolo] = [cubeta, precio, precio, precio, precio, cantidad, 1]
+        elif cubeta == vela[0]:
+            if precio > vela[2]:
+                vela[2] = precio
+            elif precio < vela[3]:
+                vela[3] = precio
+            vela[4] = precio
+            vela[5] += cantidad
+            vela[6] += 1
+        elif cubeta > vela[0]:
+            self._cerrar(simbolo, vela)
+            self.abiertas[simbolo] = [cubeta, precio, precio, precio, precio, cantidad, 1]
+        else:
+            # Tick anterior a la vela abierta: se descarta
+            self.tardios += 1
+            return
+
+        if self.reloj is None or cubeta > self.reloj:
+            self.reloj = cubeta
+            self.cerrar_vencidas()
+
+    def cerrar_vencidas(self, reloj=None):
+        """Cierra las velas de cubetas anteriores al reloj (símbolos sin ticks recientes)"""
+        reloj = self.reloj if reloj is None else reloj
+        if reloj is None:
+            return
+        for simbolo in [s for s, vela in self.abiertas.items() if vela[0] < reloj]:
+            self._cerrar(simbolo, self.abiertas.pop(simbolo))
+
+    def cerrar_todas(self):
+        """Cierra todas las velas abiertas (fin del flujo)"""
+        for simbolo in list(self.abiertas):
+            self._cerrar(simbolo, self.abiertas.pop(simbolo))
+
+    def _cerrar(self, simbolo, vela):
+        cubeta, apertura, maximo, minimo, cierre, volumen, ticks = vela
+        self.ultima_cerrada[simbolo] = cubeta
+        cerrada = Vela(simbolo, cubeta * self.paso, apertura, maximo, minimo, cierre, volumen, ticks)
+        historial = self.velas.get(simbolo)
+        if historial is None:
+            historial = self.velas[simbolo] = deque(maxlen=self.velas_en_memoria)
+        historial.append(cerrada)
+        self.cerradas += 1
+        if self.al_cerrar:
+            self.al_cerrar(cerrada)
+
+
+class ReceptorAnalizador:
+    """
+    Entrega las velas cerradas a CryptoAnalyzer.
+
+    La primera vela de cada cripto siembra su estado incremental con el
+    histórico anterior a esa vela (una descarga); las siguientes son
+    update_with_new_bar. Se ejecuta en un único hilo aparte para no bloquear
+    la lectura del flujo y conservar el orden de las velas.
+    """
+
+    def __init__(self, analyzer, timeframe='minute', al_senal=None):
+        self.analyzer = analyzer
+        self.timeframe = timeframe
+        self.al_senal = al_senal
+        self.por_simbolo = {
+            ids['cryptocompare']: nombre
+            for nombre, ids in analyzer.universe.items() if ids.get('cryptocompare')
+        }
+        self.senales = {}
+        self._sin_historico = set()
+        self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix='receptor')
+
+    def __call__(self, vela):
+        self._hilo.submit(self._entregar, vela)
+
+    def _sembrar(self, nombre, inicio):
+        df = self.analyzer.get_crypto_data(nombre, days=dias_para_velas(self.timeframe, 200),
+                                           timeframe=self.timeframe, fresh=True)
+        if df is None:
+            self._sin_historico.add(nombre)
+            return None
+        segundos = np.asarray(indice_epoch(df.index), dtype=np.int64)
+        return self.analyzer.seed_indicator_state(nombre, df[segundos < inicio])
+
+    def _entregar(self, vela):
+        nombre = self.por_simbolo.get(vela.simbolo)
+        if nombre is None or nombre in self._sin_historico:
+            return
+        try:
+            if nombre not in self.analyzer.indicator_states and self._sembrar(nombre, vela.inicio) is None:
+                return
+            senales = self.analyzer.update_with_new_bar(nombre, vela.close)
+        except Exception as e:
+            registro.error("❌ Error entregando vela de {}: {}", nombre, e)
+            return
+
+        self.senales[nombre] = senales
+        metricas.incrementar('flujo_velas_analizadas_total', timeframe=self.timeframe)
+        if self.al_senal:
+            self.al_senal(nombre, vela, senales)
+
+    def cerrar(self):
+        """Espera a que se entreguen las velas pendientes"""
+        self._hilo.shutdown(wait=True)
+
+
+async def _lineas_tcp(host, puerto):
+    reader, writer = await asyncio.open_connection(host, puerto, limit=2 ** 20)
+    try:
+        while True:
+            linea = await reader.readline()
+            if not linea:
+                return
+            yield linea
+    finally:
+        writer.close()
+
+
+async def _lineas_websocket(url):
+    try:
+        import websockets
+    except ImportError:
+        raise RuntimeError("Para ws:// hace falta el paquete websockets (pip install websockets); "
+                           "tcp:// funciona sin dependencias") from None
+    async with websockets.connect(url, max_size=None) as ws:
+        async for mensaje in ws:
+            # Un mensaje puede traer varios ticks separados por saltos de línea
+            for linea in (mensaje.splitlines() if isinstance(mensaje, str) else mensaje.split(b'\n')):
+                if linea:
+                    yield linea
+
+
+def _lineas(url):
+    destino = urlparse(url)
+    if destino.scheme == 'tcp':
+        return _lineas_tcp(destino.hostname, destino.port or PUERTO_DEFAULT)
+    if destino.scheme in ('ws', 'wss'):
+        return _lineas_websocket(url)
+    raise ValueError(f"Esquema no soportado: {url} (usar tcp://, ws:// o wss://)")
+
+
+async def consumir(url, agregador, parar=None, reintentos=REINTENTOS_DEFAULT):
+    """
+    Lee ticks de `url` y los agrega hasta que el flujo termina o se activa `parar`.
+
+    Reconecta con espera exponencial si la conexión se corta; al terminar se
+    cierran las velas abiertas.
+
+    Returns:
+        int: Ticks procesados.
+    """
+    fallos = 0
+    try:
+        while parar is None or not parar.is_set():
+            try:
+                async for linea in _lineas(url):
+                    tick = parsear_tick(linea)
+                    if tick is None:
+                        metricas.incrementar('flujo_lineas_invalidas_total')
+                        continue
+                    agregador.procesar(*tick)
+                    fallos = 0
+                    if parar is not None and parar.is_set():
+                        break
+                return agregador.ticks
+            except (ConnectionError, OSError) as e:
+                fallos += 1
+                if fallos > reintentos:
+                    registro.error("❌ Flujo {} no disponible: {}", url, e)
+                    return agregador.ticks
+                espera = 0.5 * 2 ** (fallos - 1)
+                registro.warning("⚠️  Conexión con {} perdida ({}); reintento en {:.1f}s", url, e, espera)
+                await asyncio.sleep(espera)
+        return agregador.ticks
+    finally:
+        agregador.cerrar_todas()
+        metricas.incrementar('flujo_ticks_total', agregador.ticks)
+
+
+def ticks_sinteticos(simbolos, n, tasa=1000.0, inicio=None, semilla=None):
+    """
+    Ticks de paseo aleatorio para pruebas (mismo formato que el protocolo).
+
+    Args:
+        simbolos (list): Símbolos a repartir.
+        n (int): Ticks en total.
+        tasa (float): Ticks por segundo de tiempo de mercado.
+        inicio (float): Segundos epoch del primer tick (None = ahora - duración).
+
+    Returns:
+        list: dicts {s, p, q, t} ordenados por tiempo.
+    """
+    rng = np.random.default_rng(semilla)
+    duracion = n / tasa
+    inicio = time.time() - duracion if inicio is None else inicio
+    tiempos = inicio + np.sort(rng.uniform(0, duracion, n))
+    indices = rng.integers(0, len(simbolos), n)
+    cantidades = rng.exponential(0.5, n)
+    precios = 100 * np.ones(len(simbolos))
+    rendimientos = rng.normal(0, 0.0005, n)
+
+    ticks = []
+    for t, k, q, r in zip(tiempos, indices, cantidades, rendimientos):
+        precios[k] *= 1 + r
+        ticks.append({'s': simbolos[k], 'p': round(float(precios[k]), 6), 'q': round(float(q), 6),
+                      't': int(t * 1000)})
+    return ticks
+
+
+def cargar_ticks(ruta):
+    """Ticks grabados (NDJSON) como líneas listas para enviar, ordenadas por tiempo"""
+    with open(ruta, 'rb') as f:
+        lineas = [linea.rstrip(b'\n') + b'\n' for linea in f if linea.strip()]
+    tiempos = [json.loads(linea)['t'] for linea in lineas]
+    orden = np.argsort(tiempos, kind='stable')
+    return [lineas[i] for i in orden], [tiempos[i] / 1000.0 for i in orden]
+
+
+class ServidorReproduccion:
+    def __init__(self, lineas, tiempos, velocidad=1.0, host='127.0.0.1', puerto=PUERTO_DEFAULT):
+        """
+        Args:
+            lineas (list): Ticks codificados (bytes NDJSON con salto de línea).
+            tiempos (list): Segundos epoch de cada tick (misma longitud).
+            velocidad (float): Multiplicador del tiempo grabado (0 = sin pausas).
+        """
+        self.lineas = lineas
+        self.tiempos = tiempos
+        self.velocidad = velocidad
+        self.host = host
+        self.puerto = puerto
+        self._servidor = None
+
+    @classmethod
+    def desde_ticks(cls, ticks, **kwargs):
+        lineas = [(json.dumps(t, separators=(',', ':')) + '\n').encode() for t in ticks]
+        return cls(lineas, [t['t'] / 1000.0 for t in ticks], **kwargs)
+
+    async def _atender(self, reader, writer):
+        origen_grabacion = self.tiempos[0] if self.tiempos else 0.0
+        origen_reloj = time.perf_counter()
+        inicio = 0
+        try:
+            while inicio < len(self.lineas):
+                if self.velocidad > 0:
+                    # Tanda: los ticks cuyo instante reproducido ya llegó (o llega en INTERVALO_ENVIO)
+                    limite = origen_grabacion + (time.perf_counter() - origen_reloj + INTERVALO_ENVIO) * self.velocidad
+                    fin = inicio
+                    while fin < len(self.lineas) and self.tiempos[fin] <= limite:
+                        fin += 1
+                    if fin == inicio:
+                        espera = (self.tiempos[inicio] - origen_grabacion) / self.velocidad \
+                            - (time.perf_counter() - origen_reloj)
+                        await asyncio.sleep(max(espera, 0.0))
+                        continue
+                else:
+                    fin = min(inicio + 1000, len(self.lineas))
+
+                writer.write(b''.join(self.lineas[inicio:fin]))
+                await writer.drain()
+                inicio = fin
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self
+
+    async def detener(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+
+    @property
+    def url(self):
+        return f"tcp://{self.host}:{self.puerto}"
+
+
+async def prueba_carga(n=200000, simbolos=50, velocidad=0.0, tasa=5000.0, timeframe='minute'):
+    """
+    Servidor y cliente en el mismo proceso con ticks sintéticos.
+
+    Returns:
+        dict: ticks, velas, segundos, ticks_por_segundo, tardios.
+    """
+    nombres = [f"S{i:03d}" for i in range(simbolos)]
+    servidor = await ServidorReproduccion.desde_ticks(
+        ticks_sinteticos(nombres, n, tasa=tasa, semilla=0), velocidad=velocidad, puerto=0
+    ).iniciar()
+    agregador = AgregadorVelas(timeframe)
+    try:
+        inicio = time.perf_counter()
+        ticks = await consumir(servidor.url, agregador)
+        segundos = time.perf_counter() - inicio
+    finally:
+        await servidor.detener()
+    return {'ticks': ticks, 'velas': agregador.cerradas, 'segundos': segundos,
+            'ticks_por_segundo': ticks / segundos if segundos else 0.0, 'tardios': agregador.tardios}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingesta de ticks y servidor de reproducción")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('sinteticos', help="Genera un archivo NDJSON de ticks de prueba")
+    p.add_argument('archivo')
+    p.add_argument('--ticks', type=int, default=100000)
+    p.add_argument('--simbolos', type=int, default=20)
+    p.add_argument('--tasa', type=float, default=1000.0, help="Ticks por segundo de tiempo grabado")
+
+    p = sub.add_parser('servidor', help="Reproduce ticks grabados por TCP")
+    p.add_argument('--archivo', required=True)
+    p.add_argument('--velocidad', type=float, default=1.0, help="Multiplicador de tiempo (0 = sin pausas)")
+    p.add_argument('--puerto', type=int, default=PUERTO_DEFAULT)
+
+    p = sub.add_parser('cliente', help="Consume un flujo y muestra las velas cerradas")
+    p.add_argument('--url', default=f"tcp://127.0.0.1:{PUERTO_DEFAULT}")
+    p.add_argument('--timeframe', choices=list(SEGUNDOS), default='minute')
+    p.add_argument('--analizar', action='store_true', help="Entregar las velas a CryptoAnalyzer")
+
+    p = sub.add_parser('prueba', help="Prueba de carga local (servidor + cliente)")
+    p.add_argument('--ticks', type=int, default=200000)
+    p.add_argument('--simbolos', type=int, default=50)
+    p.add_argument('--velocidad', type=float, default=0.0)
+    p.add_argument('--tasa', type=float, default=5000.0)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'sinteticos':
+        simbolos = [f"S{i:03d}" for i in range(args.simbolos)]
+        with open(args.archivo, 'w', encoding='utf-8') as f:
+            for tick in ticks_sinteticos(simbolos, args.ticks, tasa=args.tasa):
+                f.write(json.dumps(tick, separators=(',', ':')) + '\n')
+        print(f"💾 {args.ticks} ticks en {args.archivo}")
+
+    elif args.comando == 'servidor':
+        async def servir():
+            lineas, tiempos = cargar_ticks(args.archivo)
+            servidor = await ServidorReproduccion(lineas, tiempos, velocidad=args.velocidad,
+                                                  host='0.0.0.0', puerto=args.puerto).iniciar()
+            print(f"📡 Reproduciendo {len(lineas)} ticks x{args.velocidad:g} en puerto {servidor.puerto}")
+            await asyncio.Event().wait()
+        try:
+            asyncio.run(servir())
+        except KeyboardInterrupt:
+            pass
+
+    elif args.comando == 'cliente':
+        receptor = None
+        if args.analizar:
+            from ANALIZADOR_CRYPTO_CLA import CryptoAnalyzer
+            analyzer = CryptoAnalyzer()
+            receptor = ReceptorAnalizador(
+                analyzer, args.timeframe,
+                al_senal=lambda nombre, vela, s: print(f"🔔 {nombre}: {vela.close:,.4f} -> {s['signal']} ({s['score']})")
+            )
+
+        def al_cerrar(vela):
+            print(f"🕯️  {vela.simbolo} {time.strftime('%H:%M', time.gmtime(vela.inicio))} "
+                  f"O {vela.open:.4f} H {vela.high:.4f} L {vela.low:.4f} C {vela.close:.4f} "
+                  f"V {vela.volume:.2f} ({vela.ticks} ticks)")
+            if receptor:
+                receptor(vela)
+
+        agregador = AgregadorVelas(args.timeframe, al_cerrar=al_cerrar)
+        try:
+            asyncio.run(consumir(args.url, agregador))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if receptor:
+                receptor.cerrar()
+        print(f"✅ {agregador.ticks} ticks, {agregador.cerradas} velas, {agregador.tardios} tardíos")
+
+    else:
+        resultado = asyncio.run(prueba_carga(args.ticks, args.simbolos, args.velocidad, args.tasa))
+        print(f"⚡ {resultado['ticks']} ticks -> {resultado['velas']} velas en {resultado['segundos']:.2f}s "
+              f"({resultado['ticks_por_segundo']:,.0f} ticks/s, {resultado['tardios']} tardíos)")
+
+
+if __name__ == "__main__":
+    main()
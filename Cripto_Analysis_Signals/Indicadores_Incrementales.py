@@ -0,0 +1,254 @@
+# ===========================================================================
+#   INDICADORES INCREMENTALES
+#   Estado O(1) por barra para MA / RSI / MACD / Bollinger
+#
+#   Se siembran una vez con el histórico y luego se actualizan barra a barra:
+#   sumas móviles para las SMA, suavizado de Wilder para el RSI y EMAs
+#   encadenadas para el MACD. Los valores coinciden con Indicadores_Vectorizados.
+# ===========================================================================
+
+import math
+from collections import deque
+
+from Indicadores_Vectorizados import VENTANAS_MA
+
+NAN = float('nan')
+
+# Cada cuántas actualizaciones se recalculan las sumas desde cero (evita deriva numérica)
+RECALCULO_SUMAS = 1000
+
+
+class SMAIncremental:
+    """Media móvil simple con suma acumulada; NaN mientras haya menos de min_periods barras"""
+
+    def __init__(self, ventana, min_periods=1):
+        self.ventana = ventana
+        self.min_periods = min_periods
+        self.valores = deque(maxlen=ventana)
+        self.suma = 0.0
+        self._actualizaciones = 0
+
+    def actualizar(self, x):
+        if len(self.valores) == self.ventana:
+            self.suma -= self.valores[0]
+        self.valores.append(x)
+        self.suma += x
+
+        self._actualizaciones += 1
+        if self._actualizaciones % RECALCULO_SUMAS == 0:
+            self.suma = math.fsum(self.valores)
+
+        if len(self.valores) < self.min_periods:
+            return NAN
+        return self.suma / len(self.valores)
+
+
+class EMAIncremental:
+    """ewm(alpha, adjust=False, min_periods)"""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.valor = NAN
+        self.cuenta = 0
+
+    def actualizar(self, x):
+        if math.isnan(x):
+            return self.valor if self.cuenta >= self.min_periods else NAN
+
+        if self.cuenta == 0:
+            self.valor = x
+        else:
+            self.valor += self.alpha * (x - self.valor)
+        self.cuenta += 1
+        return self.valor if self.cuenta >= self.min_periods else NAN
+
+
+class RSIIncremental:
+    """RSI con suavizado de Wilder (como ta.momentum.RSIIndicator)"""
+
+    def __init__(self, ventana=14):
+        self.subidas = EMAIncremental(1.0 / ventana, ventana)
+        self.bajadas = EMAIncremental(1.0 / ventana, ventana)
+        self.previo = None
+
+    def actualizar(self, precio):
+        delta = 0.0 if self.previo is None else precio - self.previo
+        self.previo = precio
+
+        media_subidas = self.subidas.actualizar(max(delta, 0.0))
+        media_bajadas = self.bajadas.actualizar(max(-delta, 0.0))
+        if math.isnan(media_bajadas):
+            return NAN
+        if media_bajadas == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + media_subidas / media_bajadas)
+
+
+class MACDIncremental:
+    """MACD, señal e histograma (como ta.trend.MACD)"""
+
+    def __init__(self, rapida=12, lenta=26, senal=9):
+        self.rapida = EMAIncremental(2.0 / (rapida + 1), rapida)
+        self.lenta = EMAIncremental(2.0 / (lenta + 1), lenta)
+        self.senal = EMAIncremental(2.0 / (senal + 1), senal)
+
+    def actualizar(self, precio):
+        linea = self.rapida.actualizar(precio) - self.lenta.actualizar(precio)
+        linea_senal = self.senal.actualizar(linea)
+        return linea, linea_senal, linea - linea_senal
+
+
+class BollingerIncremental:
+    """Bandas de Bollinger con suma y suma de cuadrados móviles"""
+
+    def __init__(self, ventana=20, desviaciones=2):
+        self.ventana = ventana
+        self.desviaciones = desviaciones
+        self.valores = deque(maxlen=ventana)
+        self.suma = 0.0
+        self.suma2 = 0.0
+        self._actualizaciones = 0
+
+    def actualizar(self, x):
+        if len(self.valores) == self.ventana:
+            viejo = self.valores[0]
+            self.suma -= viejo
+            self.suma2 -= viejo * viejo
+        self.valores.append(x)
+        self.suma += x
+        self.suma2 += x * x
+
+        self._actualizaciones += 1
+        if self._actualizaciones % RECALCULO_SUMAS == 0:
+            self.suma = math.fsum(self.valores)
+            self.suma2 = math.fsum(v * v for v in self.valores)
+
+        if len(self.valores) < self.ventana:
+            return NAN, NAN, NAN
+
+        media = self.suma / self.ventana
+        desviacion = math.sqrt(max(self.suma2 / self.ventana - media * media, 0.0))
+        return media + self.desviaciones * desviacion, media, media - self.desviaciones * desviacion
+
+
+class EstadoIndicadores:
+    """
+    Todos los indicadores de calculate_technical_indicators para un activo,
+    más el estado de cruces MA50/MA200 y la ventana de divergencias.
+    """
+
+    def __init__(self, ventanas_ma=VENTANAS_MA, ventana_rsi=14, macd_params=(12, 26, 9),
+                 ventana_bb=20, ventana_cruces=60, ventana_divergencias=20):
+        self.ventanas_ma = list(ventanas_ma)
+        self.medias = {w: SMAIncremental(w) for w in self.ventanas_ma}
+        self.rsi = RSIIncremental(ventana_rsi)
+        self.macd = MACDIncremental(*macd_params)
+        self.bollinger = BollingerIncremental(ventana_bb)
+
+        self.ventana_cruces = ventana_cruces
+        self.tipo_cruce = None
+        self.barras_desde_cruce = None
+        self.barras_validas_cruce = 0
+
+        self.recientes = deque(maxlen=ventana_divergencias)
+        self.ultimo = {}
+        self.barras = 0
+
+    def sembrar(self, precios):
+        """Reproduce el histórico una vez (O(n)); después cada barra cuesta O(1)"""
+        # Mismo arranque que el motor vectorizado: min_periods = min(ventana, longitud del histórico)
+        for w, media in self.medias.items():
+            media.min_periods = min(w, len(precios))
+        for precio in precios:
+            self.actualizar(float(precio))
+        return self
+
+    def actualizar(self, precio):
+        """Añade una barra cerrada y devuelve los valores de sus indicadores"""
+        anterior = self.ultimo
+        valores = {'price': precio}
+
+        for w in self.ventanas_ma:
+            valores[f'MA{w}'] = self.medias[w].actualizar(precio)
+        for w in self.ventanas_ma:
+            valores[f'MA{w}_slope'] = valores[f'MA{w}'] - anterior.get(f'MA{w}', NAN)
+
+        valores['RSI'] = self.rsi.actualizar(precio)
+
+        linea, linea_senal, histograma = self.macd.actualizar(precio)
+        valores['MACD'] = linea
+        valores['MACD_signal'] = linea_senal
+        valores['MACD_histogram'] = histograma
+        valores['MACD_slope'] = linea - anterior.get('MACD', NAN)
+        valores['MACD_signal_slope'] = linea_senal - anterior.get('MACD_signal', NAN)
+
+        superior, media, inferior = self.bollinger.actualizar(precio)
+        valores['BB_upper'] = superior
+        valores['BB_middle'] = media
+        valores['BB_lower'] = inferior
+
+        self._actualizar_cruce(anterior, valores)
+        if not any(math.isnan(v) for v in valores.values()):
+            self.recientes.append((precio, valores['RSI'], valores['MACD']))
+
+        self.ultimo = valores
+        self.barras += 1
+        return valores
+
+    def _actualizar_cruce(self, anterior, valores):
+        """Golden/Death cross más reciente, contando solo barras con MA50 y MA200"""
+        ma50, ma200 = valores.get('MA50', NAN), valores.get('MA200', NAN)
+        if math.isnan(ma50) or math.isnan(ma200):
+            return
+
+        self.barras_validas_cruce += 1
+        if self.barras_desde_cruce is not None:
+            self.barras_desde_cruce += 1
+
+        prev50, prev200 = anterior.get('MA50', NAN), anterior.get('MA200', NAN)
+        if math.isnan(prev50) or math.isnan(prev200):
+            return
+
+        if prev50 <= prev200 and ma50 > ma200:
+            self.tipo_cruce, self.barras_desde_cruce = 'Golden Cross', 1
+        elif prev50 >= prev200 and ma50 < ma200:
+            self.tipo_cruce, self.barras_desde_cruce = 'Death Cross', 1
+
+    def estado_cruce(self):
+        """Mismo resultado que CryptoAnalyzer.detect_golden_death_cross"""
+        if self.barras_validas_cruce < 2:
+            return {"status": "Sin datos", "days_since": 0, "description": "Datos insuficientes para cruces"}
+
+        ventana = min(self.ventana_cruces, self.barras_validas_cruce)
+        if self.tipo_cruce and self.barras_desde_cruce < ventana:
+            dias = self.barras_desde_cruce
+            return {"status": self.tipo_cruce, "days_since": dias,
+                    "description": f"{self.tipo_cruce} hace {dias} días"}
+
+        ma50, ma200 = self.ultimo['MA50'], self.ultimo['MA200']
+        diff_pct = ((ma50 - ma200) / ma200) * 100
+        if ma50 > ma200:
+            return {"status": "MA50 > MA200", "days_since": 0, "description": f"MA50 {diff_pct:.1f}% por encima"}
+        return {"status": "MA50 < MA200", "days_since": 0, "description": f"MA50 {abs(diff_pct):.1f}% por debajo"}
+
+    def divergencias(self):
+        """Mismo resultado que CryptoAnalyzer.detect_divergences (últimas barras completas)"""
+        if len(self.recientes) < 10:
+            return {"rsi_divergence": "Datos insuficientes", "macd_divergence": "Datos insuficientes"}
+
+        (precio0, rsi0, macd0), (precio1, rsi1, macd1) = self.recientes[0], self.recientes[-1]
+        price_trend, rsi_trend, macd_trend = precio1 - precio0, rsi1 - rsi0, macd1 - macd0
+
+        rsi_div = "Normal"
+        macd_div = "Normal"
+        if price_trend > 0 and rsi_trend < 0:
+            rsi_div = "Divergencia Bajista"
+        elif price_trend < 0 and rsi_trend > 0:
+            rsi_div = "Divergencia Alcista"
+        if price_trend > 0 and macd_trend < 0:
+            macd_div = "Divergencia Bajista"
+        elif price_trend < 0 and macd_trend > 0:
+            macd_div = "Divergencia Alcista"
+
+        return {"rsi_divergence": rsi_div, "macd_divergence": macd_div}
@@ -0,0 +1,403 @@
+# ===========================================================================
+#   INDICADORES VECTORIZADOS
+#   MA / RSI / MACD / Bollinger para todo el universo en una sola pasada
+#
+#   Todas las series se alinean en una matriz (tiempo x activo) de NumPy.
+#   La alineación es por posición (la última barra de cada activo queda en
+#   la última fila) y los huecos iniciales son NaN, así cada columna da los
+#   mismos valores que el cálculo por DataFrame con `ta` / `rolling`.
+#
+#   Con OHLCV (CryptoCompare) se añaden los indicadores de rango verdadero:
+#   ATR, Estocástico, Keltner y VWAP.
+# ===========================================================================
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Columnas que produce CryptoAnalyzer.calculate_technical_indicators
+VENTANAS_MA = [9, 21, 50, 200]
+COLUMNAS_INDICADORES = (
+    [f'MA{w}' for w in VENTANAS_MA] +
+    [f'MA{w}_slope' for w in VENTANAS_MA] +
+    ['RSI', 'MACD', 'MACD_signal', 'MACD_histogram', 'MACD_slope', 'MACD_signal_slope',
+     'BB_upper', 'BB_middle', 'BB_lower']
+)
+
+# Columnas de los indicadores que necesitan high/low (y volumen para VWAP)
+COLUMNAS_RANGO = ['ATR', 'STOCH_K', 'STOCH_D', 'KC_upper', 'KC_middle', 'KC_lower', 'VWAP']
+
+
+class MatrizPrecios:
+    """Precios de varios activos alineados en una matriz (T x N)"""
+
+    def __init__(self, dataframes, columna='price'):
+        """
+        Args:
+            dataframes (dict): {nombre: DataFrame} con la columna de precios.
+            columna (str): Columna a alinear.
+        """
+        self.nombres = [n for n, df in dataframes.items() if df is not None and len(df) > 0]
+        self.indices = {n: dataframes[n].index for n in self.nombres}
+        self.longitudes = np.array([len(dataframes[n]) for n in self.nombres], dtype=np.int64)
+
+        filas = int(self.longitudes.max()) if len(self.nombres) else 0
+        self.valores = np.full((filas, len(self.nombres)), np.nan)
+        for j, nombre in enumerate(self.nombres):
+            serie = dataframes[nombre][columna].to_numpy(dtype=np.float64)
+            self.valores[filas - len(serie):, j] = serie
+
+    @classmethod
+    def desde_valores(cls, valores, nombres=None, longitudes=None):
+        """Envuelve una matriz (T x N) ya alineada, p.ej. en memoria compartida, sin copiarla"""
+        matriz = cls.__new__(cls)
+        T, N = valores.shape
+        matriz.nombres = list(nombres) if nombres is not None else list(range(N))
+        matriz.indices = {}
+        if longitudes is None:
+            longitudes = T - np.argmax(~np.isnan(valores), axis=0)
+        matriz.longitudes = np.asarray(longitudes, dtype=np.int64)
+        matriz.valores = valores
+        return matriz
+
+    def columna(self, matriz, nombre):
+        """Extrae la columna de un activo recortando el relleno inicial"""
+        j = self.nombres.index(nombre)
+        return matriz[matriz.shape[0] - self.longitudes[j]:, j]
+
+
+def _por_columna(valor, columnas):
+    """Convierte un escalar o lista en un vector por columna"""
+    return np.broadcast_to(np.asarray(valor, dtype=np.float64), (columnas,))
+
+
+def diferencia(X):
+    """Equivalente a DataFrame.diff() a lo largo del tiempo"""
+    salida = np.full_like(X, np.nan)
+    salida[1:] = X[1:] - X[:-1]
+    return salida
+
+
+def media_movil(X, ventana, min_periods=None):
+    """
+    Media móvil simple por columna (rolling(...).mean()).
+
+    min_periods puede ser un escalar o un vector por columna.
+    """
+    T, N = X.shape
+    min_periods = _por_columna(ventana if min_periods is None else min_periods, N)
+
+    validos = ~np.isnan(X)
+    # Restar un valor de referencia por columna reduce el error de cancelación
+    referencia = np.where(validos.any(axis=0), np.nanmax(np.where(validos, X, -np.inf), axis=0), 0.0)
+    centrado = np.where(validos, X - referencia, 0.0)
+
+    suma = np.cumsum(centrado, axis=0)
+    cuenta = np.cumsum(validos, axis=0)
+    suma[ventana:] = suma[ventana:] - suma[:-ventana].copy()
+    cuenta[ventana:] = cuenta[ventana:] - cuenta[:-ventana].copy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = suma / cuenta + referencia
+    return np.where(cuenta >= min_periods, media, np.nan)
+
+
+def suma_movil(X, ventana):
+    """
+    Suma móvil por columna (rolling(ventana).sum()) sumando cada ventana por
+    separado: a diferencia de las sumas acumuladas, una ventana de ceros da
+    exactamente 0. NaN si falta algún valor en la ventana.
+    """
+    salida = np.full(X.shape, np.nan)
+    if len(X) >= ventana:
+        salida[ventana - 1:] = sliding_window_view(X, ventana, axis=0).sum(axis=-1)
+    return salida
+
+
+def desviacion_movil(X, ventana, min_periods=None):
+    """Desviación estándar móvil poblacional (ddof=0) por columna"""
+    T, N = X.shape
+    min_periods = _por_columna(ventana if min_periods is None else min_periods, N)
+
+    validos = ~np.isnan(X)
+    referencia = np.where(validos.any(axis=0), np.nanmax(np.where(validos, X, -np.inf), axis=0), 0.0)
+    centrado = np.where(validos, X - referencia, 0.0)
+
+    suma = np.cumsum(centrado, axis=0)
+    suma2 = np.cumsum(centrado * centrado, axis=0)
+    cuenta = np.cumsum(validos, axis=0)
+    for acumulado in (suma, suma2, cuenta):
+        acumulado[ventana:] = acumulado[ventana:] - acumulado[:-ventana].copy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = suma / cuenta
+        varianza = np.maximum(suma2 / cuenta - media * media, 0.0)
+    return np.where(cuenta >= min_periods, np.sqrt(varianza), np.nan)
+
+
+def ema(X, alpha, min_periods):
+    """
+    Media exponencial ewm(alpha, adjust=False) por columna.
+
+    alpha y min_periods pueden ser vectores por columna, lo que permite
+    calcular varias EMAs distintas en la misma pasada apilando columnas.
+    La recursión avanza fila a fila pero opera sobre todos los activos a la vez.
+    """
+    T, N = X.shape
+    alpha = _por_columna(alpha, N)
+    min_periods = _por_columna(min_periods, N)
+
+    salida = np.full((T, N), np.nan)
+    previo = np.full(N, np.nan)
+    cuenta = np.zeros(N)
+
+    for t in range(T):
+        x = X[t]
+        validos = ~np.isnan(x)
+        inicio = validos & np.isnan(previo)
+        actualizado = previo + alpha * (x - previo)
+        previo = np.where(inicio, x, np.where(validos, actualizado, previo))
+        cuenta += validos
+        salida[t] = np.where(cuenta >= min_periods, previo, np.nan)
+
+    return salida
+
+
+def extremo_movil(X, ventana, funcion=np.max):
+    """rolling(ventana).max()/min() por columna (NaN si falta algún valor de la ventana)"""
+    salida = np.full_like(X, np.nan)
+    if X.shape[0] >= ventana:
+        ventanas = np.lib.stride_tricks.sliding_window_view(X, ventana, axis=0)
+        salida[ventana - 1:] = funcion(ventanas, axis=-1)
+    return salida
+
+
+def _subidas_bajadas(X):
+    """Subidas y bajadas como en ta.momentum.RSIIndicator (la primera barra vale 0)"""
+    delta = diferencia(X)
+    validos = ~np.isnan(X)
+    with np.errstate(invalid='ignore'):
+        subidas = np.where(validos, np.where(delta > 0, delta, 0.0), np.nan)
+        bajadas = np.where(validos, np.where(delta < 0, -delta, 0.0), np.nan)
+    return subidas, bajadas
+
+
+def _rsi_desde_medias(media_subidas, media_bajadas):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = media_subidas / media_bajadas
+        rsi = np.where(media_bajadas == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+    return np.where(np.isnan(media_bajadas), np.nan, rsi)
+
+
+def rsi(X, ventana=14):
+    """RSI con suavizado de Wilder (igual que ta.momentum.RSIIndicator)"""
+    subidas, bajadas = _subidas_bajadas(X)
+    N = X.shape[1]
+    medias = ema(np.hstack([subidas, bajadas]), 1.0 / ventana, ventana)
+    return _rsi_desde_medias(medias[:, :N], medias[:, N:])
+
+
+def macd(X, rapida=12, lenta=26, senal=9):
+    """MACD, señal e histograma (igual que ta.trend.MACD)"""
+    N = X.shape[1]
+    alphas = [2.0 / (rapida + 1)] * N + [2.0 / (lenta + 1)] * N
+    periodos = [rapida] * N + [lenta] * N
+    medias = ema(np.hstack([X, X]), alphas, periodos)
+    linea = medias[:, :N] - medias[:, N:]
+    linea_senal = ema(linea, 2.0 / (senal + 1), senal)
+    return linea, linea_senal, linea - linea_senal
+
+
+def bollinger(X, ventana=20, desviaciones=2):
+    """Bandas de Bollinger (superior, media, inferior)"""
+    media = media_movil(X, ventana)
+    desviacion = desviacion_movil(X, ventana)
+    return media + desviaciones * desviacion, media, media - desviaciones * desviacion
+
+
+def rango_verdadero(H, L, C):
+    """True range; la primera barra (sin cierre previo) vale high - low, como en `ta`"""
+    cierre_previo = np.full_like(C, np.nan)
+    cierre_previo[1:] = C[:-1]
+    rango = H - L
+    with np.errstate(invalid='ignore'):
+        return np.fmax(rango, np.fmax(np.abs(H - cierre_previo), np.abs(L - cierre_previo)))
+
+
+def atr(H, L, C, ventana=14):
+    """
+    Average True Range con suavizado de Wilder (igual que ta.volatility.AverageTrueRange,
+    con NaN en lugar de 0 antes de completar la ventana).
+
+    La semilla es la media de los primeros `ventana` rangos de cada columna;
+    a partir de ahí atr = (atr_previo * (ventana - 1) + tr) / ventana.
+    """
+    rangos = rango_verdadero(H, L, C)
+    T = rangos.shape[0]
+    semilla = np.argmax(~np.isnan(rangos), axis=0) + ventana - 1
+    filas = np.arange(T)[:, None]
+    entrada = np.where(filas < semilla, np.nan,
+                       np.where(filas == semilla, media_movil(rangos, ventana), rangos))
+    return ema(entrada, 1.0 / ventana, 1)
+
+
+def estocastico(H, L, C, ventana=14, suavizado=3):
+    """%K y %D (ta.momentum.StochasticOscillator)"""
+    minimo = extremo_movil(L, ventana, np.min)
+    maximo = extremo_movil(H, ventana, np.max)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        k = 100 * (C - minimo) / (maximo - minimo)
+    return k, media_movil(k, suavizado)
+
+
+def keltner(H, L, C, ventana=20, ventana_atr=10, multiplicador=2):
+    """Canal de Keltner con EMA del cierre ± multiplicador x ATR (ta, original_version=False)"""
+    media = ema(C, 2.0 / (ventana + 1), ventana)
+    banda = multiplicador * atr(H, L, C, ventana_atr)
+    return media + banda, media, media - banda
+
+
+def vwap(H, L, C, V, ventana=14):
+    """VWAP móvil del precio típico (ta.volume.VolumeWeightedAveragePrice)"""
+    tipico = (H + L + C) / 3.0
+    # Sumas exactas: sin volumen en la ventana el VWAP no está definido (NaN)
+    volumen = suma_movil(V, ventana)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(volumen > 0, suma_movil(tipico * V, ventana) / volumen, np.nan)
+
+
+def calcular_indicadores(matriz, ventanas_ma=VENTANAS_MA, ventana_rsi=14,
+                         macd_params=(12, 26, 9), ventana_bb=20):
+    """
+    Calcula todos los indicadores del analizador para toda la matriz.
+
+    Las medias móviles usan min_periods = min(ventana, longitud del activo),
+    igual que calculate_technical_indicators.
+
+    Returns:
+        dict: {nombre_columna: matriz T x N}
+    """
+    X = matriz.valores
+    N = X.shape[1]
+    resultado = {}
+
+    for w in ventanas_ma:
+        resultado[f'MA{w}'] = media_movil(X, w, np.minimum(w, matriz.longitudes))
+    for w in ventanas_ma:
+        resultado[f'MA{w}_slope'] = diferencia(resultado[f'MA{w}'])
+
+    # RSI y las dos EMAs del MACD comparten una sola pasada recursiva
+    rapida, lenta, senal = macd_params
+    subidas, bajadas = _subidas_bajadas(X)
+    alphas = ([1.0 / ventana_rsi] * (2 * N) +
+              [2.0 / (rapida + 1)] * N + [2.0 / (lenta + 1)] * N)
+    periodos = [ventana_rsi] * (2 * N) + [rapida] * N + [lenta] * N
+    medias = ema(np.hstack([subidas, bajadas, X, X]), alphas, periodos)
+
+    resultado['RSI'] = _rsi_desde_medias(medias[:, :N], medias[:, N:2 * N])
+    linea = medias[:, 2 * N:3 * N] - medias[:, 3 * N:]
+    linea_senal = ema(linea, 2.0 / (senal + 1), senal)
+    resultado['MACD'] = linea
+    resultado['MACD_signal'] = linea_senal
+    resultado['MACD_histogram'] = linea - linea_senal
+    resultado['MACD_slope'] = diferencia(linea)
+    resultado['MACD_signal_slope'] = diferencia(linea_senal)
+
+    superior, media, inferior = bollinger(X, ventana_bb)
+    resultado['BB_upper'] = superior
+    resultado['BB_middle'] = media
+    resultado['BB_lower'] = inferior
+
+    return resultado
+
+
+def aplicar_indicadores(dataframes, columnas=None, renombrar=None, **parametros):
+    """
+    Calcula los indicadores de todos los DataFrames en una pasada y los añade
+    como columnas a cada uno (in place).
+
+    Args:
+        dataframes (dict): {nombre: DataFrame con columna 'price'}.
+        columnas (list): Subconjunto de COLUMNAS_INDICADORES a añadir (None = todas).
+        renombrar (dict): Nombres alternativos {columna_motor: columna_destino}.
+
+    Returns:
+        dict: Los mismos DataFrames con las columnas añadidas.
+    """
+    matriz = MatrizPrecios(dataframes)
+    if not matriz.nombres:
+        return dataframes
+
+    indicadores = calcular_indicadores(matriz, **parametros)
+    columnas = columnas or list(indicadores.keys())
+    renombrar = renombrar or {}
+
+    for nombre in matriz.nombres:
+        df = dataframes[nombre]
+        for col in columnas:
+            df[renombrar.get(col, col)] = matriz.columna(indicadores[col], nombre)
+
+    return dataframes
+
+
+def calcular_indicadores_rango(altos, bajos, cierres, volumenes=None, ventana_atr=14,
+                               estocastico_params=(14, 3), keltner_params=(20, 10, 2), ventana_vwap=14):
+    """
+    Indicadores de rango verdadero para matrices OHLC alineadas.
+
+    Args:
+        altos, bajos, cierres (MatrizPrecios): high, low y close de los mismos activos.
+        volumenes (MatrizPrecios): Volumen en unidades del activo (sin él no hay VWAP).
+
+    Returns:
+        dict: {nombre_columna: matriz T x N} con COLUMNAS_RANGO.
+    """
+    H, L, C = altos.valores, bajos.valores, cierres.valores
+    resultado = {'ATR': atr(H, L, C, ventana_atr)}
+    resultado['STOCH_K'], resultado['STOCH_D'] = estocastico(H, L, C, *estocastico_params)
+    resultado['KC_upper'], resultado['KC_middle'], resultado['KC_lower'] = keltner(H, L, C, *keltner_params)
+    if volumenes is not None:
+        resultado['VWAP'] = vwap(H, L, C, volumenes.valores, ventana_vwap)
+    return resultado
+
+
+def aplicar_indicadores_rango(dataframes, columna_volumen='volumefrom', **parametros):
+    """
+    Añade COLUMNAS_RANGO (in place) a los DataFrames con high y low.
+
+    Los que solo traen precio de cierre (CoinGecko, CoinCap) se dejan igual.
+
+    Returns:
+        dict: Los mismos DataFrames.
+    """
+    con_rango = {n: df for n, df in dataframes.items()
+                 if df is not None and 'high' in df.columns and 'low' in df.columns}
+    if not con_rango:
+        return dataframes
+
+    cierres = MatrizPrecios(con_rango)
+    altos = MatrizPrecios(con_rango, columna='high')
+    bajos = MatrizPrecios(con_rango, columna='low')
+    con_volumen = all(columna_volumen in df.columns for df in con_rango.values())
+    volumenes = MatrizPrecios(con_rango, columna=columna_volumen) if con_volumen else None
+
+    indicadores = calcular_indicadores_rango(altos, bajos, cierres, volumenes, **parametros)
+    for nombre in cierres.nombres:
+        df = con_rango[nombre]
+        for col, valores in indicadores.items():
+            df[col] = cierres.columna(valores, nombre)
+
+    return dataframes
+
+
+def aplicar_sma(dataframes, ventanas, plantilla='SMA_{}'):
+    """Añade medias móviles con min_periods = ventana (estilo pandas_ta)"""
+    matriz = MatrizPrecios(dataframes)
+    if not matriz.nombres:
+        return dataframes
+
+    for w in ventanas:
+        medias = media_movil(matriz.valores, w)
+        for nombre in matriz.nombres:
+            dataframes[nombre][plantilla.format(w)] = matriz.columna(medias, nombre)
+
+    return dataframes
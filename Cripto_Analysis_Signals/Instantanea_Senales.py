@@ -0,0 +1,211 @@
+# ===========================================================================
+#   INSTANTÁNEA DE SEÑALES
+#   Precios, indicadores y señales precalculados para el dashboard
+#
+#   Un solo proceso descarga y analiza el universo y publica el resultado en
+#   disco; los visores (Dashboard_Senales.py) solo leen. Cada publicación
+#   lleva una versión derivada de los datos (última vela, precio y señal de
+#   cada activo), que es la clave de cache de los visores: mientras no
+#   cambie ningún dato no se vuelve a leer ni a calcular nada.
+#
+#   Estructura:  <directorio>/actual.json          (versión vigente)
+#                <directorio>/<version>/resumen.json
+#                <directorio>/<version>/series.npz (formato largo, columnar)
+#
+#   Uso:
+#       python Instantanea_Senales.py                 # una publicación
+#       python Instantanea_Senales.py --cada 300      # republicar cada 5 min
+# ===========================================================================
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Memoria_Compacta import indice_epoch
+from Metricas import metricas, registro
+
+DIRECTORIO_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos_instantanea')
+
+# Velas por activo que se guardan para los gráficos
+BARRAS_GRAFICO = 365
+
+# Columnas de las series (precio e indicadores que muestra el dashboard)
+COLUMNAS_SERIE = ['price', 'MA9', 'MA21', 'MA50', 'MA200', 'RSI', 'MACD', 'MACD_signal']
+
+# Versiones que se conservan en disco (la vigente y la anterior, que un visor puede estar leyendo)
+VERSIONES_CONSERVADAS = 2
+
+
+def construir(resultados, barras=BARRAS_GRAFICO):
+    """
+    Resumen y series a partir de CryptoAnalyzer.analyze_multiple.
+
+    Returns:
+        tuple: (resumen, series). resumen: una fila por cripto con precio,
+               señal, score y componentes; series: formato largo
+               (activo, timestamp, COLUMNAS_SERIE) con las últimas `barras` velas.
+    """
+    filas = []
+    bloques = []
+    for nombre, resultado in resultados.items():
+        if not resultado or "error" in resultado:
+            continue
+
+        df = resultado["df"]
+        signals = resultado["signals"]
+        componentes = signals.get("components", {})
+        divergencias = componentes.get("divergences", {})
+        segundos = np.asarray(indice_epoch(df.index), dtype=np.int64)
+
+        filas.append({
+            'Crypto': nombre,
+            'Precio': float(df['price'].iloc[-1]),
+            'Señal': signals['signal'],
+            'Score': float(signals['score']),
+            'Confianza': int(signals['confidence']),
+            'MAs': resultado['ma_analysis']['status'],
+            'Cruce': resultado['cross_analysis']['status'],
+            'RSI': float(df['RSI'].iloc[-1]),
+            'MACD': float(df['MACD'].iloc[-1]),
+            'Divergencia RSI': divergencias.get('rsi_divergence', ''),
+            'Divergencia MACD': divergencias.get('macd_divergence', ''),
+            'Descripción': signals['description'],
+            'Última vela': int(segundos[-1])
+        })
+
+        cola = slice(-barras, None)
+        bloque = {'activo': np.full(len(segundos[cola]), len(filas) - 1, dtype=np.int32),
+                  'timestamp': segundos[cola]}
+        for col in COLUMNAS_SERIE:
+            bloque[col] = df[col].to_numpy(dtype=np.float32)[cola]
+        bloques.append(bloque)
+
+    resumen = pd.DataFrame(filas)
+    columnas = ['activo', 'timestamp'] + COLUMNAS_SERIE
+    series = {col: np.concatenate([b[col] for b in bloques]) if bloques else np.empty(0) for col in columnas}
+    return resumen, series
+
+
+def version_datos(resumen, timeframe):
+    """Huella del contenido: cambia solo si cambia una vela, un precio o una señal"""
+    claves = resumen[['Crypto', 'Última vela', 'Precio', 'Señal', 'Score']].to_numpy().tolist() if len(resumen) else []
+    huella = json.dumps([timeframe, claves], ensure_ascii=False, default=str)
+    return hashlib.sha1(huella.encode('utf-8')).hexdigest()[:12]
+
+
+def actual(directorio=DIRECTORIO_DEFAULT):
+    """Puntero a la versión vigente {version, generado, timeframe, activos} o None"""
+    try:
+        with open(os.path.join(directorio, 'actual.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def publicar(resumen, series, timeframe, directorio=DIRECTORIO_DEFAULT):
+    """
+    Escribe una versión nueva y mueve el puntero (os.replace: los visores ven
+    la anterior o la nueva, nunca una a medias). Si los datos no cambiaron
+    no escribe nada.
+
+    Returns:
+        str: Versión vigente.
+    """
+    version = version_datos(resumen, timeframe)
+    vigente = actual(directorio)
+    if vigente and vigente.get('version') == version:
+        metricas.incrementar('instantanea_publicaciones_total', resultado='sin_cambios')
+        return version
+
+    ruta = os.path.join(directorio, version)
+    os.makedirs(ruta, exist_ok=True)
+    resumen.to_json(os.path.join(ruta, 'resumen.json'), orient='records', force_ascii=False)
+    np.savez(os.path.join(ruta, 'series.npz'), nombres=np.array(resumen['Crypto'] if len(resumen) else [], dtype=str),
+             **series)
+
+    puntero = {
+        'version': version,
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'timeframe': timeframe,
+        'activos': len(resumen)
+    }
+    tmp = os.path.join(directorio, 'actual.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(puntero, f)
+    os.replace(tmp, os.path.join(directorio, 'actual.json'))
+    metricas.incrementar('instantanea_publicaciones_total', resultado='nueva')
+
+    _limpiar(directorio, version)
+    return version
+
+
+def _limpiar(directorio, vigente):
+    versiones = sorted(
+        (e for e in os.scandir(directorio) if e.is_dir() and e.name != vigente),
+        key=lambda e: e.stat().st_mtime, reverse=True
+    )
+    for entrada in versiones[VERSIONES_CONSERVADAS - 1:]:
+        shutil.rmtree(entrada.path, ignore_errors=True)
+
+
+def cargar(version, directorio=DIRECTORIO_DEFAULT):
+    """
+    Lee una versión publicada.
+
+    Returns:
+        tuple: (resumen, series) como DataFrames; series con columnas
+               Crypto, timestamp (datetime) y COLUMNAS_SERIE.
+    """
+    ruta = os.path.join(directorio, version)
+    resumen = pd.read_json(os.path.join(ruta, 'resumen.json'), orient='records')
+    if len(resumen):
+        resumen['Última vela'] = pd.to_datetime(resumen['Última vela'], unit='s')
+
+    with np.load(os.path.join(ruta, 'series.npz')) as datos:
+        nombres = datos['nombres']
+        series = pd.DataFrame({col: datos[col] for col in COLUMNAS_SERIE})
+        series.insert(0, 'timestamp', pd.to_datetime(datos['timestamp'], unit='s'))
+        series.insert(0, 'Crypto', pd.Categorical.from_codes(datos['activo'], categories=nombres))
+    return resumen, series
+
+
+def main(argv=None):
+    from ANALIZADOR_CRYPTO_CLA import CRYPTO_CONFIG, CryptoAnalyzer, load_universe
+    from Temporalidades import SEGUNDOS, dias_para_velas
+
+    parser = argparse.ArgumentParser(description="Publica la instantánea de señales para el dashboard")
+    parser.add_argument('--top', type=int, default=None, help="Top-N del mercado en lugar de la lista fija")
+    parser.add_argument('--orden', choices=('market_cap', 'volumen'), default='market_cap')
+    parser.add_argument('--timeframe', choices=list(SEGUNDOS), default='daily')
+    parser.add_argument('--cada', type=float, default=None, help="Republicar cada N segundos (por defecto una vez)")
+    parser.add_argument('--directorio', default=DIRECTORIO_DEFAULT)
+    args = parser.parse_args(argv)
+
+    universe = load_universe(args.top, args.orden) if args.top else CRYPTO_CONFIG
+    # Un solo analizador: almacén, cache y sesión se reutilizan entre publicaciones
+    analyzer = CryptoAnalyzer(universe=universe)
+    days = max(dias_para_velas(args.timeframe, 200), dias_para_velas(args.timeframe, BARRAS_GRAFICO))
+
+    while True:
+        with metricas.temporizador('instantanea_segundos'):
+            # fresh: cada publicación usa datos al día aunque el cache tenga ventana obsoleta
+            resultados = analyzer.analyze_multiple(universe.keys(), days=days, timeframe=args.timeframe,
+                                                   fresh=True)
+            resumen, series = construir(resultados)
+            version = publicar(resumen, series, args.timeframe, args.directorio)
+        registro.info("📸 Instantánea {}: {} activos ({})", version, len(resumen), args.timeframe)
+
+        if args.cada is None:
+            break
+        time.sleep(args.cada)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# ===========================================================================
+#   LIMITADOR DE TASA
+#   Token bucket por proveedor, configurado desde API_CONFIG['rate_limit']
+#
+#   Funciona igual desde hilos (esperar_turno) y desde asyncio
+#   (esperar_turno_async): cada llamada reserva un token y recibe el tiempo
+#   que debe esperar, así el orden de llegada se respeta en ambos mundos.
+# ===========================================================================
+
+import asyncio
+import threading
+import time
+
+# Llamadas que se permiten en ráfaga antes de empezar a espaciar
+RAFAGA_DEFAULT = 5
+
+
+class TokenBucket:
+    def __init__(self, llamadas_por_minuto, rafaga=RAFAGA_DEFAULT):
+        """
+        Args:
+            llamadas_por_minuto (int): Presupuesto del proveedor.
+            rafaga (int): Tokens disponibles de golpe. La tasa de reposición se
+                          descuenta de la ráfaga para que ninguna ventana de 60 s
+                          supere llamadas_por_minuto.
+        """
+        self.rafaga = max(1, min(rafaga, llamadas_por_minuto - 1))
+        self.tasa = (llamadas_por_minuto - self.rafaga) / 60.0  # tokens por segundo
+        self.tokens = float(self.rafaga)
+        self.ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reponer(self, ahora):
+        self.tokens = min(self.rafaga, self.tokens + (ahora - self.ultimo) * self.tasa)
+        self.ultimo = ahora
+
+    def reservar(self):
+        """Reserva un token y devuelve los segundos a esperar antes de usarlo"""
+        with self._lock:
+            self._reponer(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.tasa
+
+    def penalizar(self, segundos):
+        """Retrasa todas las llamadas siguientes (p.ej. tras un 429 o Retry-After)"""
+        with self._lock:
+            self._reponer(time.monotonic())
+            self.tokens = min(self.tokens, 0.0) - segundos * self.tasa
+
+    def esperar(self):
+        """Bloquea el hilo actual hasta que haya un token"""
+        espera = self.reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+    async def esperar_async(self):
+        """Versión asyncio de esperar()"""
+        espera = self.reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+_limitadores = {}
+_limitadores_lock = threading.Lock()
+
+
+def registrar_limitadores(config, reemplazar=False):
+    """Crea un bucket por proveedor a partir de un dict tipo API_CONFIG"""
+    with _limitadores_lock:
+        for proveedor, opciones in config.items():
+            if (reemplazar or proveedor not in _limitadores) and 'rate_limit' in opciones:
+                _limitadores[proveedor] = TokenBucket(
+                    opciones['rate_limit'],
+                    opciones.get('burst', RAFAGA_DEFAULT)
+                )
+
+
+def obtener_limitador(proveedor):
+    """Devuelve el bucket de un proveedor registrado"""
+    with _limitadores_lock:
+        if proveedor not in _limitadores:
+            raise KeyError(f"Proveedor sin limitador registrado: {proveedor}")
+        return _limitadores[proveedor]
+
+
+def esperar_turno(proveedor):
+    """Espera (bloqueando) hasta poder llamar al proveedor"""
+    obtener_limitador(proveedor).esperar()
+
+
+async def esperar_turno_async(proveedor):
+    """Espera (asyncio) hasta poder llamar al proveedor"""
+    await obtener_limitador(proveedor).esperar_async()
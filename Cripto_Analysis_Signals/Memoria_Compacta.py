@@ -0,0 +1,161 @@
+# ===========================================================================
+#   MEMORIA COMPACTA
+#   Disposición opcional de bajo consumo para precios e indicadores
+#
+#   calculate_technical_indicators añade ~20 columnas float64, cada una
+#   como una asignación nueva. Con años de histórico horario para todo el
+#   universo la memoria es el límite. En modo compacto cada activo queda en
+#   un único bloque float32 contiguo (una fila del bloque por columna),
+#   reservado una vez y escrito en su sitio, con el índice como segundos
+#   epoch enteros y solo las columnas que lee el análisis.
+#
+#   Los indicadores se siguen calculando en float64 (MatrizPrecios) y solo
+#   se redondean al guardarlos, así que las señales coinciden salvo empates
+#   a menos de ~1e-7 relativo.
+#
+#   Activación:  CRIPTO_COMPACTO=1   o   CryptoAnalyzer(compact=True)
+# ===========================================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from Indicadores_Vectorizados import MatrizPrecios, aplicar_indicadores, calcular_indicadores
+
+DTYPE_COMPACTO = np.float32
+
+# Columnas que leen las señales, el análisis de MAs/cruces y las tablas
+COLUMNAS_ANALISIS = ['MA9', 'MA21', 'MA50', 'MA200', 'MA9_slope',
+                     'RSI', 'MACD', 'MACD_signal', 'MACD_slope']
+
+# Activos por pasada: acota los temporales float64 (T x N) de calcular_indicadores
+ACTIVOS_POR_LOTE = 256
+
+MODO_COMPACTO = os.environ.get('CRIPTO_COMPACTO', '') not in ('', '0')
+
+COLUMNAS_INFORME = ['filas', 'columnas_antes', 'bytes_antes', 'columnas_despues',
+                    'bytes_despues', 'bytes_por_fila', 'ahorro_pct']
+
+
+def indice_epoch(index):
+    """DatetimeIndex -> Index int64 de segundos epoch (otros índices se devuelven tal cual)"""
+    if not isinstance(index, pd.DatetimeIndex):
+        return index
+    segundos = index.values.astype('datetime64[s]').astype(np.int64)
+    return pd.Index(segundos, name=index.name or 'timestamp')
+
+
+def bytes_df(df):
+    """Bytes que ocupa un DataFrame, índice incluido"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _marco(bloque, index, columnas):
+    """DataFrame sobre un bloque (K x T) sin copiarlo: pandas guarda los bloques traspuestos"""
+    return pd.DataFrame(bloque.T, index=index, columns=columnas, copy=False)
+
+
+def compactar(df, columnas=None):
+    """
+    Precios en un bloque float32 con índice epoch.
+
+    Args:
+        df (pd.DataFrame): Serie de precios (price, volume...).
+        columnas (list): Columnas a conservar (None = todas las numéricas).
+    """
+    if columnas is None:
+        columnas = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+
+    bloque = np.empty((len(columnas), len(df)), dtype=DTYPE_COMPACTO)
+    for k, col in enumerate(columnas):
+        bloque[k] = df[col].to_numpy()
+    return _marco(bloque, indice_epoch(df.index), columnas)
+
+
+def indicadores_compactos(dataframes, columnas=COLUMNAS_ANALISIS, conservar=None,
+                          activos_por_lote=ACTIVOS_POR_LOTE, **parametros):
+    """
+    Equivalente compacto de aplicar_indicadores.
+
+    En lugar de añadir columnas a cada DataFrame devuelve DataFrames nuevos:
+    por activo se reserva un bloque float32 (columnas de entrada + indicadores)
+    y cada indicador se escribe directamente en su fila del bloque.
+
+    Args:
+        dataframes (dict): {nombre: DataFrame con columna 'price'}.
+        columnas (list): Indicadores a guardar (None = todos los del motor).
+        conservar (list): Columnas de entrada a copiar (None = numéricas).
+        activos_por_lote (int): Activos calculados a la vez.
+
+    Returns:
+        dict: {nombre: DataFrame compacto}, en el orden de entrada.
+    """
+    nombres = [n for n, df in dataframes.items() if df is not None and len(df) > 0]
+    resultado = {}
+
+    for inicio in range(0, len(nombres), activos_por_lote):
+        lote = {n: dataframes[n] for n in nombres[inicio:inicio + activos_por_lote]}
+        matriz = MatrizPrecios(lote)
+        indicadores = calcular_indicadores(matriz, **parametros)
+        salida = list(indicadores) if columnas is None else list(columnas)
+
+        for nombre, df in lote.items():
+            entrada = conservar if conservar is not None else [
+                col for col in df.columns
+                if col not in indicadores and pd.api.types.is_numeric_dtype(df[col])
+            ]
+            bloque = np.empty((len(entrada) + len(salida), len(df)), dtype=DTYPE_COMPACTO)
+            for k, col in enumerate(entrada):
+                bloque[k] = df[col].to_numpy()
+            for k, col in enumerate(salida, start=len(entrada)):
+                bloque[k] = matriz.columna(indicadores[col], nombre)
+            resultado[nombre] = _marco(bloque, indice_epoch(df.index), entrada + salida)
+
+    return {n: resultado[n] for n in nombres}
+
+
+def informe_memoria(antes, despues):
+    """
+    Bytes por activo de dos disposiciones de los mismos datos.
+
+    Args:
+        antes, despues (dict): {nombre: DataFrame}.
+
+    Returns:
+        pd.DataFrame: Una fila por activo con COLUMNAS_INFORME y una fila TOTAL.
+    """
+    filas = {}
+    for nombre, df in antes.items():
+        compacto = despues.get(nombre)
+        if df is None or compacto is None:
+            continue
+        bytes_antes, bytes_despues = bytes_df(df), bytes_df(compacto)
+        filas[nombre] = {
+            'filas': len(df),
+            'columnas_antes': df.shape[1],
+            'bytes_antes': bytes_antes,
+            'columnas_despues': compacto.shape[1],
+            'bytes_despues': bytes_despues,
+            'bytes_por_fila': bytes_despues / len(compacto) if len(compacto) else 0.0
+        }
+
+    informe = pd.DataFrame.from_dict(filas, orient='index', columns=COLUMNAS_INFORME[:-1])
+    if len(informe):
+        total = informe.sum()
+        total['bytes_por_fila'] = total['bytes_despues'] / total['filas'] if total['filas'] else 0.0
+        total[['columnas_antes', 'columnas_despues']] = np.nan
+        informe.loc['TOTAL'] = total
+    informe['ahorro_pct'] = (1 - informe['bytes_despues'] / informe['bytes_antes']) * 100
+    return informe
+
+
+def comparar(dataframes, columnas=COLUMNAS_ANALISIS, **parametros):
+    """Informe de memoria: indicadores estándar (float64, todas las columnas) frente a compactos"""
+    validos = {n: df for n, df in dataframes.items() if df is not None and len(df) > 0}
+    # astype copia: la referencia es float64 aunque la entrada ya sea compacta
+    estandar = aplicar_indicadores({n: df.astype(np.float64) for n, df in validos.items()}, **parametros)
+    compactos = indicadores_compactos(
+        {n: compactar(df) for n, df in validos.items()}, columnas=columnas, **parametros
+    )
+    return informe_memoria(estandar, compactos)
@@ -0,0 +1,262 @@
+# ===========================================================================
+#   MÉTRICAS Y REGISTRO
+#   Contadores, histogramas y temporizadores por etapa + nivel de log
+#
+#   - metricas: latencia HTTP por proveedor, aciertos de cache, filas
+#     parseadas, tiempo de indicadores... Exportables como JSON o como texto
+#     de Prometheus. Desactivadas no cuestan nada: cada llamada vuelve en la
+#     primera línea y los temporizadores son un contexto nulo compartido.
+#   - registro: sustituye a los print de diagnóstico. El mensaje es una
+#     plantilla de str.format con sus argumentos aparte
+#     (registro.debug("{} velas", len(df))): por debajo del nivel activo no
+#     se formatea. Los argumentos sí se evalúan, así que hay que comprobar
+#     registro.habilitado() antes de calcular estadísticas caras. DEBUG e
+#     INFO salen por stdout y WARNING / ERROR por stderr, así las tablas de
+#     los scripts se pueden redirigir sin mezclarse con los avisos.
+#
+#   Configuración por entorno:
+#       CRIPTO_METRICAS=1            activa las métricas
+#       CRIPTO_METRICAS_ARCHIVO=...  volcado al terminar (.json o .prom)
+#       CRIPTO_LOG_NIVEL=DEBUG       DEBUG / INFO / WARNING / ERROR / OFF
+# ===========================================================================
+
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+from colorama import Fore
+
+# Límites superiores de los histogramas (segundos) por defecto
+BUCKETS_DEFAULT = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIJO_PROMETHEUS = 'cripto_'
+
+NIVELES = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'OFF': 100}
+
+_NULO = nullcontext()
+
+
+def _clave(etiquetas):
+    return tuple(sorted(etiquetas.items()))
+
+
+def _formato_etiquetas(clave, extra=None):
+    pares = list(clave) + ([extra] if extra else [])
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pares) + '}'
+
+
+class Histograma:
+    def __init__(self, buckets=BUCKETS_DEFAULT):
+        self.buckets = tuple(buckets)
+        self.conteos = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+
+    def observar(self, valor):
+        self.conteos[bisect.bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.cuenta += 1
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+
+    def cuantil(self, q):
+        """Cuantil aproximado (límite superior del bucket que lo contiene)"""
+        if self.cuenta == 0:
+            return None
+        objetivo = q * self.cuenta
+        acumulado = 0
+        for limite, conteo in zip(self.buckets + (self.maximo,), self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def resumen(self):
+        return {
+            'cuenta': self.cuenta,
+            'suma': self.suma,
+            'media': self.suma / self.cuenta if self.cuenta else None,
+            'min': self.minimo if self.cuenta else None,
+            'max': self.maximo if self.cuenta else None,
+            'p50': self.cuantil(0.5),
+            'p95': self.cuantil(0.95)
+        }
+
+
+class _Temporizador:
+    __slots__ = ('metricas', 'nombre', 'etiquetas', 'inicio')
+
+    def __init__(self, metricas, nombre, etiquetas):
+        self.metricas = metricas
+        self.nombre = nombre
+        self.etiquetas = etiquetas
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metricas.observar(self.nombre, time.perf_counter() - self.inicio, **self.etiquetas)
+        return False
+
+
+class Metricas:
+    def __init__(self, activo=False):
+        self.activo = activo
+        self._contadores = {}   # nombre -> {clave_etiquetas: valor}
+        self._histogramas = {}  # nombre -> {clave_etiquetas: Histograma}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def activar(self, activo=True):
+        self.activo = activo
+
+    def reiniciar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def definir_buckets(self, nombre, buckets):
+        """Buckets propios para un histograma (p.ej. filas en vez de segundos)"""
+        self._buckets[nombre] = tuple(buckets)
+
+    def incrementar(self, nombre, valor=1, **etiquetas):
+        if not self.activo:
+            return
+        clave = _clave(etiquetas)
+        with self._lock:
+            serie = self._contadores.setdefault(nombre, {})
+            serie[clave] = serie.get(clave, 0) + valor
+
+    def observar(self, nombre, valor, **etiquetas):
+        if not self.activo:
+            return
+        clave = _clave(etiquetas)
+        with self._lock:
+            serie = self._histogramas.setdefault(nombre, {})
+            if clave not in serie:
+                serie[clave] = Histograma(self._buckets.get(nombre, BUCKETS_DEFAULT))
+            serie[clave].observar(valor)
+
+    def temporizador(self, nombre, **etiquetas):
+        """with metricas.temporizador('indicadores_segundos', modo='lote'): ..."""
+        if not self.activo:
+            return _NULO
+        return _Temporizador(self, nombre, etiquetas)
+
+    def contador(self, nombre, **etiquetas):
+        with self._lock:
+            return self._contadores.get(nombre, {}).get(_clave(etiquetas), 0)
+
+    def proporcion(self, nombre, etiqueta, valor):
+        """Fracción del contador con etiqueta == valor (p.ej. aciertos de cache)"""
+        with self._lock:
+            serie = self._contadores.get(nombre, {})
+            total = sum(serie.values())
+            parte = sum(v for clave, v in serie.items() if (etiqueta, valor) in clave)
+        return parte / total if total else None
+
+    def exportar_json(self):
+        with self._lock:
+            return {
+                'contadores': {
+                    nombre: [{'etiquetas': dict(clave), 'valor': valor} for clave, valor in serie.items()]
+                    for nombre, serie in self._contadores.items()
+                },
+                'histogramas': {
+                    nombre: [{'etiquetas': dict(clave), **histograma.resumen()} for clave, histograma in serie.items()]
+                    for nombre, serie in self._histogramas.items()
+                }
+            }
+
+    def exportar_prometheus(self):
+        """Formato de exposición de texto de Prometheus"""
+        lineas = []
+        with self._lock:
+            for nombre, serie in sorted(self._contadores.items()):
+                metrica = PREFIJO_PROMETHEUS + nombre
+                lineas.append(f"# TYPE {metrica} counter")
+                for clave, valor in serie.items():
+                    lineas.append(f"{metrica}{_formato_etiquetas(clave)} {valor}")
+
+            for nombre, serie in sorted(self._histogramas.items()):
+                metrica = PREFIJO_PROMETHEUS + nombre
+                lineas.append(f"# TYPE {metrica} histogram")
+                for clave, histograma in serie.items():
+                    acumulado = 0
+                    for limite, conteo in zip(histograma.buckets, histograma.conteos):
+                        acumulado += conteo
+                        lineas.append(f"{metrica}_bucket{_formato_etiquetas(clave, ('le', limite))} {acumulado}")
+                    lineas.append(f"{metrica}_bucket{_formato_etiquetas(clave, ('le', '+Inf'))} {histograma.cuenta}")
+                    lineas.append(f"{metrica}_sum{_formato_etiquetas(clave)} {histograma.suma}")
+                    lineas.append(f"{metrica}_count{_formato_etiquetas(clave)} {histograma.cuenta}")
+        return '\n'.join(lineas) + '\n'
+
+    def volcar(self, ruta=None):
+        """Escribe las métricas en ruta (.prom -> Prometheus, otro -> JSON)"""
+        ruta = ruta or os.environ.get('CRIPTO_METRICAS_ARCHIVO')
+        if not self.activo or not ruta:
+            return None
+        with open(ruta, 'w', encoding='utf-8') as f:
+            if ruta.endswith('.prom'):
+                f.write(self.exportar_prometheus())
+            else:
+                json.dump(self.exportar_json(), f, indent=2, ensure_ascii=False)
+        return ruta
+
+
+def _nivel(nombre):
+    """Valor de NIVELES; un nombre desconocido avisa por stderr y usa INFO"""
+    valor = NIVELES.get(str(nombre).upper())
+    if valor is None:
+        print(f"{Fore.YELLOW}⚠️  Nivel de log desconocido: {nombre!r} (se usa INFO; "
+              f"válidos: {', '.join(NIVELES)})", file=sys.stderr)
+        valor = NIVELES['INFO']
+    return valor
+
+
+class Registro:
+    """Mensajes de consola con nivel; por debajo del nivel no se formatea ni se imprime nada"""
+
+    COLORES = {'DEBUG': '', 'INFO': '', 'WARNING': Fore.YELLOW, 'ERROR': Fore.RED}
+    A_STDERR = ('WARNING', 'ERROR')
+
+    def __init__(self, nivel='INFO'):
+        self.nivel = _nivel(nivel)
+
+    def configurar(self, nivel):
+        self.nivel = _nivel(nivel)
+
+    def habilitado(self, nivel):
+        return NIVELES[nivel] >= self.nivel
+
+    def _emitir(self, nivel, mensaje, args):
+        if NIVELES[nivel] >= self.nivel:
+            # Sin argumentos el mensaje se imprime literal (puede llevar llaves)
+            print(f"{self.COLORES[nivel]}{mensaje.format(*args) if args else mensaje}",
+                  file=sys.stderr if nivel in self.A_STDERR else sys.stdout)
+
+    def debug(self, mensaje, *args):
+        self._emitir('DEBUG', mensaje, args)
+
+    def info(self, mensaje, *args):
+        self._emitir('INFO', mensaje, args)
+
+    def warning(self, mensaje, *args):
+        self._emitir('WARNING', mensaje, args)
+
+    def error(self, mensaje, *args):
+        self._emitir('ERROR', mensaje, args)
+
+
+# Instancias compartidas por los tres scripts
+metricas = Metricas(activo=os.environ.get('CRIPTO_METRICAS', '') not in ('', '0'))
+registro = Registro(os.environ.get('CRIPTO_LOG_NIVEL', 'INFO'))
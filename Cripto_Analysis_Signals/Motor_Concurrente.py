@@ -0,0 +1,83 @@
+# ===========================================================================
+#   MOTOR CONCURRENTE
+#   Descarga y análisis en paralelo de múltiples activos
+#
+#   Usado por ANALIZADOR_CRYPTO_CLA (y a través de Nucleo_Cripto por
+#   Cripto_Signals_Cla y Precios_Criptos)
+# ===========================================================================
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from Metricas import registro
+
+# Hilos de trabajo por defecto para el pool compartido
+MAX_WORKERS_DEFAULT = 8
+
+# Solicitudes simultáneas permitidas por proveedor (presupuesto de conexiones)
+CONCURRENCIA_POR_PROVEEDOR = {
+    'coingecko': 3,
+    'cryptocompare': 4,
+    'coincap': 6
+}
+
+_semaforos = {}
+_semaforos_lock = threading.Lock()
+
+
+def slot_proveedor(proveedor):
+    """
+    Devuelve el semáforo que limita las solicitudes simultáneas a un proveedor.
+
+    Uso:
+        with slot_proveedor('coingecko'):
+            transporte.session.get(...)
+    """
+    with _semaforos_lock:
+        if proveedor not in _semaforos:
+            limite = CONCURRENCIA_POR_PROVEEDOR.get(proveedor, 2)
+            _semaforos[proveedor] = threading.BoundedSemaphore(limite)
+        return _semaforos[proveedor]
+
+
+def configurar_concurrencia(limites):
+    """Cambia los límites por proveedor (p.ej. benchmarks contra un servidor local)"""
+    with _semaforos_lock:
+        CONCURRENCIA_POR_PROVEEDOR.update(limites)
+        for proveedor in limites:
+            _semaforos.pop(proveedor, None)
+
+
+def procesar_en_paralelo(funcion, elementos, max_workers=MAX_WORKERS_DEFAULT):
+    """
+    Ejecuta funcion(elemento) para cada elemento en un pool de hilos acotado.
+
+    Args:
+        funcion (callable): Función que recibe un elemento y devuelve un resultado.
+        elementos (iterable): Elementos a procesar (nombres o IDs de criptomonedas).
+        max_workers (int): Máximo de hilos simultáneos.
+
+    Returns:
+        dict: {elemento: resultado} en el mismo orden que la entrada. Si la
+              función lanza una excepción el resultado es None.
+    """
+    elementos = list(elementos)
+    resultados = {}
+
+    if not elementos:
+        return resultados
+
+    workers = max(1, min(max_workers, len(elementos)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(funcion, elemento): elemento for elemento in elementos}
+        for futuro in as_completed(futuros):
+            elemento = futuros[futuro]
+            try:
+                resultados[elemento] = futuro.result()
+            except Exception as e:
+                registro.error("❌ Error procesando {}: {}", elemento, e)
+                resultados[elemento] = None
+
+    # Conservar el orden original para las tablas
+    return {elemento: resultados.get(elemento) for elemento in elementos}
@@ -0,0 +1,113 @@
+# ===========================================================================
+#   NÚCLEO COMPARTIDO
+#   Un único motor de datos e indicadores para los tres scripts
+#
+#   Precios_Criptos.py, Cripto_Signals_Cla.py y ANALIZADOR_CRYPTO_CLA.py son
+#   front-ends sobre el mismo CryptoAnalyzer del proceso:
+#       - una sesión HTTP (Transporte_HTTP) y un limitador por proveedor
+#       - un cache en memoria y el almacén en disco (Almacen_OHLCV)
+#       - un motor de indicadores (Indicadores_Vectorizados), que se calcula
+#         una vez por serie descargada
+#   Ejecutados en el mismo proceso comparten descargas e indicadores; uno
+#   tras otro, el almacén hace que el siguiente solo descargue la cola.
+#
+#   Los scripts trabajan con ids de CoinGecko: los que no están en el
+#   universo se registran al vuelo con su propio id como nombre.
+#
+#   Uso:
+#       from Nucleo_Cripto import series, indicadores, vista
+#       datos = series(['bitcoin', 'solana'], dias=365)
+#       datos, ind = indicadores(['bitcoin'], dias=200)
+# ===========================================================================
+
+import threading
+
+import pandas as pd
+
+# Respaldo del failover que solo conoce el precio actual: su "serie" es plana
+# y los indicadores calculados sobre ella (RSI 100...) no significan nada
+PROVEEDOR_SIN_HISTORICO = 'coincap'
+
+_motor = None
+_lock = threading.RLock()
+
+
+def motor(universo=None):
+    """
+    CryptoAnalyzer compartido del proceso (se crea en la primera llamada).
+
+    Args:
+        universo (dict): {nombre: ids por proveedor} a añadir a su universo.
+    """
+    global _motor
+    with _lock:
+        if _motor is None:
+            # Import diferido: ANALIZADOR_CRYPTO_CLA también usa este módulo desde su main()
+            from ANALIZADOR_CRYPTO_CLA import CRYPTO_CONFIG, CryptoAnalyzer
+            _motor = CryptoAnalyzer(universe=dict(CRYPTO_CONFIG))
+        if universo:
+            _motor.universe.update(universo)
+        return _motor
+
+
+def nombres(coin_ids):
+    """{id de CoinGecko: nombre en el universo del motor}, registrando los desconocidos"""
+    analyzer = motor()
+    with _lock:
+        por_id = {ids.get('coingecko'): nombre for nombre, ids in analyzer.universe.items()}
+        resultado = {}
+        for coin_id in coin_ids:
+            if coin_id not in por_id:
+                analyzer.universe[coin_id] = {'coingecko': coin_id}
+                por_id[coin_id] = coin_id
+            resultado[coin_id] = por_id[coin_id]
+        return resultado
+
+
+def _historico(analyzer, nombre, df):
+    """`df`, o None si es la serie plana del proveedor sin histórico"""
+    if df is not None and analyzer.sources.get(nombre) == PROVEEDOR_SIN_HISTORICO:
+        return None
+    return df
+
+
+def series(coin_ids, dias, timeframe='daily'):
+    """
+    Precios de varias monedas con el failover, el cache y el almacén del motor.
+
+    Returns:
+        dict: {coin_id: DataFrame o None}. None también si solo había la serie
+              plana de CoinCap. Los DataFrames son los del cache (compartidos):
+              para añadir columnas usar vista().
+    """
+    por_id = nombres(list(dict.fromkeys(coin_ids)))
+    analyzer = motor()
+    datos = analyzer.get_multiple_crypto_data(por_id.values(), days=dias, timeframe=timeframe)
+    return {coin_id: _historico(analyzer, nombre, datos[nombre]) for coin_id, nombre in por_id.items()}
+
+
+def indicadores(coin_ids, dias, timeframe='daily'):
+    """
+    Precios e indicadores; estos se reutilizan mientras la serie descargada no cambie.
+
+    Returns:
+        tuple: (datos, indicadores), ambos {coin_id: DataFrame o None} compartidos
+               (None con la serie plana de CoinCap, como en series()).
+    """
+    por_id = nombres(list(dict.fromkeys(coin_ids)))
+    analyzer = motor()
+    datos, calculados = analyzer.get_indicators_multiple(por_id.values(), days=dias, timeframe=timeframe)
+    return ({coin_id: _historico(analyzer, nombre, datos[nombre]) for coin_id, nombre in por_id.items()},
+            {coin_id: _historico(analyzer, nombre, calculados[nombre]) for coin_id, nombre in por_id.items()})
+
+
+def vista(df, columnas, renombrar=None):
+    """
+    Copia propia de `columnas` en float64 con índice de fechas, también desde
+    series compactas. Las columnas que la serie no tenga (p.ej. MACD_histogram
+    en modo compacto) se omiten.
+    """
+    resultado = df[[col for col in columnas if col in df.columns]].astype('float64')
+    if not isinstance(resultado.index, pd.DatetimeIndex):
+        resultado.index = pd.to_datetime(resultado.index, unit='s').rename('timestamp')
+    return resultado.rename(columns=renombrar) if renombrar else resultado
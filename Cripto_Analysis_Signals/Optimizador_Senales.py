@@ -0,0 +1,349 @@
+# ===========================================================================
+#   OPTIMIZADOR DE SEÑALES
+#   Barrido de pesos / umbrales / niveles RSI / ventanas MA del score con
+#   validación walk-forward, repartido en un pool de procesos
+#
+#   - La matriz de precios se publica una sola vez en memoria compartida;
+#     cada proceso la abre sin copiarla (también con el método spawn).
+#   - El backtest es causal, así que cada configuración se simula una vez
+#     sobre todo el histórico y después se puntúa en cada ventana de
+#     entrenamiento y de prueba.
+#   - Las configuraciones se ordenan por su rendimiento fuera de muestra.
+#
+#   Uso:
+#       python Optimizador_Senales.py --dias 1095 --muestras 200 --particiones 4
+# ===========================================================================
+
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from colorama import Fore, Style, init
+
+from Indicadores_Vectorizados import MatrizPrecios, calcular_indicadores, VENTANAS_MA
+from Backtest_Vectorizado import (PESOS_SCORE, UMBRALES_SEÑAL, NIVELES_RSI, VENTANA_CRUCES,
+                                  BARRAS_POR_AÑO, backtest_matriz)
+
+# Espacio de búsqueda por defecto (alrededor de los valores actuales)
+ESPACIO_DEFAULT = {
+    'umbral_debil': [0.3, 0.5, 0.7],
+    'umbral_fuerte': [1.0, 1.5, 2.0],
+    'rsi_bajo': [25, 30, 35],
+    'rsi_alto': [65, 70, 75],
+    'ventanas_ma': [tuple(VENTANAS_MA), (5, 20, 50, 100), (10, 30, 60, 150)],
+    'peso_ma': [0.2, 0.3, 0.4],
+    'peso_rsi': [0.1, 0.2, 0.3],
+    'peso_macd': [0.1, 0.2, 0.3],
+    'peso_pendientes': [0.1, 0.15, 0.2],
+    'peso_cruce': [0.1, 0.15, 0.2]
+}
+
+OBJETIVOS = ('sharpe', 'retorno')
+
+
+def configuracion_actual():
+    """Los parámetros que usa hoy get_trading_signals"""
+    return {
+        'umbral_debil': UMBRALES_SEÑAL[0], 'umbral_fuerte': UMBRALES_SEÑAL[1],
+        'rsi_bajo': NIVELES_RSI[0], 'rsi_alto': NIVELES_RSI[1],
+        'ventanas_ma': tuple(VENTANAS_MA),
+        **{f'peso_{k}': v for k, v in PESOS_SCORE.items()}
+    }
+
+
+def _valida(config):
+    return (config.get('umbral_debil', UMBRALES_SEÑAL[0]) < config.get('umbral_fuerte', UMBRALES_SEÑAL[1]) and
+            config.get('rsi_bajo', NIVELES_RSI[0]) < config.get('rsi_alto', NIVELES_RSI[1]))
+
+
+def rejilla(espacio=ESPACIO_DEFAULT):
+    """Todas las combinaciones válidas del espacio"""
+    claves = list(espacio)
+    combinaciones = (dict(zip(claves, valores)) for valores in itertools.product(*espacio.values()))
+    return [config for config in combinaciones if _valida(config)]
+
+
+def muestreo(espacio=ESPACIO_DEFAULT, n=100, semilla=None):
+    """n combinaciones válidas al azar (sin repetir); incluye siempre la configuración actual"""
+    rng = random.Random(semilla)
+    vistas = set()
+    configs = []
+    actual = {k: v for k, v in configuracion_actual().items() if k in espacio}
+    for config in itertools.chain([actual], (
+            {k: rng.choice(v) for k, v in espacio.items()} for _ in range(50 * n))):
+        clave = tuple(sorted(config.items()))
+        if _valida(config) and clave not in vistas:
+            vistas.add(clave)
+            configs.append(config)
+        if len(configs) >= n:
+            break
+    return configs
+
+
+def parametros_backtest(config):
+    """Configuración plana -> argumentos de backtest_matriz"""
+    return {
+        'pesos': {k: config.get(f'peso_{k}', v) for k, v in PESOS_SCORE.items()},
+        'umbrales': (config.get('umbral_debil', UMBRALES_SEÑAL[0]), config.get('umbral_fuerte', UMBRALES_SEÑAL[1])),
+        'niveles_rsi': (config.get('rsi_bajo', NIVELES_RSI[0]), config.get('rsi_alto', NIVELES_RSI[1])),
+        'ventana_cruces': config.get('ventana_cruces', VENTANA_CRUCES),
+        'permitir_cortos': config.get('permitir_cortos', False),
+        'comision': config.get('comision', 0.001),
+        'ventanas_ma': list(config.get('ventanas_ma', VENTANAS_MA))
+    }
+
+
+def particiones_walk_forward(barras, particiones=4, entrenamiento=0.5, inicio=0, anclado=True):
+    """
+    Ventanas (ini_entrenamiento, fin_entrenamiento, ini_prueba, fin_prueba).
+
+    Las primeras `entrenamiento` barras (tras `inicio`, el calentamiento de los
+    indicadores) son el primer entrenamiento; el resto se divide en
+    `particiones` tramos de prueba consecutivos. Anclado: el entrenamiento
+    siempre empieza en `inicio`; si no, es una ventana deslizante.
+    """
+    utiles = barras - inicio
+    largo_entrenamiento = int(utiles * entrenamiento)
+    largo_prueba = (utiles - largo_entrenamiento) // particiones
+    if largo_entrenamiento < 2 or largo_prueba < 2:
+        raise ValueError(f"Histórico insuficiente para {particiones} particiones ({utiles} barras útiles)")
+
+    ventanas = []
+    for k in range(particiones):
+        ini_prueba = inicio + largo_entrenamiento + k * largo_prueba
+        ini_entrenamiento = inicio if anclado else ini_prueba - largo_entrenamiento
+        ventanas.append((ini_entrenamiento, ini_prueba, ini_prueba, ini_prueba + largo_prueba))
+    return ventanas
+
+
+def puntuar(rendimientos, longitudes, inicio, fin, objetivo='sharpe'):
+    """Media entre activos (con datos desde `inicio`) del objetivo en [inicio, fin)"""
+    T = rendimientos.shape[0]
+    activos = (T - longitudes) <= inicio
+    if not activos.any():
+        return np.nan
+    tramo = rendimientos[inicio:fin, activos]
+
+    if objetivo == 'retorno':
+        return float(np.mean(np.prod(1.0 + tramo, axis=0) - 1.0))
+
+    desviacion = tramo.std(axis=0, ddof=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = np.where(desviacion > 0, tramo.mean(axis=0) / desviacion * np.sqrt(BARRAS_POR_AÑO), 0.0)
+    return float(np.mean(sharpe))
+
+
+# ---------------------------------------------------------------------------
+#   Trabajadores
+# ---------------------------------------------------------------------------
+
+_COMPARTIDO = {}
+
+
+def _iniciar_trabajador(nombre_memoria, forma, tipo, longitudes, ventanas, objetivo):
+    """Abre la matriz de precios compartida (una vez por proceso)"""
+    memoria = shared_memory.SharedMemory(name=nombre_memoria)
+    valores = np.ndarray(forma, dtype=tipo, buffer=memoria.buf)
+    _COMPARTIDO.update(
+        memoria=memoria,
+        matriz=MatrizPrecios.desde_valores(valores, longitudes=longitudes),
+        ventanas=ventanas,
+        objetivo=objetivo,
+        indicadores=(None, None)
+    )
+
+
+def _indicadores(matriz, ventanas_ma):
+    """Indicadores de la última combinación de ventanas (los lotes vienen agrupados por ventanas)"""
+    clave, indicadores = _COMPARTIDO.get('indicadores', (None, None))
+    if clave != tuple(ventanas_ma):
+        indicadores = calcular_indicadores(matriz, ventanas_ma=list(ventanas_ma))
+        _COMPARTIDO['indicadores'] = (tuple(ventanas_ma), indicadores)
+    return indicadores
+
+
+def evaluar(matriz, config, ventanas, objetivo='sharpe', indicadores=None):
+    """Puntuación de una configuración en cada ventana: (entrenamiento[], prueba[])"""
+    resultado = backtest_matriz(matriz, indicadores=indicadores, **parametros_backtest(config))
+    entrenamiento = [puntuar(resultado.rendimientos, matriz.longitudes, a, b, objetivo) for a, b, _, _ in ventanas]
+    prueba = [puntuar(resultado.rendimientos, matriz.longitudes, c, d, objetivo) for _, _, c, d in ventanas]
+    return entrenamiento, prueba
+
+
+def _evaluar_lote(configs):
+    matriz = _COMPARTIDO['matriz']
+    return [
+        evaluar(matriz, config, _COMPARTIDO['ventanas'], _COMPARTIDO['objetivo'],
+                _indicadores(matriz, config.get('ventanas_ma', VENTANAS_MA)))
+        for config in configs
+    ]
+
+
+def _lotes(configs, trabajadores):
+    """
+    Lotes equilibrados que nunca mezclan ventanas MA distintas, para que cada
+    proceso calcule los indicadores una sola vez por lote.
+    """
+    grupos = {}
+    for config in configs:
+        grupos.setdefault(tuple(config.get('ventanas_ma', VENTANAS_MA)), []).append(config)
+
+    tamano = max(1, -(-len(configs) // trabajadores))
+    return [grupo[i:i + tamano] for grupo in grupos.values() for i in range(0, len(grupo), tamano)]
+
+
+def _nucleos():
+    """Núcleos disponibles para este proceso (respeta la afinidad de CPU)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# ---------------------------------------------------------------------------
+#   Optimización
+# ---------------------------------------------------------------------------
+
+class ResultadoOptimizacion:
+    def __init__(self, ranking, walk_forward, ventanas):
+        self.ranking = ranking            # una fila por configuración, mejor OOS primero
+        self.walk_forward = walk_forward  # por partición: la mejor en entrenamiento y su OOS
+        self.ventanas = ventanas
+
+    @property
+    def mejor(self):
+        """Configuración con mejor rendimiento medio fuera de muestra"""
+        return self.ranking.iloc[0]['config']
+
+
+def optimizar(dataframes, configs, particiones=4, entrenamiento=0.5, anclado=True,
+              objetivo='sharpe', max_workers=None):
+    """
+    Evalúa configs con walk-forward y las ordena por rendimiento fuera de muestra.
+
+    Args:
+        dataframes (dict | MatrizPrecios): Precios del universo.
+        configs (list): Configuraciones de rejilla() o muestreo().
+        particiones (int): Tramos de prueba.
+        entrenamiento (float): Fracción inicial del histórico útil para entrenar.
+        objetivo (str): 'sharpe' o 'retorno' (media entre activos).
+        max_workers (int): Procesos (None = todos los núcleos, 1 = en este proceso).
+
+    Returns:
+        ResultadoOptimizacion
+    """
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo desconocido: {objetivo} (usar {OBJETIVOS})")
+    matriz = dataframes if isinstance(dataframes, MatrizPrecios) else MatrizPrecios(dataframes)
+    valores = np.ascontiguousarray(matriz.valores, dtype=np.float64)
+
+    # Calentamiento: la MA más larga de todas las configuraciones
+    calentamiento = max(max(c.get('ventanas_ma', VENTANAS_MA)) for c in configs) + 1
+    ventanas = particiones_walk_forward(valores.shape[0], particiones, entrenamiento, calentamiento, anclado)
+
+    trabajadores = max_workers or _nucleos()
+    lotes = _lotes(configs, trabajadores)
+    configs = [config for lote in lotes for config in lote]
+
+    if trabajadores == 1:
+        _COMPARTIDO.update(matriz=MatrizPrecios.desde_valores(valores, longitudes=matriz.longitudes),
+                           ventanas=ventanas, objetivo=objetivo, indicadores=(None, None))
+        try:
+            puntuaciones = [p for lote in lotes for p in _evaluar_lote(lote)]
+        finally:
+            _COMPARTIDO.clear()
+    else:
+        memoria = shared_memory.SharedMemory(create=True, size=valores.nbytes)
+        try:
+            np.ndarray(valores.shape, dtype=valores.dtype, buffer=memoria.buf)[:] = valores
+            with ProcessPoolExecutor(
+                max_workers=trabajadores,
+                initializer=_iniciar_trabajador,
+                initargs=(memoria.name, valores.shape, valores.dtype.str, matriz.longitudes, ventanas, objetivo)
+            ) as pool:
+                puntuaciones = [p for resultado in pool.map(_evaluar_lote, lotes) for p in resultado]
+        finally:
+            memoria.close()
+            memoria.unlink()
+
+    # pandas solo para el resultado: los procesos trabajadores arrancan sin él
+    import pandas as pd
+
+    entrenamiento_matriz = np.array([e for e, _ in puntuaciones])
+    prueba_matriz = np.array([p for _, p in puntuaciones])
+
+    ranking = pd.DataFrame({
+        'config': configs,
+        'is_medio': np.nanmean(entrenamiento_matriz, axis=1),
+        'oos_medio': np.nanmean(prueba_matriz, axis=1),
+        'oos_min': np.nanmin(prueba_matriz, axis=1),
+        **{f'oos_{k + 1}': prueba_matriz[:, k] for k in range(len(ventanas))}
+    }).sort_values('oos_medio', ascending=False, ignore_index=True)
+
+    # Walk-forward: en cada partición se elige con el entrenamiento y se mide en la prueba
+    elegidas = np.nanargmax(entrenamiento_matriz, axis=0)
+    walk_forward = pd.DataFrame({
+        'particion': np.arange(1, len(ventanas) + 1),
+        'entrenamiento': [f"{a}-{b}" for a, b, _, _ in ventanas],
+        'prueba': [f"{c}-{d}" for _, _, c, d in ventanas],
+        'config': [configs[i] for i in elegidas],
+        'is': entrenamiento_matriz[elegidas, np.arange(len(ventanas))],
+        'oos': prueba_matriz[elegidas, np.arange(len(ventanas))]
+    })
+
+    return ResultadoOptimizacion(ranking, walk_forward, ventanas)
+
+
+def _describir(config):
+    return ", ".join(f"{k}={v}" for k, v in config.items())
+
+
+def main():
+    from tabulate import tabulate
+    from ANALIZADOR_CRYPTO_CLA import CryptoAnalyzer, CRYPTO_CONFIG
+    init(autoreset=True)
+
+    parser = argparse.ArgumentParser(description="Optimización walk-forward del score de señales")
+    parser.add_argument('--criptos', nargs='+', default=list(CRYPTO_CONFIG))
+    parser.add_argument('--dias', type=int, default=1095)
+    parser.add_argument('--muestras', type=int, default=200, help="Configuraciones al azar (0 = rejilla completa)")
+    parser.add_argument('--particiones', type=int, default=4)
+    parser.add_argument('--entrenamiento', type=float, default=0.5)
+    parser.add_argument('--deslizante', action='store_true', help="Entrenamiento en ventana deslizante")
+    parser.add_argument('--objetivo', choices=OBJETIVOS, default='sharpe')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{Fore.CYAN}{'='*80}")
+    print(f"{Fore.CYAN}🧪 OPTIMIZADOR WALK-FORWARD DE SEÑALES")
+    print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+
+    analyzer = CryptoAnalyzer()
+    datos = analyzer.get_multiple_crypto_data(args.criptos, days=args.dias)
+    precios = {nombre: df[['price']] for nombre, df in datos.items() if df is not None}
+
+    configs = rejilla() if args.muestras == 0 else muestreo(n=args.muestras, semilla=args.semilla)
+    print(f"{Fore.BLUE}🔄 {len(configs)} configuraciones x {args.particiones} particiones "
+          f"sobre {len(precios)} criptos...{Style.RESET_ALL}")
+
+    resultado = optimizar(precios, configs, args.particiones, args.entrenamiento,
+                          anclado=not args.deslizante, objetivo=args.objetivo, max_workers=args.workers)
+
+    top = resultado.ranking.head(10)
+    print(tabulate([[i + 1, _describir(f['config']), f"{f['is_medio']:.2f}", f"{f['oos_medio']:.2f}", f"{f['oos_min']:.2f}"]
+                    for i, f in top.iterrows()],
+                   headers=["#", "Configuración", "IS medio", "OOS medio", "OOS mín"], tablefmt="fancy_grid"))
+
+    print(f"\n{Fore.CYAN}🔁 WALK-FORWARD")
+    print(tabulate([[f['particion'], f['prueba'], _describir(f['config']), f"{f['is']:.2f}", f"{f['oos']:.2f}"]
+                    for _, f in resultado.walk_forward.iterrows()],
+                   headers=["Partición", "Barras prueba", "Elegida", "IS", "OOS"], tablefmt="fancy_grid"))
+    print(f"{Fore.MAGENTA}💡 OOS walk-forward medio: {resultado.walk_forward['oos'].mean():.2f} ({args.objetivo})")
+
+
+if __name__ == "__main__":
+    main()
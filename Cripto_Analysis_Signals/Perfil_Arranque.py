@@ -0,0 +1,160 @@
+# ===========================================================================
+#   PERFIL DE ARRANQUE
+#   Tiempo de import de los puntos de entrada frente a un presupuesto
+#
+#   Cada módulo se importa en un proceso nuevo con `python -X importtime`
+#   (mejor de N repeticiones) y con la red bloqueada: importar un módulo no
+#   debe descargar nada ni escribir en la consola. Para cada uno se informa
+#   el tiempo acumulado, sus imports directos más pesados y si supera el
+#   presupuesto. El código de salida es 1 si alguno falla, así que sirve
+#   como comprobación en CI.
+#
+#   Uso:
+#       python Perfil_Arranque.py
+#       python Perfil_Arranque.py Precios_Criptos Optimizador_Senales --repeticiones 5
+# ===========================================================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Segundos de import por módulo (máquina de desarrollo de 1 núcleo; pandas ~0.17 s)
+PRESUPUESTO_ARRANQUE = {
+    'ANALIZADOR_CRYPTO_CLA': 0.45,
+    'Cripto_Signals_Cla': 0.45,
+    'Precios_Criptos': 0.45,
+    'Servicio_Vigilancia': 0.45,
+    'Instantanea_Senales': 0.35,
+    'Flujo_Ticks': 0.35,
+    'Nucleo_Cripto': 0.35,
+    # Lo que importan los procesos del optimizador: sin pandas
+    'Optimizador_Senales': 0.12,
+    'Indicadores_Vectorizados': 0.1,
+    'Backtest_Vectorizado': 0.1
+}
+
+_MARCA_RED = 'PERFIL_ARRANQUE_RED'
+
+# Se ejecuta en el proceso hijo: cualquier conexión durante el import se registra y falla
+_CODIGO = f"""
+import socket, sys
+def _bloqueado(*args, **kwargs):
+    sys.stderr.write('{_MARCA_RED}\\n')
+    raise OSError('red bloqueada durante el import')
+socket.socket.connect = _bloqueado
+socket.create_connection = _bloqueado
+socket.getaddrinfo = _bloqueado
+import {{modulo}}
+"""
+
+
+def _parsear_importtime(stderr, modulo):
+    """(segundos acumulados del módulo, [(import directo, segundos)] de mayor a menor)"""
+    filas = []
+    for linea in stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        _, acumulado, nombre = linea.split('|')
+        profundidad = (len(nombre) - len(nombre.lstrip(' ')) - 1) // 2
+        filas.append((profundidad, int(acumulado), nombre.strip()))
+
+    for i, (profundidad, acumulado, nombre) in enumerate(filas):
+        if nombre == modulo and profundidad == 0:
+            # importtime escribe los hijos antes que el padre
+            directos = []
+            for p, a, n in reversed(filas[:i]):
+                if p <= profundidad:
+                    break
+                if p == profundidad + 1:
+                    directos.append((n, a / 1e6))
+            return acumulado / 1e6, sorted(directos, key=lambda d: d[1], reverse=True)
+    return None, []
+
+
+def medir(modulo, repeticiones=3):
+    """
+    Import de `modulo` en procesos nuevos.
+
+    Returns:
+        dict: segundos (mejor repetición), directos (imports más pesados),
+              red (intentó conectarse), salida (lo que escribió en stdout), error.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _CODIGO.format(modulo=modulo)],
+            cwd=DIRECTORIO, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+        )
+        segundos, directos = _parsear_importtime(proceso.stderr, modulo)
+        resultado = {
+            'modulo': modulo,
+            'segundos': segundos,
+            'directos': directos,
+            'red': _MARCA_RED in proceso.stderr,
+            'salida': proceso.stdout.strip(),
+            'error': proceso.stderr.strip().splitlines()[-1] if proceso.returncode else None
+        }
+        if segundos is None or resultado['error']:
+            return resultado
+        if mejor is None or segundos < mejor['segundos']:
+            mejor = resultado
+    return mejor
+
+
+def evaluar(resultado, presupuesto):
+    """Motivos por los que un módulo no cumple (lista vacía si cumple)"""
+    motivos = []
+    if resultado['error']:
+        motivos.append(f"error: {resultado['error']}")
+    if resultado['red']:
+        motivos.append("conecta a la red al importarse")
+    if resultado['salida']:
+        motivos.append("escribe en consola al importarse")
+    if presupuesto is not None and resultado['segundos'] is not None and resultado['segundos'] > presupuesto:
+        motivos.append(f"supera el presupuesto ({presupuesto:.2f}s)")
+    return motivos
+
+
+def main(argv=None):
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="Tiempo de import de los puntos de entrada")
+    parser.add_argument('modulos', nargs='*', default=list(PRESUPUESTO_ARRANQUE))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--json', default=None, help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    filas = []
+    resultados = []
+    fallos = 0
+    for modulo in args.modulos:
+        resultado = medir(modulo, args.repeticiones)
+        presupuesto = PRESUPUESTO_ARRANQUE.get(modulo)
+        motivos = evaluar(resultado, presupuesto)
+        fallos += bool(motivos)
+        resultado.update(presupuesto=presupuesto, motivos=motivos)
+        resultados.append(resultado)
+
+        filas.append([
+            modulo,
+            '-' if resultado['segundos'] is None else f"{resultado['segundos']:.3f}",
+            '-' if presupuesto is None else f"{presupuesto:.2f}",
+            "✅" if not motivos else "❌ " + "; ".join(motivos),
+            ", ".join(f"{n} {s:.3f}" for n, s in resultado['directos'][:3])
+        ])
+
+    print(tabulate(filas, headers=["Módulo", "Segundos", "Presupuesto", "Estado", "Imports más pesados"],
+                   tablefmt="simple"))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=1)
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,74 @@
 # This code fetches and analyzes cryptocurrency data. Please do not delete this cell.
-#!pip install pandas numpy pandas_ta
+#!pip install pandas numpy
 
-import requests
-import pandas as pd
 import numpy as np
-import pandas_ta as ta
-import matplotlib.pyplot as plt
+import pandas as pd
+import Nucleo_Cripto as nucleo
+from Indicadores_Vectorizados import aplicar_indicadores, aplicar_sma
+
+# Days requested for days='max' (CoinGecko returns everything it has)
+MAX_DAYS = 5000
 
 def get_crypto_data(symbols, vs_currency='usd', days='max'):
     """
     Fetches historical price data for multiple cryptocurrencies.
+    Goes through the shared core (Nucleo_Cripto): same HTTP session, cache,
+    on-disk store and provider failover as the other scripts.
 
     Args:
         symbols (list): A list of cryptocurrency coin IDs (from CoinGecko).
-        vs_currency (str): The currency to compare against.
+        vs_currency (str): The currency to compare against. The shared core works in 'usd';
+                           other currencies are fetched straight from CoinGecko (no failover or store).
         days (str or int): The number of days of historical data to fetch ('max' for all available).
 
     Returns:
         dict: A dictionary where keys are coin IDs and values are pandas DataFrames
               with 'timestamp' and 'price' columns.
     """
+    if vs_currency != 'usd':
+        return _get_crypto_data_direct(symbols, vs_currency, days)
+
+    days = MAX_DAYS if days == 'max' else int(days)
+    series = nucleo.series(symbols, days)
+    # Own copies: analyze_crypto_data adds columns and the core's DataFrames are shared
+    return {symbol: nucleo.vista(df, ['price']) for symbol, df in series.items() if df is not None}
+
+def _get_crypto_data_direct(symbols, vs_currency, days):
+    """
+    Non-USD prices from CoinGecko's market_chart, one call per symbol, through
+    the shared HTTP session and rate limiter. Same output as get_crypto_data.
+    """
+    from ANALIZADOR_CRYPTO_CLA import API_CONFIG  # registers the providers' rate limiters
+    from Transporte_HTTP import transporte
+
     data = {}
     for symbol in symbols:
-        url = f'https://api.coingecko.com/api/v3/coins/{symbol}/market_chart?vs_currency={vs_currency}&days={days}'
+        url = f"{API_CONFIG['coingecko']['base_url']}/coins/{symbol}/market_chart"
         try:
-            response = requests.get(url)
+            response = transporte.get(url, proveedor='coingecko', timeout=API_CONFIG['coingecko']['timeout'],
+                                      params={'vs_currency': vs_currency, 'days': days})
             response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
             json_data = response.json()
             if 'prices' in json_data:
                 df = pd.DataFrame(json_data['prices'], columns=['timestamp', 'price'])
                 df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df.set_index('timestamp', inplace=True)
-                data[symbol] = df
+                data[symbol] = df.set_index('timestamp').astype('float64')
             else:
                 print(f"Warning: No price data found for {symbol}")
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching data for {symbol}: {e}")
         except Exception as e:
-            print(f"An unexpected error occurred for {symbol}: {e}")
+            print(f"Error fetching data for {symbol}: {e}")
     return data
 
+# Indicator engine columns -> pandas_ta default column names
+PANDAS_TA_COLUMNS = {
+    'MACD': 'MACD_12_26_9',
+    'MACD_histogram': 'MACDh_12_26_9',
+    'MACD_signal': 'MACDs_12_26_9',
+    'RSI': 'RSI_14'
+}
+
+MA_PERIODS = [9, 21, 50, 200, 400]
+
 def analyze_crypto_data(dataframes_dict):
     """
     Adds technical indicators (MACD, RSI, MAs) to the DataFrames.
@@ -51,20 +80,15 @@ def analyze_crypto_data(dataframes_dict):
         dict: A dictionary with updated DataFrames containing indicators.
     """
     analyzed_data = {}
-    ma_periods = [9, 21, 50, 200, 400]
 
-    for symbol, df in dataframes_dict.items():
-        if not df.empty:
-            # Calculate MACD
-            df.ta.macd(close='price', append=True)
+    non_empty = {symbol: df for symbol, df in dataframes_dict.items() if not df.empty}
 
-            # Calculate RSI
-            df.ta.rsi(close='price', append=True)
-
-            # Calculate Moving Averages
-            for period in ma_periods:
-                df.ta.sma(close='price', length=period, append=True)
+    # MACD, RSI and MAs for every symbol in one vectorized pass
+    aplicar_indicadores(non_empty, columnas=list(PANDAS_TA_COLUMNS), renombrar=PANDAS_TA_COLUMNS)
+    aplicar_sma(non_empty, MA_PERIODS)
 
+    for symbol, df in dataframes_dict.items():
+        if not df.empty:
             analyzed_data[symbol] = df.dropna() # Drop rows with NaN values introduced by indicators
         else:
             print(f"DataFrame for {symbol} is empty, skipping analysis.")
@@ -72,91 +96,124 @@ def analyze_crypto_data(dataframes_dict):
 
     return analyzed_data
 
+def analyze_symbols(symbols, days=365):
+    """
+    Fetch and analyze in one step. Same columns as
+    analyze_crypto_data(get_crypto_data(...)), but MACD and RSI are the ones
+    the shared core already computed for that series (and reuses with the
+    other scripts), so only the SMAs are computed here.
+
+    Returns:
+        dict: Coin ID -> DataFrame with indicators (symbols without data are left out).
+    """
+    _, indicators = nucleo.indicadores(symbols, days)
+
+    views = {}
+    for symbol, df in indicators.items():
+        if df is None:
+            continue
+        view = nucleo.vista(df, ['price', *PANDAS_TA_COLUMNS], renombrar=PANDAS_TA_COLUMNS)
+        if PANDAS_TA_COLUMNS['MACD_histogram'] not in view.columns: # compact series drop the histogram
+            view[PANDAS_TA_COLUMNS['MACD_histogram']] = view['MACD_12_26_9'] - view['MACDs_12_26_9']
+        views[symbol] = view
+
+    aplicar_sma(views, MA_PERIODS)
+    return {symbol: df.dropna() for symbol, df in views.items()}
+
 def safe_print(value):
     try:
         return f"{float(value):.2f}"
     except (ValueError, TypeError):
         return str(value)
     
+def plot_price_and_mas(df, symbol, periods=(9, 21, 50)):
+    """
+    Price and moving averages chart for one analyzed DataFrame.
+    matplotlib is only imported here, so importing this module stays light.
+    """
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(df.index, df['price'], label='Price', alpha=0.8)
+    for period in periods: # Plot fewer MAs for clarity
+        ma_col = f'SMA_{period}'
+        if ma_col in df.columns:
+            plt.plot(df.index, df[ma_col], label=f'MA {period}', alpha=0.7)
+    plt.title(f'{symbol.capitalize()} Price and Moving Averages')
+    plt.xlabel('Date')
+    plt.ylabel('Price (USD)')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
 # List of CoinGecko coin IDs
 crypto_symbols = ['bitcoin', 'uniswap', 'vechain', 'aave']
 
-# Fetch data
-crypto_data = get_crypto_data(crypto_symbols, days=365) # Fetch 1 year of data
-
-# Analyze data
-analyzed_crypto_data = analyze_crypto_data(crypto_data)
-
-# Print current price and some indicators for each crypto
-print("\n--- Análisis de Criptomonedas ---")
-for symbol, df in analyzed_crypto_data.items():
-    if not df.empty:
-        latest_data = df.iloc[-1]
-        print(f"\nAnálisis para: {symbol.upper()}")
-        print(f"  Precio actual: ${latest_data['price']:.2f}")
-
-        # Print MACD and Signal (check if columns exist)
-        # pandas_ta creates columns with default names like MACD_12_26_9, MACDH_12_26_9, MACDS_12_26_9
-        macd_col = 'MACD_12_26_9'
-        macdh_col = 'MACDH_12_26_9'
-        macds_col = 'MACDS_12_26_9'
-
-        """ Antiguo codigo original ------
-        print(f"  MACD (12, 26, 9): {latest_data.get(macd_col, 'N/A'):.2f}")
-        print(f"  MACD Signal (9): {latest_data.get(macds_col, 'N/A'):.2f}")
-        print(f"  MACD Histogram: {latest_data.get(macdh_col, 'N/A'):.2f}")
-        """
-        # A1 - Nuevo codigo Corregido por Copilot 
-        print(f"  MACD (12, 26, 9): {safe_print(latest_data.get(macd_col, 'N/A'))}")
-        print(f"  MACD Signal (9): {safe_print(latest_data.get(macds_col, 'N/A'))}")
-        print(f"  MACD Histogram: {safe_print(latest_data.get(macdh_col, 'N/A'))}")
-        # A1 - Fin Nuevo codigo Corregido por Copilot
-        
-        # Print RSI (check if column exists)
-        # pandas_ta creates RSI column with default name RSI_14
-        rsi_col = 'RSI_14'
-
-        """ Antiguo codigo original ------
-        print(f"  RSI (14): {latest_data.get(rsi_col, 'N/A'):.2f}")
-
-        # Print MAs (check if columns exist)
-        print("  Medias Móviles:")
-        for period in [9, 21, 50, 200, 400]:
-            ma_col = f'SMA_{period}'
-            print(f"    MA ({period}): {latest_data.get(ma_col, 'N/A'):.2f}")
-        """
-        # A2 - Nuevo codigo Corregido por Copilot 
-        print(f"  RSI (14): {safe_print(latest_data.get(rsi_col, 'N/A'))}")
-
-        # Print MAs (check if columns exist)
-        print("  Medias Móviles:")
-        for period in [9, 21, 50, 200, 400]:
-            ma_col = f'SMA_{period}'
-            print(f"    MA ({period}): {safe_print(latest_data.get(ma_col, 'N/A'))}")
-        # A2 - Fin Nuevo codigo Corregido por Copilot
-
-    else:
-        print(f"\nNo data available for {symbol.upper()}")
-
-
-# Optional: You can now access the full DataFrames with indicators
-# For example, to see the DataFrame for Bitcoin:
-# print("\nBitcoin Data with Indicators:")
-# print(analyzed_crypto_data['bitcoin'].tail())
-
-# You can also plot the data and indicators if needed
-# Example plot for Bitcoin price and MAs:
-# if 'bitcoin' in analyzed_crypto_data and not analyzed_crypto_data['bitcoin'].empty:
-#     df_btc = analyzed_crypto_data['bitcoin']
-#     plt.figure(figsize=(12, 6))
-#     plt.plot(df_btc.index, df_btc['price'], label='Price', alpha=0.8)
-#     for period in [9, 21, 50]: # Plot fewer MAs for clarity
-#          ma_col = f'SMA_{period}'
-#          if ma_col in df_btc.columns:
-#               plt.plot(df_btc.index, df_btc[ma_col], label=f'MA {period}', alpha=0.7)
-#     plt.title('Bitcoin Price and Moving Averages')
-#     plt.xlabel('Date')
-#     plt.ylabel('Price (USD)')
-#     plt.legend()
-#     plt.grid(True)
-#     plt.show()
\ No newline at end of file
+def main():
+    # Fetch and analyze 1 year of data through the shared core
+    analyzed_crypto_data = analyze_symbols(crypto_symbols, days=365)
+
+    # Print current price and some indicators for each crypto
+    print("\n--- Análisis de Criptomonedas ---")
+    for symbol, df in analyzed_crypto_data.items():
+        if not df.empty:
+            latest_data = df.iloc[-1]
+            print(f"\nAnálisis para: {symbol.upper()}")
+            print(f"  Precio actual: ${latest_data['price']:.2f}")
+
+            # Print MACD and Signal (check if columns exist)
+            # pandas_ta creates columns with default names like MACD_12_26_9, MACDH_12_26_9, MACDS_12_26_9
+            macd_col = 'MACD_12_26_9'
+            macdh_col = 'MACDH_12_26_9'
+            macds_col = 'MACDS_12_26_9'
+
+            """ Antiguo codigo original ------
+            print(f"  MACD (12, 26, 9): {latest_data.get(macd_col, 'N/A'):.2f}")
+            print(f"  MACD Signal (9): {latest_data.get(macds_col, 'N/A'):.2f}")
+            print(f"  MACD Histogram: {latest_data.get(macdh_col, 'N/A'):.2f}")
+            """
+            # A1 - Nuevo codigo Corregido por Copilot 
+            print(f"  MACD (12, 26, 9): {safe_print(latest_data.get(macd_col, 'N/A'))}")
+            print(f"  MACD Signal (9): {safe_print(latest_data.get(macds_col, 'N/A'))}")
+            print(f"  MACD Histogram: {safe_print(latest_data.get(macdh_col, 'N/A'))}")
+            # A1 - Fin Nuevo codigo Corregido por Copilot
+
+            # Print RSI (check if column exists)
+            # pandas_ta creates RSI column with default name RSI_14
+            rsi_col = 'RSI_14'
+
+            """ Antiguo codigo original ------
+            print(f"  RSI (14): {latest_data.get(rsi_col, 'N/A'):.2f}")
+
+            # Print MAs (check if columns exist)
+            print("  Medias Móviles:")
+            for period in [9, 21, 50, 200, 400]:
+                ma_col = f'SMA_{period}'
+                print(f"    MA ({period}): {latest_data.get(ma_col, 'N/A'):.2f}")
+            """
+            # A2 - Nuevo codigo Corregido por Copilot 
+            print(f"  RSI (14): {safe_print(latest_data.get(rsi_col, 'N/A'))}")
+
+            # Print MAs (check if columns exist)
+            print("  Medias Móviles:")
+            for period in [9, 21, 50, 200, 400]:
+                ma_col = f'SMA_{period}'
+                print(f"    MA ({period}): {safe_print(latest_data.get(ma_col, 'N/A'))}")
+            # A2 - Fin Nuevo codigo Corregido por Copilot
+
+        else:
+            print(f"\nNo data available for {symbol.upper()}")
+
+    # Optional: You can now access the full DataFrames with indicators
+    # For example, to see the DataFrame for Bitcoin:
+    # print("\nBitcoin Data with Indicators:")
+    # print(analyzed_crypto_data['bitcoin'].tail())
+
+    # You can also plot the data and indicators if needed:
+    # if 'bitcoin' in analyzed_crypto_data and not analyzed_crypto_data['bitcoin'].empty:
+    #     plot_price_and_mas(analyzed_crypto_data['bitcoin'], 'bitcoin')
+
+    return analyzed_crypto_data
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# ===========================================================================
+#   SALUD DE APIS
+#   Sondas concurrentes y perezosas con cache TTL + circuit breaker
+#
+#   - Las sondas no se lanzan al construir el analizador sino en el primer
+#     uso, todas a la vez, y se repiten en segundo plano al caducar el TTL.
+#   - Cada solicitud real alimenta el circuit breaker de su proveedor: tras
+#     varios fallos seguidos se deja de usar y, pasado el enfriamiento, se
+#     prueba de nuevo con una sola solicitud. Consultar disponible() no
+#     ocupa ese turno de prueba: lo toma vigilar(), justo al enviar.
+#   - El p95 de las latencias de red recientes de cada proveedor (medidas en
+#     el transporte) es el retardo tras el que el modo de cobertura lanza el
+#     siguiente proveedor en paralelo.
+# ===========================================================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from colorama import Fore
+
+from Metricas import registro
+from Transporte_HTTP import transporte
+
+# Ruta de sonda por proveedor (relativa a base_url)
+SONDAS = {
+    'coingecko': '/ping',
+    'cryptocompare': '/price?fsym=BTC&tsym=USD',
+    'coincap': '/assets/bitcoin'
+}
+
+# Retardo de cobertura: cuantil de la latencia reciente del proveedor
+CUANTIL_COBERTURA = 0.95
+RETARDO_COBERTURA_DEFAULT = 1.0   # segundos, hasta tener suficientes muestras
+RETARDO_COBERTURA_MINIMO = 0.05
+
+
+class CircuitoAbierto(Exception):
+    """El circuit breaker del proveedor no deja enviar la solicitud"""
+
+
+def es_fallo_proveedor(error):
+    """True si el error indica un problema del proveedor (red, 5xx, 429) y no de la petición"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        codigo = error.response.status_code
+        return codigo >= 500 or codigo == 429
+    return isinstance(error, requests.exceptions.RequestException)
+
+
+class CircuitBreaker:
+    CERRADO = 'cerrado'
+    ABIERTO = 'abierto'
+    SEMIABIERTO = 'semiabierto'
+
+    def __init__(self, umbral_fallos=3, enfriamiento=60):
+        self.umbral_fallos = umbral_fallos
+        self.enfriamiento = enfriamiento
+        self.estado = self.CERRADO
+        self.fallos = 0
+        self.abierto_desde = 0.0
+        self._prueba_desde = None
+        self._lock = threading.Lock()
+
+    def _prueba_libre(self, ahora):
+        # Semiabierto: una sola solicitud de prueba a la vez (caduca si nunca informa)
+        return self._prueba_desde is None or ahora - self._prueba_desde >= self.enfriamiento
+
+    def permite(self):
+        """¿Se podría enviar una solicitud ahora? (consulta sin efectos: no ocupa el turno de prueba)"""
+        with self._lock:
+            if self.estado == self.CERRADO:
+                return True
+            ahora = time.monotonic()
+            if self.estado == self.ABIERTO:
+                return ahora - self.abierto_desde >= self.enfriamiento
+            return self._prueba_libre(ahora)
+
+    def intentar(self):
+        """Reserva el envío de una solicitud; en semiabierto ocupa el único turno de prueba"""
+        with self._lock:
+            if self.estado == self.CERRADO:
+                return True
+            ahora = time.monotonic()
+            if self.estado == self.ABIERTO:
+                if ahora - self.abierto_desde < self.enfriamiento:
+                    return False
+                self.estado = self.SEMIABIERTO
+                self._prueba_desde = None
+            if not self._prueba_libre(ahora):
+                return False
+            self._prueba_desde = ahora
+            return True
+
+    def liberar(self):
+        """Devuelve el turno de prueba de una solicitud que terminó sin resultado (ni éxito ni fallo)"""
+        with self._lock:
+            self._prueba_desde = None
+
+    def registrar_exito(self):
+        with self._lock:
+            self.estado = self.CERRADO
+            self.fallos = 0
+            self._prueba_desde = None
+
+    def registrar_fallo(self):
+        with self._lock:
+            self.fallos += 1
+            self._prueba_desde = None
+            if self.estado == self.SEMIABIERTO or self.fallos >= self.umbral_fallos:
+                self.estado = self.ABIERTO
+                self.abierto_desde = time.monotonic()
+
+
+class MonitorSalud:
+    def __init__(self, api_config, ttl=300, ttl_fallo=30, timeout=5):
+        """
+        Args:
+            api_config (dict): API_CONFIG con base_url por proveedor.
+            ttl (int): Segundos de validez de una sonda correcta.
+            ttl_fallo (int): Segundos hasta volver a sondear un proveedor caído.
+            timeout (int): Timeout de cada sonda.
+        """
+        self.api_config = api_config
+        self.ttl = ttl
+        self.ttl_fallo = ttl_fallo
+        self.timeout = timeout
+        self.breakers = {proveedor: CircuitBreaker() for proveedor in api_config}
+
+        self._estado = {}          # proveedor -> (disponible, instante)
+        self._sondas = {}          # proveedor -> Future en curso
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=len(api_config), thread_name_prefix='sonda')
+        self._mostrado = False
+
+    def _sondear(self, proveedor):
+        try:
+            response = transporte.get(
+                f"{self.api_config[proveedor]['base_url']}{SONDAS[proveedor]}",
+                proveedor=proveedor,
+                timeout=self.timeout
+            )
+            disponible = response.status_code == 200
+        except Exception:
+            disponible = False
+
+        with self._lock:
+            self._estado[proveedor] = (disponible, time.monotonic())
+            self._sondas.pop(proveedor, None)
+        self._mostrar()
+        return disponible
+
+    def _caducado(self, proveedor, ahora):
+        entrada = self._estado.get(proveedor)
+        if entrada is None:
+            return True
+        disponible, instante = entrada
+        return ahora - instante >= (self.ttl if disponible else self.ttl_fallo)
+
+    def _lanzar_sondas(self, proveedores):
+        """Lanza en paralelo las sondas caducadas que no estén ya en curso"""
+        ahora = time.monotonic()
+        with self._lock:
+            for proveedor in proveedores:
+                if proveedor in SONDAS and proveedor not in self._sondas and self._caducado(proveedor, ahora):
+                    self._sondas[proveedor] = self._pool.submit(self._sondear, proveedor)
+            return dict(self._sondas)
+
+    def refrescar(self):
+        """Sondea todos los proveedores a la vez y espera el resultado"""
+        with self._lock:
+            self._estado.clear()
+        for futuro in self._lanzar_sondas(self.api_config).values():
+            futuro.result()
+        return self.estado()
+
+    def estado(self):
+        """Último resultado conocido de las sondas {proveedor: bool} (sin bloquear)"""
+        with self._lock:
+            return {proveedor: entrada[0] for proveedor, entrada in self._estado.items()}
+
+    def disponible(self, proveedor):
+        """
+        ¿Conviene usar el proveedor? La primera consulta espera a su sonda;
+        después se usa el último resultado y se re-sondea en segundo plano.
+        """
+        en_curso = self._lanzar_sondas(self.api_config)
+        with self._lock:
+            conocido = proveedor in self._estado
+        if not conocido and proveedor in en_curso:
+            en_curso[proveedor].result()
+
+        with self._lock:
+            sonda_ok = self._estado.get(proveedor, (False, 0))[0]
+        return sonda_ok and self.breakers[proveedor].permite()
+
+    def intentar(self, proveedor):
+        """Reserva el envío de una solicitud real (ver CircuitBreaker.intentar)"""
+        return self.breakers[proveedor].intentar()
+
+    def liberar(self, proveedor):
+        self.breakers[proveedor].liberar()
+
+    def registrar_exito(self, proveedor):
+        self.breakers[proveedor].registrar_exito()
+        with self._lock:
+            self._estado[proveedor] = (True, time.monotonic())
+
+    def registrar_fallo(self, proveedor):
+        self.breakers[proveedor].registrar_fallo()
+
+    def retardo_cobertura(self, proveedor, q=CUANTIL_COBERTURA):
+        """Segundos a esperar al proveedor antes de lanzar el siguiente en paralelo"""
+        percentil = transporte.percentil(proveedor, q)
+        if percentil is None:
+            return RETARDO_COBERTURA_DEFAULT
+        return max(percentil, RETARDO_COBERTURA_MINIMO)
+
+    @contextmanager
+    def vigilar(self, proveedor):
+        """
+        Envuelve una solicitud real: reserva su envío en el circuit breaker
+        (CircuitoAbierto si no lo permite) y registra el resultado.
+        """
+        if not self.intentar(proveedor):
+            raise CircuitoAbierto(f"circuito abierto para {proveedor}")
+        try:
+            yield
+        except requests.exceptions.RequestException as e:
+            if es_fallo_proveedor(e):
+                self.registrar_fallo(proveedor)
+            else:
+                self.registrar_exito(proveedor)
+            raise
+        except BaseException:
+            self.liberar(proveedor)
+            raise
+        self.registrar_exito(proveedor)
+
+    def _mostrar(self):
+        """Imprime el estado la primera vez que hay resultados de todas las sondas"""
+        with self._lock:
+            if self._mostrado or len(self._estado) < len(self.api_config):
+                return
+            self._mostrado = True
+            status = {proveedor: self._estado[proveedor][0] for proveedor in self.api_config}
+
+        registro.info("{}📡 Estado de APIs:", Fore.CYAN)
+        for api, working in status.items():
+            if working:
+                registro.info("{}✅ {}: Disponible", Fore.GREEN, api.upper())
+            else:
+                registro.warning("{}❌ {}: No disponible", Fore.RED, api.upper())
@@ -0,0 +1,276 @@
+# ===========================================================================
+#   SERVICIO DE VIGILANCIA
+#   Modo residente: cada activo se refresca a su propia cadencia y solo se
+#   descargan las velas nuevas
+#
+#   Por activo queda en memoria el estado incremental de indicadores
+#   (EstadoIndicadores) sembrado con las velas cerradas, la marca de la
+#   última vela cerrada y la vela en curso. Cada refresco pide la cola desde
+#   la última vela cerrada al proveedor que sirvió el histórico:
+#       - nada nuevo y el mismo precio en curso  -> no se recalcula nada
+#       - velas cerradas nuevas                  -> O(1) por vela en el estado
+#       - vela en curso distinta                 -> copia del estado + 1 vela
+#   El coste estable depende de las velas nuevas, no del tamaño del universo
+#   ni del histórico. Las velas cerradas nuevas se anexan al almacén.
+#
+#   Solo temporalidades nativas (minute, hourly, daily).
+#
+#   Uso:
+#       python Servicio_Vigilancia.py
+#       python Servicio_Vigilancia.py --top 50 --timeframe hourly --cadencia 120
+# ===========================================================================
+
+import argparse
+import copy
+import heapq
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+from colorama import Fore, Style, init
+
+from ANALIZADOR_CRYPTO_CLA import CRYPTO_CONFIG, CryptoAnalyzer, load_universe
+from Indicadores_Incrementales import EstadoIndicadores
+from Metricas import metricas, registro
+from Motor_Concurrente import procesar_en_paralelo, MAX_WORKERS_DEFAULT
+from Temporalidades import NATIVAS, dias_para_velas
+
+# Segundos entre refrescos de un activo por temporalidad
+CADENCIA_DEFAULT = {
+    'minute': 60,
+    'hourly': 300,
+    'daily': 900
+}
+
+
+class ActivoVigilado:
+    """Estado en memoria de un activo entre refrescos"""
+
+    def __init__(self, nombre, proveedor, estado, cerrada, en_curso):
+        self.nombre = nombre
+        self.proveedor = proveedor
+        self.estado = estado          # EstadoIndicadores con las velas cerradas
+        self.cerrada = cerrada        # segundos epoch de la última vela cerrada
+        self.en_curso = en_curso      # (marca, precio) de la vela aún abierta
+        self.senales = None
+        self.refrescos = 0
+        self.errores = 0
+
+    @property
+    def precio(self):
+        return self.en_curso[1]
+
+
+class ServicioVigilancia:
+    def __init__(self, analyzer, nombres, timeframe='daily', cadencia=None, cadencias=None,
+                 days=None, al_cambiar=None, max_workers=MAX_WORKERS_DEFAULT):
+        """
+        Args:
+            analyzer (CryptoAnalyzer): Analizador compartido (sesión, almacén y salud de APIs).
+            nombres (iterable): Criptos a vigilar (claves de analyzer.universe).
+            timeframe (str): Temporalidad nativa de las velas.
+            cadencia (float): Segundos entre refrescos (None = CADENCIA_DEFAULT).
+            cadencias (dict): {nombre: segundos} para activos con otra cadencia.
+            days (int): Ventana de la siembra inicial (None = 200 velas).
+            al_cambiar (callable): al_cambiar(activo) tras recalcular sus señales.
+            max_workers (int): Refrescos simultáneos.
+        """
+        if timeframe not in NATIVAS:
+            raise ValueError(f"Temporalidad no soportada en vigilancia: {timeframe} (usar {', '.join(NATIVAS)})")
+
+        self.analyzer = analyzer
+        self.timeframe = timeframe
+        self.cadencia = CADENCIA_DEFAULT[timeframe] if cadencia is None else cadencia
+        self.cadencias = dict(cadencias or {})
+        self.days = dias_para_velas(timeframe, 200) if days is None else days
+        self.al_cambiar = al_cambiar
+        self.max_workers = max_workers
+
+        self.activos = {}
+        self.ciclos = 0
+        self._agenda = []             # heap de (instante monotónico, nombre)
+        self._parar = threading.Event()
+        for nombre in dict.fromkeys(nombres):
+            heapq.heappush(self._agenda, (0.0, nombre))
+
+    def cadencia_de(self, nombre):
+        return self.cadencias.get(nombre, self.cadencia)
+
+    @property
+    def senales(self):
+        """{nombre: señales vigentes} de los activos ya sembrados"""
+        return {nombre: activo.senales for nombre, activo in self.activos.items()}
+
+    def _senales(self, activo):
+        # La vela en curso se evalúa sobre una copia: el estado solo avanza con velas cerradas
+        vista = copy.deepcopy(activo.estado)
+        vista.actualizar(float(activo.precio))
+        return self.analyzer.get_trading_signals_from_state(vista)
+
+    def _sembrar(self, nombre):
+        """Histórico completo (almacén + cola) y estado inicial; None si no hay datos"""
+        # fresh: el estado se siembra una vez y después solo se le añaden velas nuevas
+        df = self.analyzer.get_crypto_data(nombre, days=self.days, timeframe=self.timeframe, fresh=True)
+        if df is None:
+            return None
+        df = df[df['price'].notna()]
+        if len(df) < 2:
+            return None
+
+        precios = df['price'].to_numpy(dtype=float)
+        marcas = _marcas(df.index)
+        estado = EstadoIndicadores().sembrar(precios[:-1])
+        self.analyzer.indicator_states[nombre] = estado
+
+        activo = ActivoVigilado(nombre, self.analyzer.sources.get(nombre), estado,
+                                marcas[-2], (marcas[-1], precios[-1]))
+        activo.senales = self._senales(activo)
+        self.activos[nombre] = activo
+        return activo
+
+    def refrescar(self, nombre):
+        """
+        Un refresco de un activo.
+
+        Returns:
+            bool: True si sus señales se recalcularon.
+        """
+        activo = self.activos.get(nombre)
+        if activo is None:
+            resultado = 'siembra' if self._sembrar(nombre) is not None else 'error'
+            metricas.incrementar('vigilancia_refrescos_total', resultado=resultado)
+            return resultado == 'siembra'
+
+        activo.refrescos += 1
+        if activo.proveedor not in ('coingecko', 'cryptocompare'):
+            # Serie plana de respaldo (CoinCap): se vuelve a sembrar con el failover completo
+            del self.activos[nombre]
+            return self.refrescar(nombre)
+
+        desde = pd.Timestamp(activo.cerrada, unit='s')
+        cola = self.analyzer.fetch_tail(nombre, activo.proveedor, desde, self.timeframe)
+        if cola is None:
+            activo.errores += 1
+            metricas.incrementar('vigilancia_refrescos_total', resultado='error')
+            return False
+
+        nuevas = cola[cola['price'].notna()]
+        marcas = _marcas(nuevas.index)
+        nuevas, marcas = nuevas[marcas > activo.cerrada], marcas[marcas > activo.cerrada]
+        precios = nuevas['price'].to_numpy(dtype=float)
+        if len(nuevas) == 0 or (len(nuevas) == 1 and precios[-1] == activo.precio):
+            metricas.incrementar('vigilancia_refrescos_total', resultado='sin_cambios')
+            return False
+
+        for precio in precios[:-1]:
+            activo.estado.actualizar(float(precio))
+        activo.en_curso = (marcas[-1], precios[-1])
+
+        if len(nuevas) > 1:
+            activo.cerrada = marcas[-2]
+            crypto_id = self.analyzer.universe.get(nombre, {}).get(activo.proveedor)
+            self.analyzer.store.anexar(activo.proveedor, crypto_id, self.timeframe, cola)
+            metricas.incrementar('vigilancia_velas_nuevas_total', len(nuevas) - 1)
+            metricas.incrementar('vigilancia_refrescos_total', resultado='velas_nuevas')
+        else:
+            metricas.incrementar('vigilancia_refrescos_total', resultado='vela_en_curso')
+
+        activo.senales = self._senales(activo)
+        return True
+
+    def ciclo(self):
+        """
+        Refresca en paralelo los activos vencidos y los vuelve a programar.
+
+        Returns:
+            list: Nombres cuyas señales cambiaron.
+        """
+        ahora = time.monotonic()
+        vencidos = []
+        while self._agenda and self._agenda[0][0] <= ahora:
+            vencidos.append(heapq.heappop(self._agenda)[1])
+        if not vencidos:
+            return []
+
+        with metricas.temporizador('vigilancia_ciclo_segundos'):
+            resultados = procesar_en_paralelo(self.refrescar, vencidos, max_workers=self.max_workers)
+
+        fin = time.monotonic()
+        for nombre in vencidos:
+            heapq.heappush(self._agenda, (fin + self.cadencia_de(nombre), nombre))
+
+        cambiados = [nombre for nombre, cambiado in resultados.items() if cambiado]
+        self.ciclos += 1
+        registro.debug("🔁 Ciclo {}: {} refrescados, {} con cambios", self.ciclos, len(vencidos), len(cambiados))
+        if self.al_cambiar:
+            for nombre in cambiados:
+                self.al_cambiar(self.activos[nombre])
+        return cambiados
+
+    def ejecutar(self, ciclos=None):
+        """Bucle principal hasta detener() (o hasta completar `ciclos` ciclos con refrescos)"""
+        self._parar.clear()
+        hechos = 0
+        while not self._parar.is_set() and self._agenda:
+            espera = self._agenda[0][0] - time.monotonic()
+            if espera > 0 and self._parar.wait(espera):
+                break
+            self.ciclo()
+            hechos += 1
+            if ciclos is not None and hechos >= ciclos:
+                break
+
+    def detener(self):
+        self._parar.set()
+
+
+def _marcas(index):
+    """Marcas del índice comparables entre series normales y compactas (segundos epoch)"""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.values.astype('datetime64[s]').astype('int64')
+    return index.to_numpy(dtype='int64')
+
+
+def mostrar_cambio(analyzer):
+    """Callback por defecto: una línea por activo con señales recalculadas"""
+    def mostrar(activo):
+        senales = activo.senales
+        print(f"{datetime.now():%H:%M:%S}  {activo.nombre:<14} ${activo.precio:>14,.4f}  "
+              f"{analyzer.format_signal_display(senales)}  score {senales['score']}")
+    return mostrar
+
+
+def main(argv=None):
+    init(autoreset=True)
+
+    parser = argparse.ArgumentParser(description="Vigilancia continua con refresco incremental")
+    parser.add_argument('--top', type=int, default=None, help="Vigilar el top-N del mercado en lugar de la lista fija")
+    parser.add_argument('--orden', choices=('market_cap', 'volumen'), default='market_cap')
+    parser.add_argument('--timeframe', choices=NATIVAS, default='daily')
+    parser.add_argument('--cadencia', type=float, default=None, help="Segundos entre refrescos de cada activo")
+    parser.add_argument('--ciclos', type=int, default=None, help="Terminar tras N ciclos (por defecto sin fin)")
+    args = parser.parse_args(argv)
+
+    print(f"{Fore.CYAN}{'='*80}")
+    print(f"{Fore.CYAN}👁️  VIGILANCIA CONTINUA ({args.timeframe})")
+    print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+
+    universe = load_universe(args.top, args.orden) if args.top else CRYPTO_CONFIG
+    analyzer = CryptoAnalyzer(universe=universe)
+    servicio = ServicioVigilancia(analyzer, universe.keys(), timeframe=args.timeframe,
+                                  cadencia=args.cadencia, al_cambiar=mostrar_cambio(analyzer))
+    print(f"{Fore.BLUE}🔄 {len(universe)} activos, refresco cada {servicio.cadencia:g}s "
+          f"(Ctrl+C para salir){Style.RESET_ALL}")
+
+    try:
+        servicio.ejecutar(args.ciclos)
+    except KeyboardInterrupt:
+        servicio.detener()
+
+    refrescos = sum(activo.refrescos for activo in servicio.activos.values())
+    print(f"\n{Fore.CYAN}👋 {servicio.ciclos} ciclos, {refrescos} refrescos incrementales{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
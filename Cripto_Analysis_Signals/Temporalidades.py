@@ -0,0 +1,137 @@
+# ===========================================================================
+#   TEMPORALIDADES
+#   Series intradía y remuestreo a velas más largas sin llamadas de red
+#
+#   Se descarga (y guarda en el almacén) la serie más fina necesaria y las
+#   temporalidades derivadas salen de ella:
+#       minute  -> hourly, 4h, daily
+#       hourly  -> 4h, daily, weekly
+#       daily   -> weekly
+#   El remuestreo agrupa por cubeta de tiempo fija (epoch // segundos) con
+#   np.*.reduceat sobre la serie ordenada; funciona igual con DatetimeIndex
+#   que con el índice epoch del modo compacto. Las semanas empiezan en lunes.
+# ===========================================================================
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# Segundos por vela
+SEGUNDOS = {
+    'minute': 60,
+    'hourly': 3600,
+    '4h': 4 * 3600,
+    'daily': 86400,
+    'weekly': 7 * 86400
+}
+
+# Temporalidades que devuelven las APIs (el resto se derivan)
+NATIVAS = ('minute', 'hourly', 'daily')
+
+# Serie que se descarga cuando no hay una más fina guardada que cubra la ventana
+FUENTE = {
+    'minute': 'minute',
+    'hourly': 'hourly',
+    '4h': 'hourly',
+    'daily': 'daily',
+    'weekly': 'daily'
+}
+
+# Endpoint de CryptoCompare por temporalidad nativa (máx. 2000 velas por llamada)
+ENDPOINT_CRYPTOCOMPARE = {
+    'minute': 'histominute',
+    'hourly': 'histohour',
+    'daily': 'histoday'
+}
+VELAS_POR_LLAMADA_CRYPTOCOMPARE = 2000
+
+# CoinGecko elige la granularidad por rango: hasta 90 días devuelve velas horarias
+DIAS_MAX_COINGECKO = {'hourly': 90}
+
+# Lunes 1970-01-05: desplazamiento para que las semanas empiecen en lunes
+_ORIGEN_SEMANAL = 4 * 86400
+
+# Agregación por columna (las que no aparecen usan el último valor)
+AGREGACION = {
+    'open': 'primero',
+    'high': 'maximo',
+    'low': 'minimo',
+    'volume': 'suma',
+    'volumefrom': 'suma',
+    'volumeto': 'suma'
+}
+
+
+def velas_por_dia(timeframe):
+    return 86400 / SEGUNDOS[timeframe]
+
+
+def dias_para_velas(timeframe, velas):
+    """Días de calendario que cubren `velas` velas de la temporalidad"""
+    return max(1, math.ceil(velas / velas_por_dia(timeframe)))
+
+
+def fuentes_posibles(timeframe):
+    """Temporalidades nativas de las que se puede derivar, de la más fina a la más gruesa"""
+    return [t for t in NATIVAS if SEGUNDOS[t] <= SEGUNDOS[timeframe] and SEGUNDOS[timeframe] % SEGUNDOS[t] == 0]
+
+
+def _segundos_epoch(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index.values.astype('datetime64[s]').astype(np.int64)
+    return np.asarray(index, dtype=np.int64)
+
+
+def remuestrear(df, timeframe, completas=False):
+    """
+    Velas de `timeframe` a partir de una serie más fina.
+
+    Args:
+        df (pd.DataFrame): Serie ordenada por tiempo (price/close, volume, OHLC...).
+        timeframe (str): Clave de SEGUNDOS.
+        completas (bool): Descartar la última vela si aún no ha cerrado.
+
+    Returns:
+        pd.DataFrame: Una fila por cubeta con datos, indexada por su inicio
+                      (mismo tipo de índice que la entrada).
+    """
+    if df is None or len(df) == 0:
+        return df
+
+    paso = SEGUNDOS[timeframe]
+    origen = _ORIGEN_SEMANAL if timeframe == 'weekly' else 0
+    segundos = _segundos_epoch(df.index)
+    cubetas = (segundos - origen) // paso
+
+    inicios = np.concatenate(([0], np.flatnonzero(np.diff(cubetas)) + 1))
+    finales = np.append(inicios[1:], len(df)) - 1
+
+    columnas = {}
+    for col in df.columns:
+        valores = df[col].to_numpy()
+        modo = AGREGACION.get(col, 'ultimo')
+        if modo == 'primero':
+            columnas[col] = valores[inicios]
+        elif modo == 'maximo':
+            columnas[col] = np.maximum.reduceat(valores, inicios)
+        elif modo == 'minimo':
+            columnas[col] = np.minimum.reduceat(valores, inicios)
+        elif modo == 'suma':
+            columnas[col] = np.add.reduceat(valores, inicios)
+        else:
+            columnas[col] = valores[finales]
+
+    inicio_cubeta = cubetas[inicios] * paso + origen
+    if isinstance(df.index, pd.DatetimeIndex):
+        index = pd.DatetimeIndex(inicio_cubeta.astype('datetime64[s]'), name=df.index.name)
+    else:
+        index = pd.Index(inicio_cubeta, name=df.index.name)
+    resultado = pd.DataFrame(columnas, index=index)
+
+    if completas and len(resultado):
+        # La última cubeta está cerrada si la serie llega a su última vela fina
+        paso_fino = int(np.min(np.diff(segundos))) if len(segundos) > 1 else paso
+        if segundos[-1] + paso_fino < inicio_cubeta[-1] + paso:
+            resultado = resultado.iloc[:-1]
+    return resultado
@@ -0,0 +1,160 @@
+# ===========================================================================
+#   TRANSPORTE HTTP
+#   Sesión compartida con pools de conexiones por host, keep-alive y gzip
+#
+#   Todas las llamadas a CoinGecko / CryptoCompare / CoinCap pasan por aquí:
+#   se reutiliza la conexión TCP+TLS entre solicitudes, se respeta el
+#   limitador de tasa y la concurrencia por proveedor, y se cuentan las
+#   conexiones nuevas frente a las reutilizadas. También se guardan las
+#   latencias de red recientes por proveedor (sin la espera del limitador),
+#   de las que sale el retardo del modo de cobertura. Un 429 frena el
+#   limitador del proveedor lo que pida Retry-After (o PAUSA_429_DEFAULT).
+# ===========================================================================
+
+import math
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Motor_Concurrente import slot_proveedor
+from Limitador_Tasa import esperar_turno, obtener_limitador
+from Metricas import metricas
+
+# Configuración del transporte
+HTTP_CONFIG = {
+    'pool_connections': 10,  # hosts distintos con pool propio
+    'pool_maxsize': 16,      # conexiones keep-alive por host
+    'headers': {
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    }
+}
+
+# Segundos de pausa tras un 429 sin Retry-After utilizable
+PAUSA_429_DEFAULT = 30
+
+# Latencias recientes que se conservan por proveedor
+VENTANA_LATENCIAS = 100
+MUESTRAS_MINIMAS = 5
+
+
+class TransporteHTTP:
+    def __init__(self, pool_connections=HTTP_CONFIG['pool_connections'],
+                 pool_maxsize=HTTP_CONFIG['pool_maxsize'], headers=None):
+        """
+        Un único HTTPAdapter (y por tanto un único juego de pools) compartido
+        por todas las sesiones; cada hilo usa su propia requests.Session.
+        """
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.headers = dict(HTTP_CONFIG['headers'] if headers is None else headers)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.solicitudes = 0
+        self._latencias = {}
+
+    @property
+    def session(self):
+        """Sesión del hilo actual montada sobre el adapter compartido"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url, proveedor=None, **kwargs):
+        """
+        GET a través del pool. Si se indica proveedor, espera su turno en el
+        limitador y ocupa uno de sus slots de concurrencia; un 429 retrasa
+        las siguientes llamadas a ese proveedor (penalizar).
+        """
+        if proveedor is None:
+            response = self.session.get(url, **kwargs)
+        else:
+            esperar_turno(proveedor)
+            with slot_proveedor(proveedor):
+                inicio = time.perf_counter()
+                try:
+                    response = self.session.get(url, **kwargs)
+                finally:
+                    # Los timeouts también cuentan: son la cola que se quiere cubrir
+                    latencia = time.perf_counter() - inicio
+                    self.registrar_latencia(proveedor, latencia)
+                metricas.observar('http_latencia_segundos', latencia, proveedor=proveedor)
+            metricas.incrementar('http_solicitudes_total', proveedor=proveedor, codigo=response.status_code)
+            if response.status_code == 429:
+                obtener_limitador(proveedor).penalizar(pausa_429(response))
+
+        with self._lock:
+            self.solicitudes += 1
+        return response
+
+    def registrar_latencia(self, proveedor, segundos):
+        with self._lock:
+            if proveedor not in self._latencias:
+                self._latencias[proveedor] = deque(maxlen=VENTANA_LATENCIAS)
+            self._latencias[proveedor].append(segundos)
+
+    def percentil(self, proveedor, q=0.95):
+        """Cuantil de las latencias de red recientes (None con menos de MUESTRAS_MINIMAS)"""
+        with self._lock:
+            muestras = sorted(self._latencias.get(proveedor, ()))
+        if len(muestras) < MUESTRAS_MINIMAS:
+            return None
+        return muestras[min(len(muestras) - 1, math.ceil(q * len(muestras)) - 1)]
+
+    def estadisticas(self):
+        """
+        Contadores por host: conexiones abiertas, solicitudes y reutilizaciones.
+        """
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for clave in list(pools.keys()):
+            pool = pools.get(clave)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}" if pool.port else f"{pool.scheme}://{pool.host}"
+            hosts[host] = {
+                'conexiones': pool.num_connections,
+                'solicitudes': pool.num_requests,
+                'reutilizadas': max(pool.num_requests - pool.num_connections, 0)
+            }
+
+        total_conexiones = sum(h['conexiones'] for h in hosts.values())
+        total_reutilizadas = sum(h['reutilizadas'] for h in hosts.values())
+        return {
+            'solicitudes': self.solicitudes,
+            'conexiones': total_conexiones,
+            'reutilizadas': total_reutilizadas,
+            'hosts': hosts
+        }
+
+    def cerrar(self):
+        """Cierra todas las conexiones del pool"""
+        self.adapter.close()
+
+
+def pausa_429(response, defecto=PAUSA_429_DEFAULT):
+    """Segundos que pide el Retry-After de un 429 (en segundos o como fecha HTTP)"""
+    valor = response.headers.get('Retry-After')
+    if valor:
+        try:
+            return max(0.0, float(valor))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return defecto
+
+
+# Transporte compartido por los tres scripts
+transporte = TransporteHTTP()
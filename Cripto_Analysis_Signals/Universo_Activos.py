@@ -0,0 +1,228 @@
+# ===========================================================================
+#   UNIVERSO DE ACTIVOS
+#   Top-N por capitalización o volumen a partir de los listados paginados
+#   de los proveedores, con índice persistente de IDs entre APIs
+#
+#   CoinGecko (/coins/markets) da el ranking y el id principal; CoinCap
+#   (/assets) se cruza por símbolo y nombre; el símbolo de CryptoCompare es
+#   el ticker en mayúsculas. Un ticker compartido por varias monedas solo se
+#   asigna a la de mejor ranking (las demás quedan sin CryptoCompare/CoinCap
+#   y usan CoinGecko).
+#
+#   El resultado tiene el mismo formato que CRYPTO_CONFIG:
+#       {"Bitcoin": {"coingecko": "bitcoin", "cryptocompare": "BTC", "coincap": "bitcoin"}}
+#   y se guarda en JSON; mientras sea reciente no se vuelve a paginar.
+# ===========================================================================
+
+import json
+import math
+import os
+import re
+from datetime import datetime
+
+import requests
+
+from Metricas import registro
+from Motor_Concurrente import procesar_en_paralelo
+from Transporte_HTTP import transporte
+
+RUTA_INDICE_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos_universo', 'indice_ids.json')
+
+# Elementos por página de cada listado
+POR_PAGINA = {
+    'coingecko': 250,
+    'coincap': 2000
+}
+
+# Criterio de orden -> (parámetro order de CoinGecko, campo del activo)
+ORDENES = {
+    'market_cap': ('market_cap_desc', 'market_cap'),
+    'volumen': ('volume_desc', 'volumen')
+}
+
+EDAD_MAXIMA_DEFAULT = 24 * 3600  # segundos
+
+
+def _normalizar(nombre):
+    return re.sub(r'[^a-z0-9]', '', str(nombre).lower())
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ConstructorUniverso:
+    def __init__(self, api_config, ruta=RUTA_INDICE_DEFAULT, edad_maxima=EDAD_MAXIMA_DEFAULT):
+        """
+        Args:
+            api_config (dict): API_CONFIG con base_url y timeout por proveedor.
+            ruta (str): Archivo JSON del índice persistente.
+            edad_maxima (int): Segundos que el índice guardado se considera vigente.
+        """
+        self.api_config = api_config
+        self.ruta = ruta
+        self.edad_maxima = edad_maxima
+
+    def _get(self, proveedor, endpoint, params):
+        config = self.api_config[proveedor]
+        response = transporte.get(f"{config['base_url']}{endpoint}", proveedor=proveedor,
+                                  params=params, timeout=config['timeout'])
+        response.raise_for_status()
+        return response.json()
+
+    def listado_coingecko(self, n, orden='market_cap'):
+        """Top-n de CoinGecko; las páginas se piden en paralelo (el limitador marca el ritmo)"""
+        por_pagina = POR_PAGINA['coingecko']
+        paginas = range(1, math.ceil(n / por_pagina) + 1)
+
+        def pagina(numero):
+            return self._get('coingecko', '/coins/markets', {
+                'vs_currency': 'usd', 'order': ORDENES[orden][0],
+                'per_page': por_pagina, 'page': numero
+            })
+
+        activos = []
+        for numero, datos in procesar_en_paralelo(pagina, paginas).items():
+            if datos is None:
+                registro.warning("⚠️  Página {} del listado de CoinGecko no disponible", numero)
+                continue
+            activos.extend({
+                'coingecko': item['id'],
+                'simbolo': str(item.get('symbol', '')).upper(),
+                'nombre': item.get('name') or item['id'],
+                'market_cap': _numero(item.get('market_cap')),
+                'volumen': _numero(item.get('total_volume'))
+            } for item in datos)
+        return activos
+
+    def listado_coincap(self, n):
+        """Primeros n activos de CoinCap (por capitalización), paginados con offset"""
+        por_pagina = POR_PAGINA['coincap']
+        activos = []
+        for offset in range(0, n, por_pagina):
+            datos = self._get('coincap', '/assets', {'limit': min(por_pagina, n - offset), 'offset': offset})
+            pagina = datos.get('data', [])
+            activos.extend({
+                'coincap': item['id'],
+                'simbolo': str(item.get('symbol', '')).upper(),
+                'nombre': item.get('name') or item['id'],
+                'market_cap': _numero(item.get('marketCapUsd')),
+                'volumen': _numero(item.get('volumeUsd24Hr'))
+            } for item in pagina)
+            if len(pagina) < min(por_pagina, n - offset):
+                break
+        return activos
+
+    def construir(self, n=100, orden='market_cap'):
+        """
+        Descarga los listados y cruza los IDs.
+
+        Returns:
+            dict: {nombre: {coingecko, cryptocompare, coincap, simbolo, market_cap, volumen}}
+        """
+        if orden not in ORDENES:
+            raise ValueError(f"Orden no soportado: {orden} (usar {', '.join(ORDENES)})")
+
+        try:
+            principal = self.listado_coingecko(n, orden)
+        except requests.exceptions.RequestException as e:
+            registro.warning("⚠️  Listado de CoinGecko no disponible: {}", e)
+            principal = []
+
+        try:
+            # Margen: el ranking de CoinCap no coincide exactamente con el de CoinGecko
+            coincap = self.listado_coincap(max(2 * n, 200))
+        except requests.exceptions.RequestException as e:
+            registro.warning("⚠️  Listado de CoinCap no disponible: {}", e)
+            coincap = []
+
+        if not principal:
+            # Sin CoinGecko el ranking sale de CoinCap (mismo formato, sin id de CoinGecko)
+            campo = ORDENES[orden][1]
+            principal = sorted(({**a, 'coingecko': None} for a in coincap),
+                               key=lambda a: a[campo], reverse=True)
+        return self._cruzar(principal[:n], coincap)
+
+    def _cruzar(self, principal, coincap):
+        por_simbolo = {}
+        for activo in coincap:
+            por_simbolo.setdefault(activo['simbolo'], []).append(activo)
+
+        universo = {}
+        simbolos_usados = set()
+        for activo in principal:
+            simbolo = activo['simbolo']
+            candidatos = por_simbolo.get(simbolo, [])
+            mismo_nombre = [c for c in candidatos if _normalizar(c['nombre']) == _normalizar(activo['nombre'])]
+
+            coincap_id = activo.get('coincap')
+            if coincap_id is None and (mismo_nombre or (candidatos and simbolo not in simbolos_usados)):
+                coincap_id = (mismo_nombre or candidatos)[0]['coincap']
+
+            nombre = activo['nombre']
+            if nombre in universo:
+                nombre = f"{nombre} ({simbolo})"
+
+            universo[nombre] = {
+                'coingecko': activo.get('coingecko'),
+                'cryptocompare': simbolo if simbolo and simbolo not in simbolos_usados else None,
+                'coincap': coincap_id,
+                'simbolo': simbolo,
+                'market_cap': activo['market_cap'],
+                'volumen': activo['volumen']
+            }
+            simbolos_usados.add(simbolo)
+        return universo
+
+    def guardar(self, universo, n, orden):
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        contenido = {
+            'actualizado': datetime.now().isoformat(),
+            'n': n,
+            'orden': orden,
+            'activos': universo
+        }
+        tmp = self.ruta + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(contenido, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.ruta)
+
+    def cargar(self):
+        """Índice guardado (dict con actualizado, n, orden y activos) o None"""
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _vigente(self, indice, n, orden):
+        if not indice or indice.get('orden') != orden or indice.get('n', 0) < n:
+            return False
+        edad = datetime.now() - datetime.fromisoformat(indice['actualizado'])
+        return edad.total_seconds() < self.edad_maxima
+
+    def universo(self, n=100, orden='market_cap', refrescar=False):
+        """
+        Top-n con IDs de los tres proveedores, desde el índice guardado si es
+        reciente. Si los listados fallan se usa el índice guardado aunque haya
+        caducado.
+
+        Returns:
+            dict: {nombre: {coingecko, cryptocompare, coincap, ...}} en orden de ranking.
+        """
+        indice = self.cargar()
+        if not refrescar and self._vigente(indice, n, orden):
+            return dict(list(indice['activos'].items())[:n])
+
+        universo = self.construir(n, orden)
+        if universo:
+            self.guardar(universo, n, orden)
+            return universo
+
+        if indice and indice.get('activos'):
+            registro.warning("⚠️  Usando índice de activos guardado ({})", indice['actualizado'])
+            return dict(list(indice['activos'].items())[:n])
+        return {}
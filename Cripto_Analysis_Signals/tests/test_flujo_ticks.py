@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Flujo_Ticks import AgregadorVelas
+
+
+def test_tick_tardio_tras_cierre_por_reloj_no_reabre_la_vela():
+    cerradas = []
+    agregador = AgregadorVelas('minute', al_cerrar=cerradas.append)
+
+    agregador.procesar('A', 100.0, 1.0, 60.0)
+    # B adelanta el reloj de eventos: la vela de A (cubeta 60 s) se cierra
+    agregador.procesar('B', 50.0, 1.0, 120.5)
+    # Tick de A para la cubeta ya cerrada
+    agregador.procesar('A', 101.0, 1.0, 119.9)
+    agregador.cerrar_todas()
+
+    velas_a = [vela for vela in cerradas if vela.simbolo == 'A']
+    assert [vela.inicio for vela in velas_a] == [60]
+    assert velas_a[0].close == 100.0
+    assert agregador.tardios == 1
+
+
+def test_tick_tardio_dentro_de_la_vela_abierta_se_agrega():
+    agregador = AgregadorVelas('minute')
+    agregador.procesar('A', 100.0, 1.0, 60.0)
+    agregador.procesar('A', 99.0, 1.0, 61.0)
+    agregador.procesar('A', 98.0, 1.0, 60.5)
+    agregador.cerrar_todas()
+
+    vela = agregador.velas['A'][-1]
+    assert (vela.low, vela.close, vela.ticks) == (98.0, 98.0, 3)
+    assert agregador.tardios == 0
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Indicadores_Vectorizados import aplicar_indicadores_rango
+
+
+def _serie_ohlcv(filas=120, semilla=7):
+    """OHLCV aleatorio con un tramo sin volumen y otro plano (high == low == close)"""
+    rng = np.random.default_rng(semilla)
+    cierre = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, filas)))
+    alto = cierre * (1 + rng.uniform(0, 0.02, filas))
+    bajo = cierre * (1 - rng.uniform(0, 0.02, filas))
+    volumen = rng.uniform(10, 1000, filas)
+
+    volumen[30:60] = 0.0                   # más de una ventana de 14 barras sin volumen
+    alto[70:95] = bajo[70:95] = cierre[70:95] = cierre[69]  # ventana plana
+
+    indice = pd.date_range('2024-01-01', periods=filas, freq='D', name='timestamp')
+    return pd.DataFrame({'price': cierre, 'high': alto, 'low': bajo, 'volumefrom': volumen}, index=indice)
+
+
+def _referencia_ta(df):
+    alto, bajo, cierre, volumen = df['high'], df['low'], df['price'], df['volumefrom']
+    estocastico = ta.momentum.StochasticOscillator(alto, bajo, cierre, window=14, smooth_window=3)
+    keltner = ta.volatility.KeltnerChannel(alto, bajo, cierre, window=20, window_atr=10,
+                                           original_version=False, multiplier=2)
+    atr = ta.volatility.AverageTrueRange(alto, bajo, cierre, window=14).average_true_range()
+    return {
+        # ta rellena con 0 las barras previas a completar la ventana; el motor deja NaN
+        'ATR': atr.where(np.arange(len(atr)) >= 13),
+        'STOCH_K': estocastico.stoch(),
+        'STOCH_D': estocastico.stoch_signal(),
+        'KC_upper': keltner.keltner_channel_hband(),
+        'KC_middle': keltner.keltner_channel_mband(),
+        'KC_lower': keltner.keltner_channel_lband(),
+        'VWAP': ta.volume.VolumeWeightedAveragePrice(alto, bajo, cierre, volumen, window=14)
+                  .volume_weighted_average_price(),
+    }
+
+
+@pytest.mark.parametrize('columna', ['ATR', 'STOCH_K', 'STOCH_D', 'KC_upper', 'KC_middle', 'KC_lower', 'VWAP'])
+def test_indicadores_rango_coinciden_con_ta(columna):
+    df = _serie_ohlcv()
+    esperado = _referencia_ta(df)[columna].to_numpy(dtype=float)
+    aplicar_indicadores_rango({'activo': df})
+    obtenido = df[columna].to_numpy(dtype=float)
+
+    # Mismas posiciones sin valor (p.ej. VWAP de una ventana sin volumen) y mismos valores en el resto
+    np.testing.assert_array_equal(np.isnan(obtenido), np.isnan(esperado))
+    np.testing.assert_allclose(obtenido, esperado, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_vwap_sin_volumen_es_nan():
+    df = _serie_ohlcv()
+    aplicar_indicadores_rango({'activo': df})
+
+    # Ventanas de 14 barras íntegramente dentro del tramo sin volumen
+    assert df['VWAP'].iloc[43:60].isna().all()
+    assert np.isfinite(df['VWAP'].iloc[13:30]).all()